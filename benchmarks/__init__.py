@@ -0,0 +1,11 @@
+"""Benchmarks of the in-memory indexes and of the recipe save path.
+
+They run on synthetic catalogs and print their measurements. Only 'fulltext' needs a MySQL server:
+
+    - python -m benchmarks.similarity    Recall and latency of the similar-recipe index.
+    - python -m benchmarks.fuzzy         Scaling of the typo-tolerant search index.
+    - python -m benchmarks.pantry        Latency of the pantry search with the pruned candidates.
+    - python -m benchmarks.boolean       Latency of two-term ANDs of the ingredient and tag search.
+    - python -m benchmarks.recipe_decode Decoding of a recipe read as typed rows against GROUP_CONCAT strings.
+    - python -m benchmarks.fulltext      Name search with the FULLTEXT index against 'LIKE %...%', on a scratch database.
+"""
@@ -0,0 +1,94 @@
+"""Latency of the boolean ingredient and tag search.
+
+InvertedIndex evaluates queries such as 'pollo AND limon' over the sorted posting arrays of its terms. This benchmark
+indexes synthetic catalogs of growing size and runs two-term ANDs between terms of different frequencies, chosen by
+the share of recipes that use them:
+
+- 'comun': the most used ingredient (around half of the recipes);
+- 'medio': an ingredient used by about 3% of the recipes;
+- 'raro': an ingredient used by about 0.1% of the recipes.
+
+For each query it reports the latency of `query`, returning up to 'limit' recipes like the application does
+(DBUtils.SEARCH_LIMIT), the latency of leapfrogging the two postings with `AndCursor`, and whether both returned
+the recipes a set intersection finds.
+
+Usage:
+    - python -m benchmarks.boolean --recipes 100000 200000 400000
+"""
+
+from benchmarks.synthetic import catalog
+from src.utils.search_index import AndCursor, InvertedIndex, PostingCursor, take
+import argparse
+import statistics
+import time
+
+
+def term_with_share(index: InvertedIndex, share: float) -> list[str]:
+    """Returns the terms sorted by how close the share of recipes using them is to 'share'."""
+    total = len(index.all_recipes)
+    return sorted(index.postings, key=lambda term: (abs(len(index.postings[term]) / total - share), term))
+
+
+def timed(function, repeat: int) -> tuple[float, list]:
+    """Returns the median latency of a call in milliseconds, and its result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def run(recipes: int, limit: int = 500, repeat: int = 20, seed: int = 1) -> dict[str, dict]:
+    """Indexes a synthetic catalog and measures two-term ANDs.
+
+    Returns
+    -------
+        dict[str, dict]: For each query, the sizes of both postings, the number of results, the median latency of
+        `query` and of the leapfrog in milliseconds, and whether both matched a set intersection.
+    """
+    index = InvertedIndex()
+    for recipe_id, (name, ingredients, tags) in catalog(recipes, seed=seed).items():
+        index.set_terms(recipe_id, ingredients + tags)
+    common = term_with_share(index, 1)
+    medium = term_with_share(index, 0.03)
+    rare = term_with_share(index, 0.001)
+    queries = {
+        'comun AND comun': (common[0], common[1]),
+        'comun AND medio': (common[0], medium[0]),
+        'medio AND medio': (medium[0], medium[1]),
+        'comun AND raro': (common[0], rare[0]),
+        'raro AND raro': (rare[0], rare[1]),
+    }
+    results = {}
+    for label, (first, second) in queries.items():
+        expected = sorted(set(index.postings[first]) & set(index.postings[second]))[:limit]
+        query_ms, found = timed(lambda: index.query(f'{first} AND {second}', limit), repeat)
+        leapfrog = lambda: take(AndCursor([PostingCursor(index.postings[first]), PostingCursor(index.postings[second])]), limit)
+        leapfrog_ms, leapfrogged = timed(leapfrog, repeat)
+        results[label] = {
+            'sizes': (len(index.postings[first]), len(index.postings[second])),
+            'results': len(expected),
+            'query_ms': query_ms,
+            'leapfrog_ms': leapfrog_ms,
+            'exact': found == expected and leapfrogged == expected,
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Mide la busqueda booleana por ingredientes y etiquetas.')
+    parser.add_argument('--recipes', type=int, nargs='+', default=[100000, 200000, 400000])
+    args = parser.parse_args()
+
+    print(f"{'recetas':>8} {'consulta':<16} {'postings':>15} {'resultados':>11} {'consulta ms':>12} {'leapfrog ms':>12} "
+          f"{'exacta':>7}")
+    for recipes in args.recipes:
+        for label, result in run(recipes).items():
+            sizes = '{} / {}'.format(*result['sizes'])
+            print(f"{recipes:>8} {label:<16} {sizes:>15} {result['results']:>11} {result['query_ms']:>12.3f} "
+                  f"{result['leapfrog_ms']:>12.3f} {'si' if result['exact'] else 'no':>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Latency of the recipe name search, FULLTEXT index against 'LIKE %...%'.
+
+`DBUtils.search_by_name` used to filter with 'recetas.nombre LIKE %term%', whose leading wildcard makes MySQL read
+every row of 'recetas'. It now matches the words of the term as prefixes through the FULLTEXT index of v003. This
+benchmark needs a MySQL server: for each size it creates a scratch database named after 'DB_CONFIG' with the suffix
+'_fulltext', fills it with the names of a synthetic catalog, applies the migrations (as 'db_migrate --synthetic'
+does, so the indexes are built once over the loaded rows) and runs the same terms through both queries:
+
+- the median and 95th percentile latency of each query, with the rows fetched;
+- the mean number of recipes each one returns. 'LIKE' also matches the term in the middle of a word, so it may
+  return more.
+
+The scratch database is dropped at the end.
+
+Usage:
+    - python -m benchmarks.fulltext --recipes 10000 100000 1000000 --queries 50
+"""
+
+from benchmarks.synthetic import catalog
+from src.utils.db_config import DB_CONFIG
+from src.utils.db_migrate import migrate
+from src.utils.db_utils import DBUtils
+import mysql.connector
+import argparse
+import contextlib
+import io
+import random
+import statistics
+import time
+
+# LA BUSQUEDA ANTERIOR A v003, CON EL COMODIN AL PRINCIPIO
+like_query = """
+    SELECT recetas.id_receta, recetas.nombre, recetas.tiempo_preparacion, recetas.tiempo_coccion, recetas.creado_el,
+    (
+        SELECT GROUP_CONCAT(ingredientes.nombre SEPARATOR ',')
+        FROM ingredientes
+        JOIN ingredientes_receta
+        ON ingredientes.id_ingrediente = ingredientes_receta.id_ingrediente
+        WHERE ingredientes_receta.id_receta = recetas.id_receta
+    ) AS ingredientes
+    FROM recetas
+    WHERE recetas.nombre LIKE %s;"""
+
+
+def load(conn, recipes: int, seed: int, batch: int = 5000) -> list[str]:
+    """Creates the tables, inserts the recipes of a synthetic catalog and builds the indexes. Returns the names."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        migrate(conn, until=1)
+    names = [name for name, ingredients, tags in catalog(recipes, seed=seed).values()]
+    generator = random.Random(seed)
+    cur = conn.cursor()
+    for first in range(0, len(names), batch):
+        cur.executemany("INSERT INTO recetas (nombre, tiempo_preparacion, tiempo_coccion, favorito) VALUES (%s, %s, %s, 0)",
+                        [(name, generator.randint(5, 120), generator.randint(0, 180)) for name in names[first:first + batch]])
+        conn.commit()
+    cur.close()
+    with contextlib.redirect_stdout(io.StringIO()):
+        migrate(conn)
+    return names
+
+
+def timed(function, terms: list[str]) -> tuple[list[float], list[int]]:
+    """Runs a search for every term and returns the latencies in milliseconds and the number of rows found."""
+    latencies = []
+    found = []
+    for term in terms:
+        start = time.perf_counter()
+        rows = function(term)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found.append(len(rows))
+    return latencies, found
+
+
+def run(conn, recipes: int, queries: int, seed: int = 1) -> dict:
+    """Loads a scratch database with 'recipes' recipes and measures both searches.
+
+    Returns
+    -------
+        dict: The load time in seconds, and for 'like' and 'fulltext' the median and 95th percentile latency in
+        milliseconds and the mean number of recipes found.
+    """
+    database = f"{DB_CONFIG['database']}_fulltext"
+    cur = conn.cursor()
+    cur.execute(f"DROP DATABASE IF EXISTS {database}")
+    cur.execute(f"CREATE DATABASE {database}")
+    cur.execute(f"USE {database}")
+    start = time.perf_counter()
+    names = load(conn, recipes, seed)
+    load_s = time.perf_counter() - start
+
+    # UNA PALABRA DE UN NOMBRE, A VECES SOLO SU PRINCIPIO, COMO SE ESCRIBE EN EL BUSCADOR
+    generator = random.Random(seed)
+    terms = []
+    for _ in range(queries):
+        word = generator.choice([word for word in generator.choice(names).split()[:-1] if len(word) >= 3])
+        terms.append(word[:generator.randint(4, len(word))] if len(word) > 4 else word)
+
+    db_utils = DBUtils()
+    db_utils.connection = conn
+
+    def like(term: str) -> list:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(like_query, (f'%{term}%',))
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    result = {'load_s': load_s}
+    for label, search in (('like', like), ('fulltext', db_utils.search_by_name)):
+        latencies, found = timed(search, terms)
+        result[label] = {
+            'ms': statistics.median(latencies),
+            'p95_ms': sorted(latencies)[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+            'found': statistics.mean(found),
+        }
+    cur.execute(f"DROP DATABASE {database}")
+    cur.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compara la busqueda por nombre con FULLTEXT y con LIKE.')
+    parser.add_argument('--recipes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(user=DB_CONFIG['user'], password=DB_CONFIG['password'], host=DB_CONFIG['host'])
+    print(f"{'recetas':>8} {'carga s':>8} {'LIKE ms':>9} {'p95 ms':>8} {'filas':>7} {'FULLTEXT ms':>12} {'p95 ms':>8} "
+          f"{'filas':>7}")
+    try:
+        for recipes in args.recipes:
+            result = run(conn, recipes, args.queries)
+            like, fulltext = result['like'], result['fulltext']
+            print(f"{recipes:>8} {result['load_s']:>8.1f} {like['ms']:>9.2f} {like['p95_ms']:>8.2f} {like['found']:>7.0f} "
+                  f"{fulltext['ms']:>12.2f} {fulltext['p95_ms']:>8.2f} {fulltext['found']:>7.0f}")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Scaling of the typo-tolerant search index.
+
+FuzzyIndex only computes the edit distance to the words that share enough trigrams with the search term, so a search
+should grow with the number of words that look like the term, not with the vocabulary or the catalog. This benchmark
+searches misspelled ingredient names on synthetic catalogs of growing size and compares the index with a scan of the
+whole vocabulary:
+
+- the latency of `search`, and of the scan, which computes the distance to every word;
+- the number of words read from the trigram buckets, and of words whose distance is computed by the index;
+- whether the index returned the same recipes as the scan, which it must, since the trigram filter is a lower bound.
+
+Usage:
+    - python -m benchmarks.fuzzy --recipes 10000 50000 100000 --queries 200
+"""
+
+from benchmarks.synthetic import catalog
+from src.utils.fuzzy_index import FuzzyIndex, levenshtein, max_distance, trigrams
+from src.utils.search_index import fold_text
+import argparse
+import random
+import statistics
+import string
+import time
+
+
+def misspell(word: str, generator: random.Random) -> str:
+    """Returns the word with one letter replaced, removed or inserted."""
+    position = generator.randrange(len(word))
+    letter = generator.choice(string.ascii_lowercase)
+    edit = generator.randrange(3)
+    if edit == 0:
+        return word[:position] + letter + word[position + 1:]
+    if edit == 1:
+        return word[:position] + word[position + 1:]
+    return word[:position] + letter + word[position:]
+
+
+def read_words(index: FuzzyIndex, term: str) -> int:
+    """Returns the number of words `search` reads from the trigram buckets for a term, before the overlap count."""
+    limit = max_distance(term)
+    grams = trigrams(term)
+    needed = max(1, len(grams) - 3 * limit)
+    lengths = range(len(term) - limit, len(term) + limit + 1)
+    sizes = sorted(sum(len(index.trigrams.get(gram, {}).get(length, ())) for length in lengths) for gram in grams)
+    return sum(sizes[:len(grams) - needed + 1])
+
+
+def scan(index: FuzzyIndex, term: str) -> list[tuple[int, int]]:
+    """Searches a term computing the distance to every word, and ranks the recipes like `FuzzyIndex.search`."""
+    limit = max_distance(term)
+    closest = {}
+    for word, recipe_ids in index.terms.postings.items():
+        distance = levenshtein(term, word, limit)
+        if distance <= limit:
+            for recipe_id in recipe_ids:
+                closest[recipe_id] = min(distance, closest.get(recipe_id, distance))
+    return sorted(closest.items(), key=lambda match: (match[1], match[0]))
+
+
+def run(recipes: int, queries: int, limit: int = 500, ingredients: int = None, seed: int = 1) -> dict:
+    """Builds the index over a synthetic catalog and measures misspelled searches, returning up to 'limit' recipes like
+    the application does (DBUtils.SEARCH_LIMIT). 'ingredients' is the size of the ingredient vocabulary, by default
+    one per 20 recipes (see `synthetic.catalog`).
+
+    Returns
+    -------
+        dict: The vocabulary size, the build time in seconds, the median and 95th percentile latency of `search` and
+        the median latency of the scan in milliseconds, the mean number of words read from the trigram buckets and of
+        words compared, and whether every search matched the scan.
+    """
+    recipes_by_id = catalog(recipes, ingredients, seed=seed)
+    index = FuzzyIndex()
+    start = time.perf_counter()
+    for recipe_id, (name, ingredients, tags) in recipes_by_id.items():
+        index.set_recipe(recipe_id, name, ingredients + tags)
+    build = time.perf_counter() - start
+
+    generator = random.Random(seed)
+    words = sorted({name for _, ingredients, _ in recipes_by_id.values() for name in ingredients})
+    terms = [fold_text(misspell(generator.choice(words), generator)) for _ in range(queries)]
+    fast, slow, read, compared = [], [], [], []
+    exact = True
+    for term in terms:
+        start = time.perf_counter()
+        found = index.search(term, limit)
+        fast.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        expected = scan(index, term)[:limit]
+        slow.append((time.perf_counter() - start) * 1000)
+        read.append(read_words(index, term))
+        compared.append(len(index.candidates(term, max_distance(term))))
+        exact = exact and found == expected
+    return {
+        'vocabulary': len(index.terms.postings),
+        'build_s': build,
+        'search_ms': statistics.median(fast),
+        'search_p95_ms': sorted(fast)[min(len(fast) - 1, int(0.95 * len(fast)))],
+        'scan_ms': statistics.median(slow),
+        'read': statistics.mean(read),
+        'compared': statistics.mean(compared),
+        'exact': exact,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Mide como escala la busqueda tolerante a errores.')
+    parser.add_argument('--recipes', type=int, nargs='+', default=[10000, 50000, 100000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--ingredients', type=int, help='ingredientes distintos; por defecto uno cada 20 recetas')
+    args = parser.parse_args()
+
+    print(f"{'recetas':>8} {'palabras':>9} {'armado s':>9} {'busqueda ms':>12} {'p95 ms':>8} {'recorrido ms':>13} "
+          f"{'leidas':>8} {'comparadas':>11} {'exacta':>7}")
+    for recipes in args.recipes:
+        result = run(recipes, args.queries, ingredients=args.ingredients)
+        print(f"{recipes:>8} {result['vocabulary']:>9} {result['build_s']:>9.2f} {result['search_ms']:>12.3f} "
+              f"{result['search_p95_ms']:>8.3f} {result['scan_ms']:>13.2f} {result['read']:>8.0f} {result['compared']:>11.1f} "
+              f"{'si' if result['exact'] else 'no':>7}")
+
+
+if __name__ == '__main__':
+    main()
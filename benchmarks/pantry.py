@@ -0,0 +1,117 @@
+"""Latency of the 'what can I cook' pantry search.
+
+PantryIndex only counts the ingredients on hand of the recipes listed under a pantry ingredient among their k + 1
+rarest ones. This benchmark builds the index over synthetic catalogs of growing size and runs pantry queries like the
+ones of the main window: the pantry holds the given number of ingredients, picked with the frequency they have in the
+catalog (a kitchen has salt and oil much more often than saffron). For each number of missing ingredients allowed it
+reports:
+
+- the latency of `query`, returning the best recipes like the application does (DBUtils.SEARCH_LIMIT);
+- the latency of the pass over every recipe, `query_groups`, which the index used before;
+- the number of candidates whose hits are counted;
+- whether both returned the same recipes.
+
+Usage:
+    - python -m benchmarks.pantry --recipes 100000 500000 --pantry 30 --queries 50
+"""
+
+from benchmarks.synthetic import catalog
+from src.utils.search_index import PantryIndex, fold_text
+import argparse
+import heapq
+import random
+import statistics
+import time
+
+
+def pantries(recipes_by_id: dict, size: int, count: int, generator: random.Random) -> list[list[str]]:
+    """Returns 'count' pantries of 'size' distinct ingredients, each picked with its frequency in the catalog."""
+    frequency = {}
+    for _, ingredients, _ in recipes_by_id.values():
+        for name in ingredients:
+            frequency[name] = frequency.get(name, 0) + 1
+    names = list(frequency)
+    weights = list(frequency.values())
+    result = []
+    for _ in range(count):
+        pantry = {}
+        while len(pantry) < size:
+            pantry.setdefault(generator.choices(names, weights)[0], None)
+        result.append(list(pantry))
+    return result
+
+
+def candidates(index: PantryIndex, pantry: list[str], max_missing: int) -> int:
+    """Returns the number of recipes whose hits `query` counts for a pantry."""
+    bits = {index.bits[fold_text(name)] for name in pantry}
+    found = set()
+    for size in range(1, max_missing + 1):
+        found.update(index.groups.get(size, ((), ()))[0])
+    for postings in index.rarest[:max_missing + 1]:
+        for bit in bits:
+            found.update(postings.get(bit, ()))
+    return len(found)
+
+
+def run(recipes: int, pantry_size: int, queries: int, missing: list[int], limit: int = 500,
+        seed: int = 1) -> dict[int, dict]:
+    """Builds the index over a synthetic catalog and measures the same pantry queries for each number of missing
+    ingredients allowed.
+
+    Returns
+    -------
+        dict[int, dict]: For each number of missing ingredients, the build time in seconds, the median and 95th
+        percentile latency of `query` and the median latency of the pass over every recipe in milliseconds, the mean
+        number of candidates and whether every query matched the pass over every recipe.
+    """
+    recipes_by_id = catalog(recipes, seed=seed)
+    index = PantryIndex()
+    start = time.perf_counter()
+    index.build({recipe_id: ingredients for recipe_id, (name, ingredients, tags) in recipes_by_id.items()})
+    build = time.perf_counter() - start
+
+    rank = lambda match: (match[1], match[1] / match[2], match[0])
+    selected = pantries(recipes_by_id, pantry_size, queries, random.Random(seed))
+    results = {}
+    for max_missing in missing:
+        fast, slow, counted = [], [], []
+        exact = True
+        for pantry in selected:
+            start = time.perf_counter()
+            found = index.query(pantry, max_missing, limit)
+            fast.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            expected = heapq.nsmallest(limit, index.query_groups(index.mask(pantry), max_missing), key=rank)
+            slow.append((time.perf_counter() - start) * 1000)
+            counted.append(candidates(index, pantry, max_missing))
+            exact = exact and found == expected
+        results[max_missing] = {
+            'build_s': build,
+            'query_ms': statistics.median(fast),
+            'query_p95_ms': sorted(fast)[min(len(fast) - 1, int(0.95 * len(fast)))],
+            'scan_ms': statistics.median(slow),
+            'candidates': statistics.mean(counted),
+            'exact': exact,
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Mide la busqueda por despensa.')
+    parser.add_argument('--recipes', type=int, nargs='+', default=[100000, 500000])
+    parser.add_argument('--pantry', type=int, default=30)
+    parser.add_argument('--missing', type=int, nargs='+', default=[0, 1, 2])
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'recetas':>8} {'faltantes':>10} {'armado s':>9} {'consulta ms':>12} {'p95 ms':>8} {'recorrido ms':>13} "
+          f"{'candidatas':>11} {'exacta':>7}")
+    for recipes in args.recipes:
+        for max_missing, result in run(recipes, args.pantry, args.queries, args.missing).items():
+            print(f"{recipes:>8} {max_missing:>10} {result['build_s']:>9.2f} {result['query_ms']:>12.2f} "
+                  f"{result['query_p95_ms']:>8.2f} {result['scan_ms']:>13.2f} {result['candidates']:>11.0f} "
+                  f"{'si' if result['exact'] else 'no':>7}")
+
+
+if __name__ == '__main__':
+    main()
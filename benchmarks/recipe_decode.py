@@ -0,0 +1,173 @@
+"""Cost of decoding a recipe read by `DBUtils.get_recipe_by_id`, typed rows against GROUP_CONCAT strings.
+
+`get_recipe_by_id` used to return one row holding the ingredients, steps and tags as GROUP_CONCAT strings
+('nombre (cantidad medida),...'), which `separate_ingredients` and then the recipe windows split apart. It now returns
+one typed row per ingredient, step and tag, turned into NamedTuples by `format_recipe`. This benchmark builds the
+rows both queries return for a recipe of each size and measures, in microseconds:
+
+- 'filas': decoding the rows as the client library hands them over, with the pure Python converter of
+  mysql-connector (the C extension is faster for both layouts, but cannot be run without a server);
+- 'formato': building the recipe dictionary, and for GROUP_CONCAT also the splits the windows did afterwards;
+- 'cache': returning a cached recipe, with the deepcopy the cache used before and the shallow copy it makes now.
+
+The time spent by the server and on the network is not measured: GROUP_CONCAT sends one row, the typed query one row
+per ingredient, step and tag.
+
+Usage:
+    - python -m benchmarks.recipe_decode --ingredients 10 100 --steps 15 --tags 3
+"""
+
+from src.utils.db_utils import DBUtils, RecipeIngredient, RecipeStep, RecipeTag
+from src.utils.recipe_cache import RecipeCache
+from mysql.connector import utils
+from mysql.connector.constants import FieldType
+from mysql.connector.conversion import MySQLConverter
+import argparse
+import copy
+import statistics
+import time
+
+RECIPE = (7, 'Guiso de lentejas', 30, 60, None, 1)
+RECIPE_TYPES = [FieldType.LONG, FieldType.VAR_STRING, FieldType.LONG, FieldType.LONG, FieldType.VAR_STRING,
+                FieldType.TINY]
+
+
+def fields(types: list[int]) -> list[tuple]:
+    """Returns the cursor description of a result with columns of the given types."""
+    return [(f'columna {index}', field_type, None, None, None, None, True, 0, 45)
+            for index, field_type in enumerate(types)]
+
+
+def packet(row: tuple) -> bytes:
+    """Encodes a row like the text protocol does: each value as a length-prefixed string, NULL as 0xfb."""
+    encoded = b''
+    for value in row:
+        if value is None:
+            encoded += b'\xfb'
+        else:
+            text = str(value).encode('utf-8')
+            encoded += utils.lc_int(len(text)) + text
+    return encoded
+
+
+def group_concat_rows(ingredients: int, steps: int, tags: int) -> tuple[list[bytes], list[tuple]]:
+    """Returns the row packet and the description of the GROUP_CONCAT query for a recipe of the given size."""
+    row = RECIPE + (
+        ','.join(f'ingrediente {i} ({i + 1} gramos)' for i in range(ingredients)),
+        ','.join(f'Paso numero {i} de la receta' for i in range(steps)),
+        ','.join(f'etiqueta {i}' for i in range(tags)),
+    )
+    return [packet(row)], fields(RECIPE_TYPES + [FieldType.BLOB] * 3)
+
+
+def typed_rows(ingredients: int, steps: int, tags: int) -> tuple[list[bytes], list[tuple]]:
+    """Returns the row packets and the description of the typed query for a recipe of the given size."""
+    rows = [RECIPE + (1, 100 + i, 200 + i, f'ingrediente {i}', i + 1, 'gramos', None, None, None)
+            for i in range(ingredients)]
+    rows += [RECIPE + (2, 300 + i, 400 + i, None, None, None, f'Paso numero {i} de la receta', i + 1, None)
+             for i in range(steps)]
+    rows += [RECIPE + (3, 500 + i, None, None, None, None, None, None, f'etiqueta {i}') for i in range(tags)]
+    types = [FieldType.LONG, FieldType.LONG, FieldType.LONG, FieldType.VAR_STRING, FieldType.LONG,
+             FieldType.VAR_STRING, FieldType.BLOB, FieldType.LONG, FieldType.VAR_STRING]
+    return [packet(row) for row in rows], fields(RECIPE_TYPES + types)
+
+
+def decode(packets: list[bytes], description: list[tuple]) -> list[tuple]:
+    """Turns row packets into Python rows, like the pure Python connector does when the rows are fetched."""
+    converter = MySQLConverter('utf8mb4', True)
+    return [converter.row_to_python(utils.read_lc_string_list(row), description) for row in packets]
+
+
+def group_concat_format(row: tuple) -> dict:
+    """The former decoding: `format_recipe` and `separate_ingredients`, then the splits of the recipe windows."""
+    names = []
+    amounts = []
+    for ingredient in row[6].split(','):
+        name, amount = ingredient.split('(')
+        amounts.append(amount.strip(')'))
+        names.append(name.strip())
+    recipe = {
+        'id': row[0],
+        'nombre': row[1],
+        'ingredientes': ','.join(names),
+        'cantidades': ','.join(amounts),
+        'preparacion': row[7],
+        'tiempo de preparacion': row[2],
+        'tiempo de coccion': row[3],
+        'imagen': row[4],
+        'etiquetas': row[8],
+        'favorito': row[5]
+    }
+    # LAS VENTANAS VOLVIAN A SEPARAR LAS LISTAS
+    recipe['ingredientes'].split(',')
+    recipe['cantidades'].split(',')
+    recipe['preparacion'].split(',')
+    return recipe
+
+
+def timed(function, repeat: int) -> float:
+    """Returns the median duration of a call in microseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(times)
+
+
+def run(ingredients: int, steps: int, tags: int, repeat: int = 500) -> dict[str, dict]:
+    """Measures both layouts for a recipe with the given number of ingredients, steps and tags.
+
+    Returns
+    -------
+        dict[str, dict]: For 'group_concat' and 'typed', the number of rows, the median time in microseconds of the
+        'rows', 'format' and 'cache' steps, and their 'total'.
+    """
+    db_utils = DBUtils()
+    cache = RecipeCache(10, 300)
+    result = {}
+
+    packets, description = group_concat_rows(ingredients, steps, tags)
+    rows = decode(packets, description)
+    recipe = group_concat_format(rows[0])
+    result['group_concat'] = {
+        'rows': len(rows),
+        'decode_us': timed(lambda: decode(packets, description), repeat),
+        'format_us': timed(lambda: group_concat_format(rows[0]), repeat),
+        'cache_us': timed(lambda: copy.deepcopy(recipe), repeat),
+    }
+
+    packets, description = typed_rows(ingredients, steps, tags)
+    rows = decode(packets, description)
+    recipe = db_utils.format_recipe(rows)
+    assert len(recipe['ingredientes']) == ingredients and isinstance(recipe['ingredientes'][0], RecipeIngredient)
+    assert isinstance(recipe['preparacion'][0], RecipeStep) and isinstance(recipe['etiquetas'][0], RecipeTag)
+    cache.put(RECIPE[0], recipe)
+    result['typed'] = {
+        'rows': len(rows),
+        'decode_us': timed(lambda: decode(packets, description), repeat),
+        'format_us': timed(lambda: db_utils.format_recipe(rows), repeat),
+        'cache_us': timed(lambda: cache.get(RECIPE[0]), repeat),
+    }
+    for layout in result.values():
+        layout['total_us'] = layout['decode_us'] + layout['format_us']
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compara la decodificacion de una receta con filas tipadas y con GROUP_CONCAT.')
+    parser.add_argument('--ingredients', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--steps', type=int, default=15)
+    parser.add_argument('--tags', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'ingredientes':>12} {'formato':<12} {'filas':>6} {'decodificar us':>15} {'armar us':>9} {'total us':>9} "
+          f"{'cache us':>9}")
+    for ingredients in args.ingredients:
+        for label, layout in run(ingredients, args.steps, args.tags).items():
+            print(f"{ingredients:>12} {label:<12} {layout['rows']:>6} {layout['decode_us']:>15.1f} "
+                  f"{layout['format_us']:>9.1f} {layout['total_us']:>9.1f} {layout['cache_us']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Recall and latency of the similar-recipe index.
+
+SimilarityIndex only compares a recipe with the recipes that share an LSH bucket with it, so it may miss neighbours
+that an exhaustive comparison finds. This benchmark compares both on a synthetic catalog:
+
+- recall@k: for each rank, whether the index found a neighbour as similar as the exhaustive search did. Ties are
+  frequent, so neighbours are compared by their similarity, not by their ID.
+- recall of close neighbours: the share of the recipes with a similarity of at least 0.5 to the query that were found.
+- latency of `similar` and of the exhaustive comparison, and the number of candidates compared.
+
+Usage:
+    - python -m benchmarks.similarity --recipes 20000 --queries 200 --k 5
+"""
+
+from benchmarks.synthetic import catalog
+from src.utils.similarity_index import SimilarityIndex
+import argparse
+import random
+import statistics
+import time
+
+
+def exact_similar(index: SimilarityIndex, recipe_id: int, k: int) -> list[tuple[int, float]]:
+    """Returns the 'k' most similar recipes comparing the given one with every other recipe."""
+    features = index.features[recipe_id]
+    scored = [(other_id, len(features & other) / len(features | other))
+              for other_id, other in index.features.items() if other_id != recipe_id]
+    scored.sort(key=lambda match: (-match[1], match[0]))
+    return scored[:k]
+
+
+def candidates(index: SimilarityIndex, recipe_id: int) -> int:
+    """Returns the number of recipes `similar` compares with the given one."""
+    keys = index.band_keys(index.signatures[recipe_id])
+    return len(set().union(*(index.buckets[key] for key in keys))) - 1
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run(recipes: int, queries: int, k: int, seed: int = 1) -> dict:
+    """Builds the index over a synthetic catalog and measures it.
+
+    Returns
+    -------
+        dict: The build time in seconds, the median and 95th percentile latency of `similar` and the median latency of
+        the exhaustive search in milliseconds, the mean number of candidates, recall@k and the recall of the
+        neighbours with a similarity of at least 0.5.
+    """
+    recipes_by_id = catalog(recipes, seed=seed)
+    index = SimilarityIndex()
+    start = time.perf_counter()
+    for recipe_id, (name, ingredients, tags) in recipes_by_id.items():
+        index.set_recipe(recipe_id, ingredients, tags)
+    build = time.perf_counter() - start
+
+    sample = random.Random(seed).sample(sorted(index.signatures), min(queries, len(index.signatures)))
+    fast, slow, compared = [], [], []
+    found_ranks = total_ranks = found_close = total_close = 0
+    for recipe_id in sample:
+        start = time.perf_counter()
+        approximate = index.similar(recipe_id, k)
+        fast.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        exact = exact_similar(index, recipe_id, len(index.features))
+        slow.append((time.perf_counter() - start) * 1000)
+        compared.append(candidates(index, recipe_id))
+
+        for rank, (other_id, score) in enumerate(exact[:k]):
+            total_ranks += 1
+            found_ranks += rank < len(approximate) and approximate[rank][1] >= score
+        close = {other_id for other_id, score in exact if score >= 0.5}
+        found = {other_id for other_id, score in index.similar(recipe_id, len(close) or 1)}
+        total_close += len(close)
+        found_close += len(close & found)
+    return {
+        'build_s': build,
+        'similar_ms': statistics.median(fast),
+        'similar_p95_ms': percentile(fast, 0.95),
+        'exact_ms': statistics.median(slow),
+        'candidates': statistics.mean(compared),
+        'recall_at_k': found_ranks / total_ranks if total_ranks else 1.0,
+        'recall_close': found_close / total_close if total_close else 1.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Mide la exactitud y la latencia del indice de recetas similares.')
+    parser.add_argument('--recipes', type=int, nargs='+', default=[5000, 20000, 50000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'recetas':>8} {'armado s':>9} {'similar ms':>11} {'p95 ms':>8} {'exhaustivo ms':>14} "
+          f"{'candidatos':>11} {'recall@k':>9} {'recall >=0.5':>13}")
+    for recipes in args.recipes:
+        result = run(recipes, args.queries, args.k)
+        print(f"{recipes:>8} {result['build_s']:>9.2f} {result['similar_ms']:>11.3f} {result['similar_p95_ms']:>8.3f} "
+              f"{result['exact_ms']:>14.2f} {result['candidates']:>11.1f} {result['recall_at_k']:>9.3f} "
+              f"{result['recall_close']:>13.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Synthetic recipe catalogs for the benchmarks.
+
+Real recipe books are not uniform: a few ingredients ('sal', 'aceite', 'cebolla') are used by most recipes, and
+recipes come in families of variations of the same dish. The catalogs generated here reproduce both, so the
+similar-recipe index has true neighbours to find and the posting lists have a realistic skew.
+"""
+
+from itertools import accumulate
+import random
+
+SYLLABLES = ['ba', 'be', 'ca', 'ce', 'cho', 'da', 'fe', 'ga', 'je', 'la', 'le', 'li', 'ma', 'me', 'na', 'ne', 'pa',
+             'pe', 'po', 'ra', 're', 'ri', 'ro', 'sa', 'se', 'ta', 'te', 'to', 'tu', 'za']
+
+
+def words(count: int, generator: random.Random) -> list[str]:
+    """Returns 'count' distinct pronounceable words of 2 to 4 syllables."""
+    result = {}
+    while len(result) < count:
+        word = ''.join(generator.choices(SYLLABLES, k=generator.randint(2, 4)))
+        result.setdefault(word, None)
+    return list(result)
+
+
+def catalog(recipes: int, ingredients: int = None, tags: int = None, family_size: int = 4,
+            seed: int = 1) -> dict[int, tuple[str, list[str], list[str]]]:
+    """Generates a catalog of recipes grouped in families of variations.
+
+    Parameters
+    ----------
+        recipes (int): The number of recipes.
+        ingredients (int, optional): The size of the ingredient vocabulary. By default one per 20 recipes, at least 200.
+        tags (int, optional): The size of the tag vocabulary. By default one per 200 recipes, at least 30.
+        family_size (int): The maximum number of recipes of a family. Each variation swaps up to 3 ingredients and
+            1 tag of the first recipe of its family.
+        seed (int): The seed of the generator, so every run builds the same catalog.
+
+    Returns
+    -------
+        dict[int, tuple[str, list[str], list[str]]]: The name, ingredient names and tag names of each recipe, by ID.
+    """
+    generator = random.Random(seed)
+    ingredient_names = words(ingredients or max(recipes // 20, 200), generator)
+    tag_names = [f'etiqueta {word}' for word in words(tags or max(recipes // 200, 30), generator)]
+    # POCOS INGREDIENTES MUY COMUNES Y UNA COLA LARGA DE INGREDIENTES RAROS
+    # LOS PESOS SE ACUMULAN UNA SOLA VEZ: 'choices' CON 'weights' LOS ACUMULA EN CADA LLAMADA
+    weights = list(accumulate(1 / (rank + 1) for rank in range(len(ingredient_names))))
+
+    def pick(names: list, weights: list, count: int) -> list:
+        chosen = {}
+        while len(chosen) < count:
+            chosen.setdefault(generator.choices(names, cum_weights=weights)[0], None)
+        return list(chosen)
+
+    result = {}
+    recipe_id = 1
+    while recipe_id <= recipes:
+        base = pick(ingredient_names, weights, 8)
+        base_tags = pick(tag_names, None, 3)
+        dish = f'{generator.choice(ingredient_names)} {generator.choice(["al horno", "guisado", "frito", "en salsa"])}'
+        for variation in range(generator.randint(1, family_size)):
+            if recipe_id > recipes:
+                break
+            recipe_ingredients = list(base)
+            recipe_tags = list(base_tags)
+            if variation:
+                for index in generator.sample(range(8), generator.randint(1, 3)):
+                    recipe_ingredients[index] = generator.choices(ingredient_names, cum_weights=weights)[0]
+                recipe_tags[generator.randrange(3)] = generator.choice(tag_names)
+            result[recipe_id] = (f'{dish} {variation + 1}', recipe_ingredients, recipe_tags)
+            recipe_id += 1
+    return result
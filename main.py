@@ -3,29 +3,68 @@ from tkinter import ttk
 from src.windows.NewRecipe import *
 from src.windows.ReadRecipe import ReadRecipe
 from src.windows.EditRecipe import EditRecipe
+from src.windows.VirtualTreeview import VirtualTreeview
+from src.windows.AdvancedFilter import AdvancedFilter
 import os
 from datetime import datetime
 import random
 from src.utils.db_utils import DBUtils
+from src.utils.db_worker import DBWorker
+from src.utils.db_pool import PoolTimeoutError
+from src.utils.catalog import CatalogLoadingError, get_catalog
+from src.utils.search_index import QuerySyntaxError
+from src.utils.recipe_query import RecipeQuery
+from src.utils.search_cache import SearchCache
+from src.utils.db_utils import full_text_terms, name_matcher
+from src.utils import db_gc
 
 
 class App(ttk.Frame):
+    # RECETAS POR PAGINA DEL LISTADO PRINCIPAL
+    PAGE_SIZE = 200
+    # ESPERA ENTRE TECLAS ANTES DE BUSCAR MIENTRAS SE ESCRIBE (MS)
+    TYPE_AHEAD_DELAY = 250
+
     def __init__(self, parent=None) -> None:
         super().__init__(parent, padding=(20))
         self.parent = parent
-        self.search_option = tk.StringVar()
+        self.search_option = tk.StringVar(value='Nombre')
         self.search_input = tk.StringVar()
+        self.max_missing = tk.IntVar(value=0)
         
         self.edited_row = None
         self.edit_flag = False
         
         self.added_row = None
         self.new_flag = False
+
+        self.filter_query = None
+        self.filter_flag = False
+
+        # BUSQUEDA MIENTRAS SE ESCRIBE
+        self.type_ahead_job = None
+        self.name_cache = SearchCache(
+            can_refine=lambda query: bool(full_text_terms(query)),
+            matcher=self.name_filter)
+        self.search_input.trace_add('write', self.on_search_typed)
         
         self.treeview_content = []
 
-        self.db_utils = DBUtils()
-        self.db_utils.connect()
+        # PAGINACION DEL LISTADO (KEYSET POR ID)
+        self.last_recipe_id = 0
+        self.more_pages = True
+        self.paging = True
+        self.loading_page = False
+        self.replace_rows = False
+
+        # LAS CONSULTAS CORREN EN SEGUNDO PLANO
+        self.worker = DBWorker(parent, on_busy=self.set_busy)
+
+        # INDICES EN MEMORIA, SE CONSTRUYEN EN SEGUNDO PLANO AL INICIAR
+        self.catalog = get_catalog()
+        self.worker.submit(self.catalog.ensure_loaded, on_error=self.show_db_error)
+        # LA LIMPIEZA DE HUERFANOS ESPERA A LA PRIMERA PAGINA, PARA NO OCUPAR EL OTRO HILO DEL WORKER
+        self.gc_pending = True
 
         # MAIN WINDOW
         parent.geometry('1280x720')
@@ -71,10 +110,14 @@ class App(ttk.Frame):
             - "Ver": Opens a new window to view the details of a recipe.
             - "Eliminar": Deletes the selected recipe from the database.
             - "Actualizar": Refreshes the displayed recipe list in the treeview.
+            - "Filtros": Opens the advanced filter panel.
 
         This method is typically called during the initialization of the main window to
         set up the user interface for managing recipes.
         """
+        # FILTROS AVANZADOS
+        ttk.Button(self.parent, text="Filtros", command=self.advanced_filter).grid(
+            row=0, column=0, padx=10, pady=5, sticky=(tk.NSEW))
         # CREAR NUEVA RECETA
         ttk.Button(self.parent, text="Nueva", command=self.new_recipe).grid(
             row=1, column=0, padx=10, pady=5, sticky=(tk.NSEW))
@@ -92,7 +135,8 @@ class App(ttk.Frame):
             row=5, column=0, padx=10, pady=5, sticky=(tk.NSEW))
         
         ttk.Combobox(self.parent, textvariable=self.search_option, 
-            values=['Nombre', 'Etiquetas', 'Tiempo de Preparacion', 'Ingredientes'], justify=tk.RIGHT).grid(row=0, column=1, padx=10, pady=5, sticky=tk.NSEW)
+            values=['Nombre', 'Etiquetas', 'Tiempo de Preparacion', 'Ingredientes', 'Texto completo',
+                    'Ingredientes/Etiquetas (AND/OR/NOT)', 'Que puedo cocinar', 'Difusa'], justify=tk.RIGHT).grid(row=0, column=1, padx=10, pady=5, sticky=tk.NSEW)
         ttk.Entry(self.parent, textvariable=self.search_input, justify=tk.RIGHT).grid(
             row=0, column=2, padx=5, pady=5, sticky=tk.NSEW)
         ttk.Button(self.parent, text="Buscar", command=self.search).grid(
@@ -100,12 +144,23 @@ class App(ttk.Frame):
         ttk.Button(self.parent, text="Reset", command=self.recover_treeview_data).grid(
             row=0, column=4, padx=10, pady=5, sticky=(tk.NSEW))
 
-    def create_tree(self) -> ttk.Treeview:
-        """Creates and configures a Treeview widget for displaying recipe information.
+        # INGREDIENTES QUE PUEDEN FALTAR EN 'QUE PUEDO COCINAR'
+        missing_frame = ttk.Frame(self.parent)
+        missing_frame.grid(row=6, column=0, padx=10, pady=5, sticky=tk.NSEW)
+        ttk.Label(missing_frame, text='Faltantes').pack(side=tk.LEFT)
+        ttk.Spinbox(missing_frame, from_=0, to=10, width=3, textvariable=self.max_missing).pack(side=tk.RIGHT)
+
+        # INDICADOR DE CONSULTAS EN CURSO
+        self.busy_bar = ttk.Progressbar(self.parent, mode='indeterminate')
+        self.busy_bar.grid(row=6, column=1, columnspan=5, padx=5, sticky=tk.EW)
+        self.busy_bar.grid_remove()
+
+    def create_tree(self) -> VirtualTreeview:
+        """Creates and configures a virtual Treeview widget for displaying recipe information.
 
-        This method creates a Treeview widget with specified columns to display the details
-        of recipes in a tabular format. The widget is set up to show only the headings at
-        the top and to display data in multiple columns.
+        This method creates a `VirtualTreeview` with specified columns to display the details
+        of recipes in a tabular format. The rows are kept in an in-memory row store and only
+        the visible ones exist as Tk items, so the list stays fast with any number of recipes.
 
         Columns:
             - 'ID': The unique identifier of the recipe.
@@ -121,11 +176,12 @@ class App(ttk.Frame):
         The column widths are adjusted to ensure the information is presented clearly.
 
         The Treeview is also equipped with a vertical scrollbar to navigate through the
-        recipe list when there are more entries than the widget can display.
+        recipe list when there are more entries than the widget can display. Scrolling near
+        the bottom of the list loads the next page of recipes (see `on_list_end`).
 
         Returns
         -------
-            ttk.Treeview: The configured Treeview widget for displaying recipe information.
+            VirtualTreeview: The configured widget for displaying recipe information.
 
         Note
         ----
@@ -135,7 +191,8 @@ class App(ttk.Frame):
         # NUMERO DE COLUMNAS Y NOMBRES
         columns = ('ID', 'Nombre', 'Ingredientes', 'Tiempo de Preparacion', 'Tiempo de Coccion', 'Creado')
         # CREA EL WIDGET
-        tree = ttk.Treeview(self.parent, columns=columns, show='headings')
+        virtual_tree = VirtualTreeview(self.parent, columns, row_height=30, on_near_end=self.on_list_end)
+        tree = virtual_tree.tree
         # INSERTARLO EN LA GRILLA
         tree.grid(row=1, column=1, sticky=(tk.NSEW), pady=10, padx=5, columnspan=4, rowspan=5)
         # INSERTAR EL ENCABEZADO
@@ -159,27 +216,106 @@ class App(ttk.Frame):
         tree.column(5, anchor=tk.CENTER, stretch=tk.NO, width=140)
 
         # AGREGAR SCROLLBAR
-        scrollbar = ttk.Scrollbar(self.parent, orient=tk.VERTICAL, command=tree.yview)
-        tree.configure(yscroll=scrollbar.set)
-        scrollbar.grid(row=1, column=5, sticky=tk.NS, pady=10, rowspan=5)
+        virtual_tree.scrollbar.grid(row=1, column=5, sticky=tk.NS, pady=10, rowspan=5)
 
-        return tree
+        return virtual_tree
 
     def read_data(self) -> None:
-        """Reads recipe data from the database and populates the Treeview.
+        """Reads the first page of recipes from the database and populates the Treeview.
+
+        This method resets the pagination state and loads the first page of recipes, so the
+        time until the first rows are shown does not depend on the size of the recipe book.
+        Further pages are loaded by `on_list_end` as the user scrolls down. The Treeview
+        should be already created using the `create_tree` method before calling this function.
+
+        The rows already displayed are kept until the first page arrives and then replaced
+        in place, so reloading the list does not blank the Treeview.
+        """
+        self.worker.cancel('page')
+        self.loading_page = False
+        self.last_recipe_id = 0
+        self.more_pages = True
+        self.paging = True
+        self.replace_rows = True
+        self.load_next_page()
+
+    def load_next_page(self) -> None:
+        """Loads the next page of recipes and appends it to the Treeview.
+
+        The page starts after the last recipe ID already shown (keyset pagination). The query
+        runs on the background worker and the rows are appended by `append_page`.
+        """
+        if not self.more_pages or self.loading_page:
+            return
+        self.loading_page = True
+        self.worker.submit(DBUtils.read_recipes_page, self.last_recipe_id, self.PAGE_SIZE,
+                           on_done=self.append_page, on_error=self.page_failed, key='page')
+
+    def append_page(self, recipes: list) -> None:
+        """Appends a page of recipes loaded by `load_next_page` to the Treeview.
+
+        When the database returns fewer rows than `PAGE_SIZE`, there are no more pages to load.
+        Pages that arrive while search results are displayed are discarded. The startup pass of
+        the orphan collector is submitted after the first page, so it never delays it.
+
+        Parameters
+        ----------
+            recipes (list): The recipes of the page, as returned by `DBUtils.read_recipes_page`.
+        """
+        self.loading_page = False
+        if self.gc_pending:
+            # BORRA INGREDIENTES Y PASOS HUERFANOS DE VENTANAS CANCELADAS. NO ES CRITICO, LOS ERRORES SE IGNORAN
+            self.gc_pending = False
+            self.worker.submit(db_gc.startup_pass, on_error=lambda error: None)
+        if not self.paging:
+            return
+        rows = [
+            [recipe[0], recipe[1], recipe[5], f'{recipe[2]} min', f'{recipe[3]} min', recipe[4]]
+            for recipe in recipes
+        ]
+        if self.replace_rows:
+            self.replace_rows = False
+            self.tree.set_rows(rows)
+        else:
+            self.tree.append_rows(rows)
+        if recipes:
+            self.last_recipe_id = recipes[-1][0]
+        self.more_pages = len(recipes) == self.PAGE_SIZE
+
+    def page_failed(self, error: Exception) -> None:
+        """Shows the error raised while loading a page and allows the page to be retried."""
+        self.loading_page = False
+        self.show_db_error(error)
+
+    def set_busy(self, busy: bool) -> None:
+        """Shows or hides the busy indicator while there are queries running in the background.
+
+        Parameters
+        ----------
+            busy (bool): True when the first background query starts, False when the last one ends.
+        """
+        if busy:
+            self.busy_bar.grid()
+            self.busy_bar.start(10)
+            self.parent.config(cursor='watch')
+        else:
+            self.busy_bar.stop()
+            self.busy_bar.grid_remove()
+            self.parent.config(cursor='')
 
-        This method retrieves the recipe data from the database using the `db_utils` object
-        and populates the Treeview widget with the retrieved data. The Treeview should be
-        already created using the `create_tree` method before calling this function.
+    def show_db_error(self, error: Exception) -> None:
+        """Shows an error raised by a background query."""
+        msg.showerror(message=f'Error: {error}', title='Base de datos', parent=self.parent)
 
-        The retrieved data includes the ID, name, ingredients, preparation time, cooking
-        time, and creation date for each recipe. The data is formatted appropriately before
-        being inserted into the Treeview.
+    def on_list_end(self) -> None:
+        """Loads the next page when the recipe list is scrolled near its end.
+
+        This method is called by the `VirtualTreeview` when its viewport reaches the last
+        loaded rows. Pages are only loaded while the full recipe list is shown, not while
+        search results are displayed.
         """
-        self.recipe_list = self.db_utils.read_recipes()
-        for recipe in self.recipe_list:
-            data = [recipe[0], recipe[1], recipe[5], f'{recipe[2]} min', f'{recipe[3]} min', recipe[4]]
-            self.tree.insert('', tk.END, values= data)
+        if self.paging and self.more_pages:
+            self.after_idle(self.load_next_page)
 
     #CRUD
     def new_recipe(self) -> None:
@@ -194,7 +330,8 @@ class App(ttk.Frame):
         `NewRecipe` window.
 
         If a new recipe is successfully added (`new_flag` is set to `True`), the method
-        formats the recipe data and inserts it into the Treeview.
+        formats the recipe data and inserts it into the Treeview. If there are pages left to
+        load, the new recipe is not inserted, since it will arrive with the last page.
 
         Note:
             The `NewRecipe` window should handle the actual saving of the new recipe data.
@@ -203,11 +340,16 @@ class App(ttk.Frame):
             Exception: If an error occurs while adding a new recipe, an error message is
             displayed using the `msg.showerror` function.
         """
+        toplevel = None
         try:
             toplevel = tk.Toplevel(self.parent)
             new_recipe_window = NewRecipe(toplevel, 'Agregar Receta', self).grid()
             toplevel.wait_window(new_recipe_window)
             if self.new_flag:
+                self.sync_recipe_indexes(self.added_row['id'])
+            if self.new_flag and self.more_pages:
+                self.new_flag = False
+            elif self.new_flag:
                 ingredients = ''
                 for ingredient_details in self.added_row['ingredients']:
                     ingredients += f'{ingredient_details[1]},'
@@ -219,17 +361,19 @@ class App(ttk.Frame):
                     f"{self.added_row['cook_time']} min",
                     self.added_row['created_at']
                 )
-                self.tree.insert('', tk.END, values=new_value)
+                self.tree.append_rows([new_value])
                 self.new_flag = False
+        except PoolTimeoutError as e:
+            self.window_failed(toplevel, 'Nueva Receta', e)
         except Exception as e:
             msg.showerror(message=f'Error: {e}', title='Nueva Receta', parent = self.parent)
 
     def edit_recipe(self) -> None:
         """Opens a window to edit the selected recipe and updates the recipe list.
 
-        This method is triggered when the user clicks the 'Edit Recipe' button. It opens
-        a new window to allow the user to edit the details of the selected recipe. After
-        editing, the recipe list is updated with the new values.
+        This method is triggered when the user clicks the 'Edit Recipe' button. The recipe
+        is read on the background worker, and `open_edit_window` opens the window once it
+        arrives.
 
         Raises
         ------
@@ -237,32 +381,46 @@ class App(ttk.Frame):
             button, this exception is raised, and an error message is shown to the user.
         """
         try:
-            item = self.get_recipe_id()
-            id = item[0]
-            row = item[1]
-            toplevel = tk.Toplevel(self.parent)
-            edit_window = EditRecipe(toplevel, 'Editar Receta', id, self).grid()
-            toplevel.wait_window(edit_window)
-            if self.edit_flag:
-                new_value = (
-                    id, 
-                    self.edited_row[0], 
-                    self.edited_row[1], 
-                    f'{self.edited_row[2]} min', 
-                    f'{self.edited_row[3]} min', 
-                    self.tree.item(row)['values'][5]
-                )
-                self.tree.item(row, values=new_value)
-                self.edit_flag = False
+            id, row = self.get_recipe_id()
+            # LA VENTANA ESPERA A SU CIERRE: SE ABRE FUERA DE LA ENTREGA DE RESULTADOS DEL WORKER
+            self.worker.submit(DBUtils.get_recipe_by_id, id,
+                               on_done=lambda recipe: self.after_idle(self.open_edit_window, recipe, row),
+                               on_error=self.show_db_error, key='open')
         except IndexError:
             msg.showerror(message='No ha seleccionado ningun item, haga click sobre un item y presione el boton.', title='Editar Receta', parent = self.parent)
 
+    def open_edit_window(self, recipe: dict, row: int) -> None:
+        """Opens the window to edit a recipe read by `edit_recipe` and, once it is closed,
+        updates the row of the recipe list with the saved values.
+
+        Parameters
+        ----------
+            recipe (dict): The recipe, as returned by `DBUtils.get_recipe_by_id`.
+            row (int): The index of the recipe in the Treeview's row store.
+        """
+        id = recipe['id']
+        toplevel = tk.Toplevel(self.parent)
+        edit_window = EditRecipe(toplevel, 'Editar Receta', recipe, self).grid()
+        toplevel.wait_window(edit_window)
+        if self.edit_flag:
+            self.sync_recipe_indexes(id)
+            new_value = (
+                id, 
+                self.edited_row[0], 
+                self.edited_row[1], 
+                f'{self.edited_row[2]} min', 
+                f'{self.edited_row[3]} min', 
+                self.tree.get_row(row)[5]
+            )
+            self.tree.update_row(row, new_value)
+            self.edit_flag = False
+
     def delete_recipe(self) -> None:
         """Deletes the selected recipe from the database and refreshes the recipe list.
 
         This method is triggered when the user clicks the 'Delete Recipe' button. It
-        retrieves the selected recipe's ID, deletes the recipe from the database, and then
-        refreshes the recipe list to reflect the changes.
+        retrieves the selected recipe's ID and deletes the recipe from the database on the
+        background worker. Once deleted, `recipe_deleted` refreshes the recipe list.
 
         Raises
         ------
@@ -271,41 +429,73 @@ class App(ttk.Frame):
         """
         try:
             select_item = self.get_recipe_id()
-            self.db_utils.delete_recipe(select_item[0])
-            self.refresh_recipe_tree()
-            msg.showinfo(message='Receta eliminada con exito, actualice la lista', title='Eliminar Receta', parent = self.parent)
+            self.worker.submit(DBUtils.delete_recipe, select_item[0],
+                               on_done=lambda result: self.recipe_deleted(select_item[0]), on_error=self.show_db_error)
         except IndexError:
             msg.showerror(message='No ha seleccionado ningun item, haga click sobre un item y presione el boton.', title='Eliminar Receta', parent=self.parent)
     
+    def recipe_deleted(self, recipe_id: int) -> None:
+        """Refreshes the recipe list once the background worker has deleted a recipe."""
+        self.sync_recipe_indexes(recipe_id)
+        self.refresh_recipe_tree()
+        msg.showinfo(message='Receta eliminada con exito, actualice la lista', title='Eliminar Receta', parent = self.parent)
+
+    def sync_recipe_indexes(self, recipe_id: int) -> None:
+        """Updates the in-memory indexes of the catalog after a recipe was created, edited or deleted.
+
+        The cached search-as-you-type results are discarded too.
+
+        Parameters
+        ----------
+            recipe_id (int): The ID of the recipe that changed.
+        """
+        self.name_cache.clear()
+        self.worker.submit(self.catalog.sync_recipe, recipe_id, on_error=self.show_db_error)
+
     def read_recipe(self) -> None:
         """Displays the details of the selected recipe in a new window.
 
-        This method is triggered when the user clicks the 'Read Recipe' button. It opens
-        a new window and displays the details of the selected recipe, such as its
-        ingredients and cooking instructions.
+        This method is triggered when the user clicks the 'Read Recipe' button. The recipe
+        is read on the background worker, and `open_read_window` displays its details,
+        such as its ingredients and cooking instructions, once it arrives.
 
         Raises:
             IndexError: If no recipe item is selected before clicking the 'Read Recipe'
             button, this exception is raised, and an error message is shown to the user.
         """
         try: 
-            item = self.get_recipe_id()
-            id = item[0]
-            toplevel = tk.Toplevel(self.parent)
-            ReadRecipe(toplevel, 'Leer Receta', id).grid()
+            id = self.get_recipe_id()[0]
+            self.worker.submit(DBUtils.get_recipe_by_id, id, on_done=self.open_read_window,
+                               on_error=self.show_db_error, key='open')
         except IndexError:
             msg.showerror(
                 message='No ha seleccionado ningun item, haga click sobre un item y presione el boton.', title='Ver Receta', parent=self.parent)
 
+    def open_read_window(self, recipe: dict) -> None:
+        """Opens the window that displays a recipe read by `read_recipe`."""
+        toplevel = tk.Toplevel(self.parent)
+        ReadRecipe(toplevel, 'Leer Receta', recipe, self.worker).grid()
+
+    def window_failed(self, toplevel: tk.Toplevel, title: str, error: Exception) -> None:
+        """Closes a recipe window that could not get a database connection and shows the error.
+
+        Parameters
+        ----------
+            toplevel (tk.Toplevel): The window, or None if it was not created.
+            title (str): The title of the error message.
+            error (Exception): The PoolTimeoutError raised while the window read the database.
+        """
+        if toplevel is not None:
+            toplevel.destroy()
+        msg.showerror(message=f'La base de datos esta ocupada, intente de nuevo. {error}', title=title, parent=self.parent)
+
     def refresh_recipe_tree(self) -> None:
         """Refreshes the recipe list in the Treeview widget.
 
-        This method updates the recipe list displayed in the Treeview widget. It clears
-        the existing content of the widget, creates a new Treeview, and then reads the
-        data from the database to populate the widget with up-to-date recipe information.
+        This method reads the data from the database again to populate the widget with
+        up-to-date recipe information. The same Treeview is reused: its rows are replaced
+        in place once the first page arrives.
         """
-        self.tree.delete(*self.tree.get_children())
-        self.tree = self.create_tree()
         self.read_data()
 
     def recover_treeview_data(self):
@@ -314,41 +504,44 @@ class App(ttk.Frame):
         This method checks if there is any previously stored content for the Treeview
         widget. If there is no stored data, it displays a message to inform the user
         that the recipe book is up to date. Otherwise, it clears the existing content of
-        the Treeview, and then populates it with the previously stored data.
+        the Treeview, and then populates it with the previously stored data. A search
+        still running is cancelled, so its results do not replace the restored list.
         """
+        self.worker.cancel('search')
         if len(self.treeview_content) == 0:
             msg.showinfo(
                 message='El recetario esta al dia', title='Recetas', parent=self.parent)
         else:
-            self.tree.delete(*self.tree.get_children())
-            for recipe in self.treeview_content:
-                self.tree.insert('', tk.END, values=recipe)
+            self.tree.set_rows(self.treeview_content)
             self.treeview_content = []
+            self.paging = True
 
     def save_treeview(self):
         """Saves the content of the Treeview widget to a temporary storage.
 
-        This method iterates through all the items in the Treeview widget and saves their
-        recipe details to a temporary storage list called 'treeview_content'. The stored
-        content can later be used for recovery or other purposes.
+        This method copies the rows of the Treeview's row store to a temporary storage list
+        called 'treeview_content'. The stored content can later be used for recovery or other
+        purposes.
+
+        Only the recipe list is saved: while search results are displayed, the list saved
+        before the first search is kept, so consecutive searches do not pile up rows.
         """
-        for item in self.tree.get_children():
-            recipe = self.tree.item(item, "values")
-            self.treeview_content.append(recipe)
+        if self.paging:
+            self.treeview_content = self.tree.get_rows()
 
     def get_recipe_id(self) -> int:
-        """Retrieves the ID of the selected recipe and its associated Treeview item.
+        """Retrieves the ID of the selected recipe and its index in the Treeview's row store.
 
-        This method gets the ID of the selected recipe and the associated Treeview item
-        that represents the recipe. It is typically used when performing operations on a
+        This method gets the ID of the selected recipe and the index of the row that
+        represents the recipe. It is typically used when performing operations on a
         specific recipe, such as editing or deleting it.
 
         Returns
         -------
             int: The ID of the selected recipe.
         """
-        select_item = self.tree.focus()
-        return self.tree.item(select_item)['values'][0], select_item
+        index, values = self.tree.selected()
+        return values[0], index
 
     def search(self) -> None:
         """Performs a search based on the selected option.
@@ -358,7 +551,11 @@ class App(ttk.Frame):
         search operation to find recipes that match the specified criteria.
 
         The search options include 'Nombre' (Name), 'Etiquetas' (Tags), 'Tiempo de
-        Preparacion' (Preparation Time), and 'Ingredientes' (Ingredients).
+        Preparacion' (Preparation Time), 'Ingredientes' (Ingredients) and 'Texto completo'
+        (Full text: names, steps and ingredients, ranked by relevance) and 'Ingredientes/
+        Etiquetas (AND/OR/NOT)' (a boolean query over ingredient and tag names) and 'Que
+        puedo cocinar' (recipes covered by a comma-separated list of ingredients on hand)
+        and 'Difusa' (recipe, ingredient or tag names spelled almost like the input).
 
         If an invalid search option is selected, an error message is displayed.
         """
@@ -372,10 +569,18 @@ class App(ttk.Frame):
             self.search_by_prep_time(search_in)
         elif option == 'Ingredientes':
             self.search_by_ingredients(search_in)
+        elif option == 'Texto completo':
+            self.search_full_text(search_in)
+        elif option == 'Ingredientes/Etiquetas (AND/OR/NOT)':
+            self.search_by_terms(search_in)
+        elif option == 'Que puedo cocinar':
+            self.search_by_pantry(search_in)
+        elif option == 'Difusa':
+            self.search_fuzzy(search_in)
         else:
             msg.showerror(title='Buscar', message='Error! Escoja una opcion valida')
 
-    def read_search_data(self, recipes: list) -> None:
+    def read_search_data(self, recipes: list, warn_empty: bool = True) -> None:
         """Displays search results in the Treeview widget.
 
         This method is responsible for displaying the search results in the Treeview
@@ -386,16 +591,108 @@ class App(ttk.Frame):
         ----------
             recipes (list): A list of recipes retrieved from the database that match the
             search criteria.
+            warn_empty (bool): If False, an empty result empties the Treeview instead of
+            showing a warning. Used while the user is typing.
         """
-        if len(recipes) != 0:
-            self.tree = self.create_tree()
-            for recipe in recipes:
-                data = [recipe[0], recipe[1], recipe[5], f'{recipe[2]} min', f'{recipe[3]} min', recipe[4]]
-                self.tree.insert('', tk.END, values=data)
+        if len(recipes) != 0 or not warn_empty:
+            self.paging = False
+            self.tree.set_rows(
+                [recipe[0], self.result_name(recipe), recipe[5], f'{recipe[2]} min', f'{recipe[3]} min', recipe[4]]
+                for recipe in recipes
+            )
         else:
             msg.showwarning(
                 title='Buscar', message='No se ha encontrado coincidencias', parent=self.parent)
 
+    def result_name(self, recipe: tuple) -> str:
+        """Returns the name shown for a search result, with the missing ingredients of a pantry search."""
+        # LA BUSQUEDA POR DESPENSA AGREGA LA CANTIDAD DE INGREDIENTES FALTANTES
+        if len(recipe) > 6 and recipe[6]:
+            return f'{recipe[1]} (faltan {recipe[6]})'
+        return recipe[1]
+
+    def on_search_typed(self, *args) -> None:
+        """Schedules a search-as-you-type after the user stops typing for a moment.
+
+        This method is called on every change of the search field. Each keystroke
+        reschedules the search, so only the text typed after a pause of
+        `TYPE_AHEAD_DELAY` milliseconds is searched.
+        """
+        if self.type_ahead_job is not None:
+            self.after_cancel(self.type_ahead_job)
+        self.type_ahead_job = self.after(self.TYPE_AHEAD_DELAY, self.type_ahead)
+
+    def type_ahead(self) -> None:
+        """Searches recipes by name with the text typed so far and displays the results.
+
+        Only the 'Nombre' option is searched while typing; the other options still use the
+        'Buscar' button. Queries already searched, and queries that extend a previous one
+        with few enough results, are answered from `name_cache` without querying the
+        database (see `SearchCache`). Otherwise the search
+        runs on the background worker and supersedes any search still running. Emptying
+        the search field restores the recipe list.
+        """
+        self.type_ahead_job = None
+        if self.search_option.get() != 'Nombre':
+            return
+        text = self.search_input.get().strip()
+        if not text:
+            self.worker.cancel('search')
+            if self.treeview_content:
+                self.recover_treeview_data()
+            return
+        cached = self.name_cache.get(text)
+        if cached is not None:
+            self.worker.cancel('search')
+            self.worker.cancel('page')
+            self.loading_page = False
+            self.save_treeview()
+            self.read_search_data(cached, warn_empty=False)
+        else:
+            self.run_search(DBUtils.search_by_name, text, on_done=lambda recipes: self.show_typed_results(text, recipes))
+
+    def show_typed_results(self, text: str, recipes: list) -> None:
+        """Caches and displays the results of a search-as-you-type."""
+        self.name_cache.put(text, recipes)
+        self.read_search_data(recipes, warn_empty=False)
+
+    def name_filter(self, text: str):
+        """Returns a function that checks whether a recipe row of the Treeview matches a name search for 'text'."""
+        matches = name_matcher(text)
+        return lambda recipe: matches(recipe[1])
+
+    def run_search(self, query, *args, on_done=None) -> None:
+        """Runs a search on the background worker and displays its results.
+
+        The current content of the Treeview is saved so it can be restored with 'Reset'. A
+        page of the recipe list still loading is cancelled, and so is any previous search
+        still running: only the results of the latest search are displayed.
+
+        Parameters
+        ----------
+            query (callable): The search to run. It receives the worker's `DBUtils` and the
+            search arguments, like the `DBUtils` search methods.
+            *args: The search term, followed by any other argument of the search.
+            on_done (callable, optional): Called with the results instead of
+            `read_search_data`.
+        """
+        self.worker.cancel('page')
+        self.loading_page = False
+        self.save_treeview()
+        self.worker.submit(query, *args, on_done=on_done or self.read_search_data,
+                           on_error=self.search_failed, key='search')
+
+    def search_failed(self, error: Exception) -> None:
+        """Shows the error raised by a search: a warning for a malformed query or an index still loading, an error
+        otherwise."""
+        if isinstance(error, QuerySyntaxError):
+            msg.showwarning(title='Buscar', message=f'Busqueda invalida: {error}', parent=self.parent)
+        elif isinstance(error, CatalogLoadingError):
+            msg.showinfo(title='Buscar', message='El indice de busqueda se esta cargando, intente de nuevo en unos segundos.',
+                         parent=self.parent)
+        else:
+            self.show_db_error(error)
+
     def search_by_name(self, name: str) -> None:
         """Searches recipes by name and displays the results.
 
@@ -407,11 +704,7 @@ class App(ttk.Frame):
         ----------
             name (str): The name of the recipe to search for.
         """
-        self.db_utils.disconnect()
-        self.db_utils.connect()
-        self.save_treeview()
-        found_recipes = self.db_utils.search_by_name(name)
-        self.read_search_data(found_recipes)
+        self.run_search(DBUtils.search_by_name, name)
 
     def search_by_tags(self, tags: str) -> None:
         """Searches recipes by tags and displays the results.
@@ -424,30 +717,27 @@ class App(ttk.Frame):
         ----------
             tags (str): The tags to search for.
         """
-        self.db_utils.disconnect()
-        self.db_utils.connect()
-        self.save_treeview()
-        found_recipes  = self.db_utils.search_by_tags(tags)
-        self.read_search_data(found_recipes)
+        self.run_search(DBUtils.search_by_tags, tags)
 
     def search_by_prep_time(self, prep_time: str) -> None:
         """Searches recipes by preparation time and displays the results.
 
         This method performs a search for recipes by preparation time. It takes the
-        input 'prep_time' as the search keyword and queries the database for recipes
-        that have matching preparation times. The search results are then displayed
-        in the Treeview widget.
+        input 'prep_time' as the maximum preparation time and queries the database for
+        recipes that can be prepared in that time or less. The search results are then
+        displayed in the Treeview widget.
 
         Parameters
         ----------
-            prep_time (str): The preparation time to search for. It should be a string
-            representing the preparation time in minutes.
+            prep_time (str): The maximum preparation time to search for. It should be a
+            string representing the preparation time in minutes.
         """
-        self.db_utils.disconnect()
-        self.db_utils.connect()
-        self.save_treeview()
-        found_recipes = self.db_utils.search_by_prep_time(prep_time)
-        self.read_search_data(found_recipes)
+        try:
+            query = RecipeQuery().prep_time(maximum=int(prep_time)).limit(DBUtils.SEARCH_LIMIT)
+        except ValueError:
+            msg.showerror(title='Buscar', message='Error! El tiempo de preparacion debe ser un numero', parent=self.parent)
+            return
+        self.run_search(DBUtils.search_by_filter, query)
 
     def search_by_ingredients(self, ingredients: str) -> None:
         """Searches recipes by ingredients and displays the results.
@@ -461,20 +751,83 @@ class App(ttk.Frame):
         ----------
             ingredients (str): The ingredients to search for.
         """
-        self.db_utils.disconnect()
-        self.db_utils.connect()
-        self.save_treeview()
-        found_recipes = self.db_utils.search_by_ingredient(ingredients)
-        self.read_search_data(found_recipes)
+        self.run_search(DBUtils.search_by_ingredient, ingredients)
+
+    def search_full_text(self, text: str) -> None:
+        """Searches the names, steps and ingredients of the recipes and displays the results.
+
+        The results are ranked by relevance, most relevant first. Each word of 'text' is
+        matched as the beginning of a word, ignoring case and accents.
+
+        Parameters
+        ----------
+            text (str): The words to search for.
+        """
+        self.run_search(DBUtils.search_full_text, text)
+
+    def advanced_filter(self) -> None:
+        """Opens the advanced filter panel and displays the recipes matching the filter.
+
+        The `AdvancedFilter` window is displayed as a modal window. If the user applies a
+        filter (`filter_flag` is set to `True`), every criterion is resolved by a single
+        query through `DBUtils.search_by_filter`.
+        """
+        toplevel = tk.Toplevel(self.parent)
+        filter_window = AdvancedFilter(toplevel, self).grid()
+        toplevel.wait_window(filter_window)
+        if self.filter_flag:
+            self.filter_flag = False
+            self.run_search(DBUtils.search_by_filter, self.filter_query.limit(DBUtils.SEARCH_LIMIT))
+
+    def search_by_terms(self, expression: str) -> None:
+        """Searches recipes with a boolean query over ingredient and tag names.
+
+        The query is answered by the in-memory index of the recipe catalog, for example
+        'pollo AND limon NOT picante' or '(pollo OR pavo) AND arroz'.
+
+        Parameters
+        ----------
+            expression (str): The boolean query.
+        """
+        self.run_search(self.catalog.search_terms, expression)
+
+    def search_fuzzy(self, text: str) -> None:
+        """Searches recipes tolerating typos and displays the results.
+
+        The recipes whose name, ingredients or tags are spelled almost like 'text' are
+        displayed, the closest matches first ('berengena' finds 'berenjena').
+
+        Parameters
+        ----------
+            text (str): The name to search for.
+        """
+        self.run_search(self.catalog.search_fuzzy, text)
+
+    def search_by_pantry(self, pantry: str) -> None:
+        """Searches the recipes that can be cooked with the ingredients on hand.
+
+        The recipes missing at most the number of ingredients chosen in 'Faltantes' are
+        displayed, those missing fewer ingredients first.
+
+        Parameters
+        ----------
+            pantry (str): The comma-separated names of the ingredients on hand.
+        """
+        try:
+            max_missing = self.max_missing.get()
+        except tk.TclError:
+            msg.showerror(title='Buscar', message='Error! La cantidad de faltantes debe ser un numero', parent=self.parent)
+            return
+        self.run_search(self.catalog.search_pantry, pantry, max_missing)
 
     def __del__(self):
         """Destructor method to disconnect from the database.
 
         This special method is automatically called when the instance of the class is
-        being deleted. It ensures that the connection to the database is properly
-        closed and resources are released.
+        being deleted. It stops the background worker, which returns its connections to
+        the pool.
         """
-        self.db_utils.disconnect()
+        self.worker.shutdown()
 
 
 root = tk.Tk()
@@ -0,0 +1,293 @@
+"""In-Memory Recipe Catalog for Recipe Manager
+
+The catalog keeps the in-memory search indexes of 'search_index.py' for the whole application. It is built once from
+the database, shared by every window, and kept in sync by re-reading a single recipe after it is created, edited or
+deleted. The indexes are built without blocking the searches: until the first load ends, a search raises
+CatalogLoadingError instead of waiting for it.
+
+Every method that touches the database receives a connected DBUtils as its first argument, so the methods can be
+submitted directly to a DBWorker.
+"""
+
+from src.utils.search_index import InvertedIndex, PantryIndex, PrefixIndex
+from src.utils.similarity_index import SimilarityIndex
+from src.utils.fuzzy_index import FuzzyIndex
+import itertools
+import threading
+
+
+class CatalogLoadingError(RuntimeError):
+    """Raised by a search while the indexes of the catalog are still being built."""
+
+
+class RecipeCatalog:
+    """The in-memory indexes of the recipe catalog.
+
+    Attributes
+    ----------
+        terms (InvertedIndex): The recipes of each ingredient and tag name.
+        pantry (PantryIndex): The ingredients of each recipe, as bitsets.
+        similarity (SimilarityIndex): The MinHash signatures of the ingredients and tags of each recipe.
+        fuzzy (FuzzyIndex): The trigrams of the recipe, ingredient and tag names, for typo-tolerant search.
+        ingredient_names (PrefixIndex): Every ingredient name, for autocompletion. It is loaded on its own by
+            `load_ingredient_names`, the first time an ingredient window is opened, since it is only one query.
+        names_loading (bool): True while a thread is loading 'ingredient_names'.
+        names_added (list[str]): The ingredients created while 'ingredient_names' is being loaded.
+        loaded (bool): True once the recipe indexes have been built from the database.
+        loading (bool): True while a thread is building the indexes.
+        pending (set[int]): The recipes synced while the indexes are being built, re-read when the load ends.
+        syncing (dict[int, int]): The token of the latest sync of each recipe being read, so an older read that
+            ends later is discarded.
+        lock (threading.RLock): Serializes the swap of the loaded indexes, updates and queries, which run on the
+            worker threads. Database reads are done without holding it.
+        names_lock (threading.Lock): Serializes the loading and updates of 'ingredient_names'.
+    """
+    def __init__(self) -> None:
+        self.terms = InvertedIndex()
+        self.pantry = PantryIndex()
+        self.similarity = SimilarityIndex()
+        self.fuzzy = FuzzyIndex()
+        self.ingredient_names = None
+        self.names_loading = False
+        self.names_added = []
+        self.loaded = False
+        self.loading = False
+        self.pending = set()
+        self.syncing = {}
+        self.sync_tokens = itertools.count()
+        self.lock = threading.RLock()
+        self.names_lock = threading.Lock()
+
+    def load(self, db_utils) -> None:
+        """Builds every index from the database, replacing the current ones.
+
+        The rows are read and the new indexes built without holding the lock, so queries keep using the current
+        indexes (or fail fast with CatalogLoadingError on the first load) instead of waiting for the whole catalog.
+        The new indexes are swapped in under the lock, and the recipes synced meanwhile are re-read afterwards.
+        Does nothing if another thread is already loading the catalog.
+        """
+        with self.lock:
+            if self.loading:
+                return
+            self.loading = True
+            self.pending = set()
+        try:
+            terms = {}
+            ingredients = {}
+            tags = {}
+            for recipe_id, kind, term_id, name in db_utils.iter_recipe_terms():
+                terms.setdefault(recipe_id, []).append(name)
+                if kind == 'ingrediente':
+                    ingredients.setdefault(recipe_id, []).append(name)
+                else:
+                    tags.setdefault(recipe_id, []).append(name)
+            term_index = InvertedIndex()
+            for recipe_id, names in terms.items():
+                term_index.set_terms(recipe_id, names)
+            pantry = PantryIndex()
+            pantry.build(ingredients)
+            similarity = SimilarityIndex()
+            for recipe_id in terms:
+                similarity.set_recipe(recipe_id, ingredients.get(recipe_id, []), tags.get(recipe_id, []))
+            fuzzy = FuzzyIndex()
+            for recipe_id, name in db_utils.iter_recipe_names():
+                fuzzy.set_recipe(recipe_id, name, terms.get(recipe_id, []))
+        except BaseException:
+            with self.lock:
+                self.loading = False
+            raise
+        with self.lock:
+            self.terms = term_index
+            self.pantry = pantry
+            self.similarity = similarity
+            self.fuzzy = fuzzy
+            self.loaded = True
+            self.loading = False
+            pending, self.pending = self.pending, set()
+        # LAS RECETAS MODIFICADAS DURANTE LA CARGA PUEDEN HABER SIDO LEIDAS ANTES DEL CAMBIO
+        for recipe_id in pending:
+            self.sync_recipe(db_utils, recipe_id)
+
+    def ensure_loaded(self, db_utils) -> None:
+        """Builds the indexes if they have not been built yet."""
+        if not self.loaded:
+            self.load(db_utils)
+
+    def ready(self, db_utils) -> None:
+        """Makes sure the indexes can be queried, before a search.
+
+        Raises
+        ------
+            CatalogLoadingError: If the indexes are being built by another thread. If a previous load failed, the
+            catalog is loaded again by this thread instead.
+        """
+        if self.loaded:
+            return
+        if self.loading:
+            raise CatalogLoadingError('el indice de busqueda se esta cargando')
+        self.load(db_utils)
+        if not self.loaded:
+            raise CatalogLoadingError('el indice de busqueda se esta cargando')
+
+    def sync_recipe(self, db_utils, recipe_id: int) -> None:
+        """Re-reads a recipe after it was created, edited or deleted and updates the indexes.
+
+        The recipe is read without holding the lock, which is only taken to update the indexes. If the same recipe is
+        synced again before the read ends, only the latest read is applied. While the catalog is loading, the recipe
+        is re-read once the load ends; until the first load starts, nothing is done, since the recipe will be read
+        with the rest of the catalog.
+        """
+        with self.lock:
+            if self.loading:
+                self.pending.add(recipe_id)
+                return
+            if not self.loaded:
+                return
+            token = self.syncing[recipe_id] = next(self.sync_tokens)
+        recipe = db_utils.read_recipes_by_ids([recipe_id])
+        rows = list(db_utils.iter_recipe_terms(recipe_id))
+        with self.lock:
+            if self.syncing.get(recipe_id) != token:
+                return
+            del self.syncing[recipe_id]
+            if self.loading:
+                self.pending.add(recipe_id)
+                return
+            if recipe:
+                ingredients = [name for _, kind, term_id, name in rows if kind == 'ingrediente']
+                tags = [name for _, kind, term_id, name in rows if kind == 'etiqueta']
+                self.terms.set_terms(recipe_id, ingredients + tags)
+                self.pantry.set_ingredients(recipe_id, ingredients)
+                self.similarity.set_recipe(recipe_id, ingredients, tags)
+                self.fuzzy.set_recipe(recipe_id, recipe[0][1], ingredients + tags)
+            else:
+                self.terms.remove(recipe_id)
+                self.pantry.remove(recipe_id)
+                self.similarity.remove(recipe_id)
+                self.fuzzy.remove(recipe_id)
+
+    def search_terms(self, db_utils, expression: str) -> list:
+        """Finds the recipes matching a boolean query over ingredient and tag names.
+
+        Parameters
+        ----------
+            expression (str): A query such as 'pollo AND limon NOT picante'. See `InvertedIndex.query`.
+
+        Returns
+        -------
+            list: Up to DBUtils.SEARCH_LIMIT recipes, by ID, as tuples with the same elements returned by
+            `DBUtils.read_recipes_page`.
+
+        Raises
+        ------
+            QuerySyntaxError: If the query cannot be parsed.
+            CatalogLoadingError: If the indexes are still being built.
+        """
+        self.ready(db_utils)
+        with self.lock:
+            recipe_ids = self.terms.query(expression, db_utils.SEARCH_LIMIT)
+        return db_utils.read_recipes_by_ids(recipe_ids)
+
+    def search_pantry(self, db_utils, pantry: str, max_missing: int = 0) -> list:
+        """Finds the recipes that can be cooked with the ingredients on hand.
+
+        Parameters
+        ----------
+            pantry (str): The comma-separated names of the ingredients on hand.
+            max_missing (int): The maximum number of ingredients a recipe may be missing.
+
+        Returns
+        -------
+            list: Up to DBUtils.SEARCH_LIMIT recipes, ranked by fewest missing ingredients and then by coverage, as
+            tuples with the elements returned by `DBUtils.read_recipes_page` followed by the number of missing
+            ingredients.
+        """
+        self.ready(db_utils)
+        with self.lock:
+            matches = self.pantry.query(pantry.split(','), max_missing, db_utils.SEARCH_LIMIT)
+        missing = {recipe_id: count for recipe_id, count, total in matches}
+        recipes = db_utils.read_recipes_by_ids([recipe_id for recipe_id, count, total in matches])
+        return [recipe + (missing[recipe[0]],) for recipe in recipes]
+
+    def search_fuzzy(self, db_utils, text: str) -> list:
+        """Finds the recipes whose name, ingredients or tags are spelled like 'text', allowing a few typos.
+
+        Returns
+        -------
+            list: Up to DBUtils.SEARCH_LIMIT recipes, those with the fewest typos first, as tuples with the same
+            elements returned by `DBUtils.read_recipes_page`.
+        """
+        self.ready(db_utils)
+        with self.lock:
+            matches = self.fuzzy.search(text, db_utils.SEARCH_LIMIT)
+        return db_utils.read_recipes_by_ids([recipe_id for recipe_id, distance in matches])
+
+    def similar_recipes(self, db_utils, recipe_id: int, k: int = 5) -> list:
+        """Finds the recipes with the most ingredients and tags in common with the given one.
+
+        Parameters
+        ----------
+            recipe_id (int): The ID of the recipe.
+            k (int): The maximum number of recipes returned.
+
+        Returns
+        -------
+            list: The ID, name and similarity (between 0 and 1) of each similar recipe, most similar first.
+        """
+        self.ready(db_utils)
+        with self.lock:
+            matches = self.similarity.similar(recipe_id, k)
+        names = {recipe[0]: recipe[1] for recipe in db_utils.read_recipes_by_ids([id for id, score in matches])}
+        return [(id, names[id], score) for id, score in matches if id in names]
+
+    def load_ingredient_names(self, db_utils) -> None:
+        """Loads the ingredient names used by `suggest_ingredients`, if they have not been loaded yet.
+
+        It runs on the background worker. The names are read without holding 'names_lock', and the names created
+        meanwhile are added before the new index is swapped in.
+        """
+        with self.names_lock:
+            if self.ingredient_names is not None or self.names_loading:
+                return
+            self.names_loading = True
+            self.names_added = []
+        try:
+            names = PrefixIndex(db_utils.read_ingredient_names())
+        finally:
+            with self.names_lock:
+                self.names_loading = False
+                added, self.names_added = self.names_added, []
+        with self.names_lock:
+            for name in added:
+                names.add(name)
+            self.ingredient_names = names
+
+    def suggest_ingredients(self, prefix: str, limit: int = 10) -> list[str]:
+        """Returns up to 'limit' existing ingredient names starting with 'prefix', ignoring case and accents.
+
+        It never reads the database: until `load_ingredient_names` has run, there are no suggestions.
+        """
+        with self.names_lock:
+            if self.ingredient_names is None:
+                return []
+            return self.ingredient_names.suggest(prefix, limit)
+
+    def add_ingredient_name(self, name: str) -> None:
+        """Adds the name of a newly created ingredient to the suggestions, if they are loaded or being loaded."""
+        with self.names_lock:
+            if self.ingredient_names is not None:
+                self.ingredient_names.add(name)
+            elif self.names_loading:
+                self.names_added.append(name)
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> RecipeCatalog:
+    """Returns the process-wide recipe catalog, creating it (empty) on first use."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = RecipeCatalog()
+        return _catalog
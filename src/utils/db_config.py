@@ -17,3 +17,56 @@ DB_CONFIG = {
     'password': 'pass',
     'database': 'recipe_manager'
 }
+
+"""Connection pool settings shared by every DBUtils instance.
+
+POOL_CONFIG is a dictionary that holds the following keys:
+- 'size': The maximum number of open connections kept by the pool.
+- 'timeout': Seconds to wait for a free connection before giving up.
+- 'ping_interval': Seconds a connection may stay idle before it is pinged again before use.
+"""
+
+POOL_CONFIG = {
+    'size': 5,
+    'timeout': 10,
+    'ping_interval': 30
+}
+
+"""Recipe cache settings shared by every DBUtils instance.
+
+CACHE_CONFIG is a dictionary that holds the following keys:
+- 'size': The maximum number of formatted recipes kept in memory.
+- 'ttl': Seconds a cached recipe stays valid before it is read again from the database.
+"""
+
+CACHE_CONFIG = {
+    'size': 256,
+    'ttl': 300
+}
+
+"""Orphan collector settings, used by 'db_gc.py'.
+
+GC_CONFIG is a dictionary that holds the following keys:
+- 'grace_minutes': Minutes an unlinked ingredient or step is kept, since an open window may still link it. Steps are
+  counted from their last unlink and kept at least as long as NAME_CACHE_CONFIG['ttl'].
+- 'chunk_size': The maximum number of rows deleted per statement, which bounds how long rows stay locked.
+- 'max_chunks': The maximum number of chunks deleted per table by the pass the application runs at startup.
+"""
+
+GC_CONFIG = {
+    'grace_minutes': 60,
+    'chunk_size': 1000,
+    'max_chunks': 20
+}
+
+"""Tag and step name cache settings shared by every DBUtils instance, used by 'name_cache.py'.
+
+NAME_CACHE_CONFIG is a dictionary that holds the following keys:
+- 'size': The maximum number of names kept in memory for each table.
+- 'ttl': Seconds a cached name stays valid before it is read again from the database.
+"""
+
+NAME_CACHE_CONFIG = {
+    'size': 2048,
+    'ttl': 600
+}
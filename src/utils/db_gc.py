@@ -0,0 +1,181 @@
+"""Orphan Collector for Recipe Manager
+
+Earlier versions of the ingredient and step windows wrote their rows before the recipe they belong to was saved:
+- 'AddIngredient' inserted an 'ingredientes_receta' row with 'id_receta' NULL, linked when the recipe was saved.
+- 'AddMethod' inserted a 'pasos' row, linked through 'pasos_receta' when the recipe was saved.
+
+If the recipe window was cancelled, those rows were never linked. The windows now keep a RecipeDraft until the recipe
+is saved, but databases used by those versions still hold the orphans, and removing a step from a recipe leaves its
+'pasos' row behind. This module deletes those orphans once they are older than a grace period, since a younger one may
+still be linked by a window that is open. Steps are shared, so their grace period counts from the last time they were
+unlinked ('desvinculado_el'), not from their creation, and it is never shorter than the time to live of the step name
+cache, so no process still holds the ID of a deleted step. Rows are deleted in chunks of at most 'chunk_size', each committed on its
+own, so no statement keeps many rows locked.
+
+The application runs a bounded pass in the background at startup. A full pass can be run from the command line:
+    - python -m src.utils.db_gc                        Deletes the orphans older than the grace period.
+    - python -m src.utils.db_gc --dry-run              Only counts them.
+    - python -m src.utils.db_gc --grace-minutes 10     Uses a different grace period.
+"""
+
+from src.utils.db_config import GC_CONFIG, NAME_CACHE_CONFIG
+from src.utils.db_utils import DBUtils
+from src.utils.name_cache import get_name_cache
+import argparse
+import time
+
+
+def orphan_cutoff(cursor, grace_minutes: int):
+    """Returns the server time before which an orphan may be deleted, so client and server clocks never disagree."""
+    cursor.execute("SELECT NOW() - INTERVAL %s MINUTE", (grace_minutes,))
+    return cursor.fetchone()[0]
+
+
+def collect_ingredients(cursor, cutoff, chunk_size: int, max_chunks: int = None) -> int:
+    """Deletes, in chunks, the ingredientes_receta rows never linked to a recipe and created before 'cutoff'.
+
+    Returns
+    -------
+        int: The number of rows deleted.
+    """
+    deleted = 0
+    chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        cursor.execute("""DELETE FROM ingredientes_receta
+                          WHERE id_receta IS NULL AND creado_el < %s
+                          LIMIT %s""", (cutoff, chunk_size))
+        deleted += cursor.rowcount
+        chunks += 1
+        if cursor.rowcount < chunk_size:
+            break
+    return deleted
+
+
+def step_grace_minutes(grace_minutes: int) -> int:
+    """Returns the grace period of the steps: the given one, or the time to live of the step name cache if longer."""
+    return max(grace_minutes, -(-NAME_CACHE_CONFIG['ttl'] // 60))
+
+
+def collect_steps(cursor, cutoff, chunk_size: int, max_chunks: int = None) -> int:
+    """Deletes, in chunks, the pasos rows not used by any recipe, created and last unlinked before 'cutoff'.
+
+    Each chunk of orphan IDs is read first, walking the primary key, and then deleted by ID. The delete checks again
+    that the step is unused and was not unlinked since, in case a recipe linked or unlinked it in between.
+
+    Returns
+    -------
+        int: The number of rows deleted.
+    """
+    deleted = 0
+    chunks = 0
+    last_id = 0
+    while max_chunks is None or chunks < max_chunks:
+        cursor.execute("""SELECT pasos.id_paso FROM pasos
+                          WHERE pasos.id_paso > %s AND pasos.creado_el < %s
+                          AND (pasos.desvinculado_el IS NULL OR pasos.desvinculado_el < %s)
+                          AND NOT EXISTS (SELECT 1 FROM pasos_receta WHERE pasos_receta.id_paso = pasos.id_paso)
+                          ORDER BY pasos.id_paso
+                          LIMIT %s""", (last_id, cutoff, cutoff, chunk_size))
+        ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            break
+        placeholders = ', '.join(['%s'] * len(ids))
+        cursor.execute(f"""DELETE FROM pasos
+                           WHERE id_paso IN ({placeholders})
+                           AND (pasos.desvinculado_el IS NULL OR pasos.desvinculado_el < %s)
+                           AND NOT EXISTS (SELECT 1 FROM pasos_receta WHERE pasos_receta.id_paso = pasos.id_paso)""",
+                       ids + [cutoff])
+        deleted += cursor.rowcount
+        chunks += 1
+        last_id = ids[-1]
+        if len(ids) < chunk_size:
+            break
+    return deleted
+
+
+def count_orphans(cursor, cutoff, step_cutoff) -> dict:
+    """Counts the orphan ingredients created before 'cutoff' and the orphan steps created and last unlinked before
+    'step_cutoff', without deleting them."""
+    cursor.execute("SELECT COUNT(*) FROM ingredientes_receta WHERE id_receta IS NULL AND creado_el < %s", (cutoff,))
+    ingredients = cursor.fetchone()[0]
+    cursor.execute("""SELECT COUNT(*) FROM pasos
+                      WHERE pasos.creado_el < %s
+                      AND (pasos.desvinculado_el IS NULL OR pasos.desvinculado_el < %s)
+                      AND NOT EXISTS (SELECT 1 FROM pasos_receta WHERE pasos_receta.id_paso = pasos.id_paso)""",
+                   (step_cutoff, step_cutoff))
+    return {'ingredientes_receta': ingredients, 'pasos': cursor.fetchone()[0]}
+
+
+def collect_orphans(db_utils: DBUtils, grace_minutes: int = None, chunk_size: int = None, max_chunks: int = None,
+                    dry_run: bool = False) -> dict:
+    """Deletes the orphan ingredientes_receta and pasos rows older than the grace period.
+
+    The connections of the pool run in autocommit mode, so every chunk is committed as soon as it is deleted.
+    If steps were deleted, the step name cache of the process is cleared, so their IDs are not reused.
+
+    Parameters
+    ----------
+        db_utils (DBUtils): A connected DBUtils. The signature matches the tasks of DBWorker.
+        grace_minutes (int, optional): The age, in minutes, an orphan must reach to be deleted. Defaults to GC_CONFIG.
+            Steps wait at least the time to live of the step name cache. See `step_grace_minutes`.
+        chunk_size (int, optional): The maximum number of rows deleted per statement. Defaults to GC_CONFIG.
+        max_chunks (int, optional): The maximum number of chunks deleted per table. By default, there is no limit.
+        dry_run (bool): If True, the orphans are only counted.
+
+    Returns
+    -------
+        dict: A dictionary with the keys 'ingredientes_receta' and 'pasos' (rows deleted, or found in dry-run mode)
+        and 'seconds' (time spent).
+    """
+    grace_minutes = GC_CONFIG['grace_minutes'] if grace_minutes is None else grace_minutes
+    chunk_size = chunk_size or GC_CONFIG['chunk_size']
+    start = time.perf_counter()
+    cursor = db_utils.connection.cursor()
+    try:
+        cutoff = orphan_cutoff(cursor, grace_minutes)
+        step_cutoff = orphan_cutoff(cursor, step_grace_minutes(grace_minutes))
+        if dry_run:
+            report = count_orphans(cursor, cutoff, step_cutoff)
+        else:
+            report = {
+                'ingredientes_receta': collect_ingredients(cursor, cutoff, chunk_size, max_chunks),
+                'pasos': collect_steps(cursor, step_cutoff, chunk_size, max_chunks)
+            }
+    finally:
+        cursor.close()
+    if report['pasos'] and not dry_run:
+        # LOS PASOS ELIMINADOS NO DEBEN SEGUIR EN LA CACHE DE NOMBRES
+        get_name_cache('pasos').clear()
+    report['seconds'] = time.perf_counter() - start
+    return report
+
+
+def startup_pass(db_utils: DBUtils) -> dict:
+    """Runs the bounded pass the application starts in the background, limited to 'max_chunks' chunks per table."""
+    return collect_orphans(db_utils, max_chunks=GC_CONFIG['max_chunks'])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Elimina los ingredientes y pasos que no pertenecen a ninguna receta.')
+    parser.add_argument('--grace-minutes', type=int, default=GC_CONFIG['grace_minutes'],
+                        help='antiguedad minima, en minutos, de las filas eliminadas')
+    parser.add_argument('--chunk-size', type=int, default=GC_CONFIG['chunk_size'],
+                        help='cantidad maxima de filas eliminadas por sentencia')
+    parser.add_argument('--dry-run', action='store_true', help='solo cuenta las filas huerfanas')
+    args = parser.parse_args()
+
+    db_utils = DBUtils()
+    db_utils.connect()
+    try:
+        report = collect_orphans(db_utils, args.grace_minutes, args.chunk_size, dry_run=args.dry_run)
+    finally:
+        db_utils.disconnect()
+
+    action = 'encontradas' if args.dry_run else 'eliminadas'
+    print(f"ingredientes_receta: {report['ingredientes_receta']} filas {action}")
+    print(f"pasos: {report['pasos']} filas {action}")
+    print(f"{report['seconds'] * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,87 +1,345 @@
-"""Setup Script for Recipe Manager Database Tables
+"""Versioned Migration Runner for the Recipe Manager Database
 
-This script creates the necessary tables for the Recipe Manager application using the configuration from 'db_config.py'.
-It connects to the MySQL database server using the credentials specified in 'DB_CONFIG' and creates the following tables:
-- 'recetas': Contains information about recipes.
-- 'ingredientes': Contains information about ingredients.
-- 'ingredientes_receta': Establishes a many-to-many relationship between recipes and ingredients.
-- 'pasos': Contains information about preparation steps for recipes.
-- 'pasos_receta': Establishes a many-to-many relationship between recipes and preparation steps.
-- 'etiquetas': Contains information about tags for categorizing recipes.
-- 'etiquetas_receta': Establishes a many-to-many relationship between recipes and tags.
+This script brings the database described by 'DB_CONFIG' up to date by applying, in order, every migration in the
+'migrations' folder that has not been applied yet. Applied versions are recorded in the 'schema_version' table, so
+running the script again only applies the new migrations.
 
-Note: Before running this script, ensure that the 'db_config.py' file contains the correct database connection configuration.
+Each migration is a module named 'vNNN_description.py' that defines a 'DESCRIPTION' string and an 'upgrade(ctx)'
+function. The function receives a MigrationContext and issues its statements through it:
+- 'ctx.execute(query)': Runs a DDL/DML statement (only printed in dry-run mode).
+- 'ctx.query(query)': Runs a read-only query, also in dry-run mode, and returns its rows.
+- 'ctx.scalar(query)': Runs a read-only query and returns the first value of its first row, or None.
+- 'ctx.add_index(table, name, columns)': Builds an index online (ALGORITHM=INPLACE, LOCK=NONE) if it is missing.
+- 'ctx.add_column(table, name, definition)': Adds a column if it is missing.
+- 'ctx.warn(message)': Reports a statement that blocks the application, also in dry-run mode.
+
+After migrating, the script runs an EXPLAIN on each search query and fails if a filtered table is read without an
+index.
 
 Usage:
-    - Run this script to create the necessary tables in the database.
-    - Ensure that the 'DB_CONFIG' dictionary in 'db_config.py' contains the appropriate connection details.
+    - python -m src.utils.db_migrate                  Applies the pending migrations.
+    - python -m src.utils.db_migrate --dry-run        Prints the pending migrations and their statements. Nothing is
+                                                      created or changed, not even the database.
+    - python -m src.utils.db_migrate --synthetic N    Times every migration on a scratch copy with N recipes.
 """
 
-from db_config import DB_CONFIG
+from src.utils.db_config import DB_CONFIG
+from src.utils.name_cache import get_ingredient_interner, get_name_cache
+from src.utils.recipe_query import RecipeQuery
+from mysql.connector import errorcode
 import mysql.connector
+import argparse
+import importlib
+import os
+import pkgutil
+import random
+import time
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+schema_version = """CREATE TABLE IF NOT EXISTS schema_version (
+                        version INT NOT NULL PRIMARY KEY,
+                        descripcion VARCHAR(255) NOT NULL,
+                        aplicado_el TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP(),
+                        duracion_ms INT NOT NULL)"""
+
+# ERRORES DE UNA CONSULTA SOBRE TABLAS O COLUMNAS QUE UNA MIGRACION PENDIENTE TODAVIA NO CREO
+missing_schema_errors = (errorcode.ER_NO_DB_ERROR, errorcode.ER_NO_SUCH_TABLE, errorcode.ER_BAD_FIELD_ERROR)
+
+
+class MigrationContext:
+    """Runs the statements of a migration and measures how long each of them takes.
+
+    Parameters
+    ----------
+        cursor (mysql.connector.cursor.MySQLCursor): The cursor used to run the statements.
+        dry_run (bool): If True, statements that change the database are printed instead of executed.
+
+    Attributes
+    ----------
+        steps (list[tuple[str, float]]): Each statement run by the migration with its duration in seconds.
+    """
+    def __init__(self, cursor, dry_run: bool = False) -> None:
+        self.cursor = cursor
+        self.dry_run = dry_run
+        self.steps = []
+
+    def execute(self, query: str, params: tuple = None) -> None:
+        """Runs a statement that changes the database, or prints it in dry-run mode."""
+        statement = ' '.join(query.split())
+        if self.dry_run:
+            print(f'    {statement}')
+            return
+        start = time.perf_counter()
+        self.cursor.execute(query, params)
+        if self.cursor.with_rows:
+            self.cursor.fetchall()
+        self.steps.append((statement, time.perf_counter() - start))
+
+    def executemany(self, query: str, rows: list) -> None:
+        """Runs a statement once per row, batched by the driver, or prints it in dry-run mode."""
+        statement = f"{' '.join(query.split())} -- {len(rows)} filas"
+        if self.dry_run:
+            print(f'    {statement}')
+            return
+        start = time.perf_counter()
+        self.cursor.executemany(query, rows)
+        self.steps.append((statement, time.perf_counter() - start))
+
+    def query(self, query: str, params: tuple = None) -> list:
+        """Runs a read-only query and returns its rows. Read-only queries also run in dry-run mode.
+
+        In dry-run mode the statements of the previous pending migrations were only printed, so the database, tables
+        and columns they create may not exist yet: a query on them returns no rows instead of failing.
+        """
+        try:
+            self.cursor.execute(query, params)
+        except mysql.connector.Error as error:
+            if not self.dry_run or error.errno not in missing_schema_errors:
+                raise
+            return []
+        return self.cursor.fetchall()
+
+    def scalar(self, query: str, params: tuple = None):
+        """Runs a read-only query and returns the first value of its first row, or None if it returns no rows."""
+        rows = self.query(query, params)
+        return rows[0][0] if rows else None
+
+    def index_exists(self, table: str, name: str) -> bool:
+        """Checks whether the table already has an index with the given name."""
+        rows = self.query("""SELECT COUNT(*) FROM information_schema.statistics
+                             WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s""", (table, name))
+        return rows[0][0] > 0
+
+    def column_exists(self, table: str, name: str) -> bool:
+        """Checks whether the table already has a column with the given name."""
+        rows = self.query("""SELECT COUNT(*) FROM information_schema.columns
+                             WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s""", (table, name))
+        return rows[0][0] > 0
+
+    def add_index(self, table: str, name: str, columns: str, unique: bool = False, kind: str = None) -> None:
+        """Builds an index without blocking reads or writes on the table, unless it already exists.
+
+        Parameters
+        ----------
+            table (str): The table to index.
+            name (str): The name of the index.
+            columns (str): The comma-separated list of indexed columns.
+            unique (bool): If True, a UNIQUE index is created.
+            kind (str, optional): 'FULLTEXT' for a full-text index. Full-text indexes cannot be built with LOCK=NONE.
+        """
+        if self.index_exists(table, name):
+            return
+        prefix = kind or ('UNIQUE' if unique else '')
+        index = f'{prefix} INDEX' if prefix else 'INDEX'
+        lock = 'SHARED' if kind == 'FULLTEXT' else 'NONE'
+        self.execute(f"ALTER TABLE {table} ADD {index} {name} ({columns}), ALGORITHM=INPLACE, LOCK={lock}")
+
+    def add_column(self, table: str, name: str, definition: str) -> None:
+        """Adds a column to the table, unless it already exists."""
+        if not self.column_exists(table, name):
+            self.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+    def warn(self, message: str) -> None:
+        """Prints a warning about the next statements, e.g. a table rebuild that blocks writes while it runs."""
+        print(f'    AVISO: {message}')
+
+
+def load_migrations() -> list:
+    """Returns the migration modules of the 'migrations' folder sorted by version.
+
+    Returns
+    -------
+        list[tuple[int, module]]: The version number and module of each migration.
+    """
+    migrations = []
+    for module_info in pkgutil.iter_modules([MIGRATIONS_DIR]):
+        if module_info.name.startswith('v') and module_info.name[1:4].isdigit():
+            module = importlib.import_module(f'src.utils.migrations.{module_info.name}')
+            migrations.append((int(module_info.name[1:4]), module))
+    return sorted(migrations, key=lambda migration: migration[0])
+
+
+def applied_versions(cur, dry_run: bool = False) -> set:
+    """Returns the versions already recorded in the 'schema_version' table, creating the table if needed.
+
+    In dry-run mode the table is not created; a database without it is reported as having no applied versions.
+    """
+    if dry_run:
+        cur.execute("""SELECT COUNT(*) FROM information_schema.tables
+                       WHERE table_schema = DATABASE() AND table_name = 'schema_version'""")
+        if cur.fetchone()[0] == 0:
+            return set()
+    else:
+        cur.execute(schema_version)
+    cur.execute("SELECT version FROM schema_version")
+    return {row[0] for row in cur.fetchall()}
+
+
+def migrate(conn, dry_run: bool = False, until: int = None) -> None:
+    """Applies every pending migration, in order, and records it in 'schema_version'.
+
+    Parameters
+    ----------
+        conn (mysql.connector.connection.MySQLConnection): A connection to the target database.
+        dry_run (bool): If True, only prints the pending migrations and their statements.
+        until (int, optional): The last version to apply. By default every pending migration is applied.
+
+    Migrations merge and delete rows of the dictionary tables, so the name caches of this process are cleared after
+    applying any of them. Other processes must be restarted.
+    """
+    cur = conn.cursor(buffered=True)
+    done = applied_versions(cur, dry_run)
+    applied = False
+    for version, module in load_migrations():
+        if version in done or (until is not None and version > until):
+            continue
+        print(f'v{version:03d} {module.DESCRIPTION}')
+        ctx = MigrationContext(cur, dry_run)
+        start = time.perf_counter()
+        module.upgrade(ctx)
+        elapsed = time.perf_counter() - start
+        if dry_run:
+            continue
+        cur.execute("INSERT INTO schema_version (version, descripcion, duracion_ms) VALUES (%s, %s, %s)",
+                    (version, module.DESCRIPTION, int(elapsed * 1000)))
+        conn.commit()
+        applied = True
+        for statement, duration in ctx.steps:
+            print(f'    {duration * 1000:10.1f} ms  {statement[:90]}')
+        print(f'    {elapsed * 1000:10.1f} ms  total')
+    cur.close()
+    if applied:
+        # LAS MIGRACIONES FUSIONAN Y BORRAN FILAS: LOS IDS CACHEADOS POR NOMBRE PUEDEN NO EXISTIR MAS
+        for table in ('etiquetas', 'pasos'):
+            get_name_cache(table).clear()
+        get_ingredient_interner().clear()
+
+
+# Search queries, their sample parameters and the tables that must be read through an index. The name lookups have
+# the shape of the statements DBUtils runs, and the filters are built by RecipeQuery itself, so the checks follow them.
+# 'search_by_name' runs a MATCH on the FULLTEXT index of v003, and falls back to a 'LIKE term%' prefix on the name
+# index for words too short to be indexed: both forms are checked.
+search_queries = {
+    'ingredient_ids': ("SELECT id_ingrediente, nombre_clave FROM ingredientes WHERE nombre_clave IN (%s)", ('x',),
+                       ('ingredientes',)),
+    'tag_ids': ("SELECT id_etiqueta, nombre_clave FROM etiquetas WHERE nombre_clave IN (%s)", ('x',), ('etiquetas',)),
+    'step_ids': ("SELECT id_paso, descripcion_clave FROM pasos WHERE descripcion_clave IN (%s)", ('x',), ('pasos',)),
+    'search_by_name': ("SELECT id_receta FROM recetas WHERE MATCH(recetas.nombre) AGAINST (%s IN BOOLEAN MODE)", ('+x*',),
+                       ('recetas',)),
+    'search_by_name (prefijo)': ("SELECT id_receta FROM recetas WHERE recetas.nombre LIKE %s", ('x%',), ('recetas',)),
+    'search_full_text (pasos)': ("SELECT id_paso FROM pasos WHERE MATCH(descripcion) AGAINST (%s IN BOOLEAN MODE)", ('x*',),
+                                 ('pasos',)),
+    'search_full_text (ingredientes)': ("SELECT id_ingrediente FROM ingredientes WHERE MATCH(nombre) AGAINST (%s IN BOOLEAN MODE)",
+                                        ('x*',), ('ingredientes',)),
+    'search_by_filter (tiempo_preparacion)': (*RecipeQuery().prep_time(maximum=30).build(), ('recetas',)),
+    'search_by_filter (tiempo_total)': (*RecipeQuery().total_time(maximum=30).build(), ('recetas',)),
+    'search_by_filter (etiquetas)': (*RecipeQuery().with_tags(['x']).build(), ('etiquetas', 'etiquetas_receta')),
+    'search_by_filter (ingredientes)': (*RecipeQuery().with_ingredients(['x']).build(),
+                                        ('ingredientes', 'ingredientes_receta')),
+    'search_by_tags': ("""SELECT recetas.id_receta FROM recetas
+                          JOIN etiquetas_receta ON recetas.id_receta = etiquetas_receta.id_receta
+                          JOIN etiquetas ON etiquetas_receta.id_etiqueta = etiquetas.id_etiqueta
+                          WHERE etiquetas.nombre = %s""", ('x',), ('etiquetas', 'etiquetas_receta', 'recetas')),
+    'search_by_ingredient': ("""SELECT recetas.id_receta FROM recetas
+                                JOIN ingredientes_receta ON recetas.id_receta = ingredientes_receta.id_receta
+                                JOIN ingredientes ON ingredientes_receta.id_ingrediente = ingredientes.id_ingrediente
+                                WHERE ingredientes.nombre = %s""", ('x',), ('ingredientes', 'ingredientes_receta', 'recetas')),
+}
+
+
+def check_search_indexes(conn) -> list[str]:
+    """Runs EXPLAIN on every search query and returns the ones that read an expected table without an index."""
+    cur = conn.cursor(buffered=True)
+    failures = []
+    for search, (query, params, tables) in search_queries.items():
+        cur.execute(f"EXPLAIN {query}", params)
+        plan = [dict(zip(cur.column_names, row)) for row in cur.fetchall()]
+        for row in plan:
+            if row['table'] in tables and row['key'] is None:
+                failures.append(f"{search}: la tabla '{row['table']}' no usa ningun indice")
+    cur.close()
+    return failures
+
+
+def seed_synthetic(conn, recipes: int, batch: int = 5000) -> None:
+    """Fills the base tables with random recipes, ingredients, steps and tags.
+
+    Parameters
+    ----------
+        conn (mysql.connector.connection.MySQLConnection): A connection to a scratch database with the base tables.
+        recipes (int): The number of recipes to create. Each gets 8 ingredients, 6 steps and 3 tags.
+        batch (int): The number of recipes inserted per round of multi-row inserts.
+    """
+    cur = conn.cursor()
+    ingredients = max(recipes // 20, 100)
+    tags = max(recipes // 200, 20)
+    cur.executemany("INSERT INTO ingredientes (nombre) VALUES (%s)", [(f'ingrediente {i}',) for i in range(ingredients)])
+    cur.executemany("INSERT INTO etiquetas (nombre) VALUES (%s)", [(f'etiqueta {i}',) for i in range(tags)])
+    conn.commit()
+    for first in range(1, recipes + 1, batch):
+        ids = range(first, min(first + batch, recipes + 1))
+        cur.executemany("INSERT INTO recetas (id_receta, nombre, tiempo_preparacion, tiempo_coccion, favorito) VALUES (%s, %s, %s, %s, %s)",
+                        [(id, f'receta {id}', random.randint(5, 120), random.randint(0, 180), random.randint(0, 1)) for id in ids])
+        cur.executemany("INSERT INTO ingredientes_receta (id_ingrediente, id_receta, cantidad, medida) VALUES (%s, %s, %s, %s)",
+                        [(random.randint(1, ingredients), id, random.randint(1, 500), 'gramos') for id in ids for _ in range(8)])
+        cur.executemany("INSERT INTO etiquetas_receta (id_etiqueta, id_receta) VALUES (%s, %s)",
+                        [(random.randint(1, tags), id) for id in ids for _ in range(3)])
+        # LA BASE DE PRUEBA TIENE UN SOLO ESCRITOR, LOS IDS DE UN INSERT MULTIPLE SON CONSECUTIVOS
+        steps = [(id, order) for id in ids for order in range(1, 7)]
+        cur.executemany("INSERT INTO pasos (descripcion) VALUES (%s)", [(f'paso {order} de la receta {id}',) for id, order in steps])
+        cur.execute("SELECT LAST_INSERT_ID()")
+        step_id = cur.fetchone()[0]
+        cur.executemany("INSERT INTO pasos_receta (id_paso, id_receta, orden) VALUES (%s, %s, %s)",
+                        [(step_id + index, id, order) for index, (id, order) in enumerate(steps)])
+        conn.commit()
+    cur.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Aplica las migraciones pendientes de la base de datos.')
+    parser.add_argument('--dry-run', action='store_true', help='muestra las migraciones pendientes sin aplicarlas')
+    parser.add_argument('--synthetic', type=int, metavar='N',
+                        help='mide cada migracion sobre una base de prueba con N recetas aleatorias')
+    args = parser.parse_args()
+    if args.dry_run and args.synthetic:
+        parser.error('--dry-run y --synthetic no se pueden combinar: --synthetic crea una base de prueba')
+
+    # Establish a connection to the database server
+    conn = mysql.connector.connect(user=DB_CONFIG['user'], password=DB_CONFIG['password'], host=DB_CONFIG['host'])
+    cur = conn.cursor()
+    database = DB_CONFIG['database']
+    if args.synthetic:
+        database = f"{database}_synthetic"
+        cur.execute(f"DROP DATABASE IF EXISTS {database}")
+    if args.dry_run:
+        # LA SIMULACION NO CREA LA BASE: SI NO EXISTE, TODAS LAS MIGRACIONES ESTAN PENDIENTES
+        cur.execute("SELECT COUNT(*) FROM information_schema.schemata WHERE schema_name = %s", (database,))
+        if cur.fetchone()[0]:
+            cur.execute(f"USE {database}")
+        else:
+            print(f"La base '{database}' no existe: se crearia con todas las migraciones")
+    else:
+        cur.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+        cur.execute(f"USE {database}")
+    cur.close()
+
+    if args.synthetic:
+        migrate(conn, until=1)
+        start = time.perf_counter()
+        seed_synthetic(conn, args.synthetic)
+        print(f'{args.synthetic} recetas sinteticas creadas en {time.perf_counter() - start:.1f} s')
+
+    migrate(conn, dry_run=args.dry_run)
+
+    failures = [] if args.dry_run else check_search_indexes(conn)
+    conn.close()
+
+    for failure in failures:
+        print(failure)
+    if failures:
+        raise SystemExit(1)
+
 
-# Establish a connection to the database
-conn = mysql.connector.connect(user= DB_CONFIG['user'], password= DB_CONFIG['password'], host= DB_CONFIG['host'])
-cur = conn.cursor()
-
-# Define table creation queries
-cur.execute("CREATE DATABASE IF NOT EXISTS recipe_manager")
-cur.execute("USE recipe_manager")
-
-recipes = """CREATE table IF NOT EXISTS recetas(
-                    id_receta INT NOT NULL AUTO_INCREMENT UNIQUE PRIMARY KEY,
-                    nombre VARCHAR(75) NOT NULL,
-                    tiempo_preparacion INT NOT NULL,
-                    tiempo_coccion INT NOT NULL,
-                    creado_el TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP(),
-                    imagen VARCHAR(75) DEFAULT NULL,
-                    favorito BOOLEAN)"""
-
-ingredients = """CREATE table IF NOT EXISTS ingredientes (
-                        id_ingrediente INT NOT NULL AUTO_INCREMENT UNIQUE PRIMARY KEY,
-                        nombre VARCHAR(75) NOT NULL)"""
-
-ingredients_recipe = """CREATE table IF NOT EXISTS ingredientes_receta (
-                        id_ingredientes_receta INT NOT NULL AUTO_INCREMENT UNIQUE PRIMARY KEY,
-                        id_ingrediente INT NOT NULL,
-                        id_receta INT,
-                        cantidad SMALLINT NOT NULL,
-                        medida VARCHAR(25) NOT NULL,
-                        FOREIGN KEY (id_receta) REFERENCES recetas (id_receta) ON DELETE CASCADE,
-                        FOREIGN KEY (id_ingrediente) REFERENCES ingredientes (id_ingrediente) ON DELETE CASCADE)"""
-
-prep_steps = """CREATE table IF NOT EXISTS pasos (
-                        id_paso INT NOT NULL AUTO_INCREMENT UNIQUE PRIMARY KEY,
-                        descripcion VARCHAR(255))"""
-
-prep_steps_recipe = """CREATE table IF NOT EXISTS pasos_receta (
-                        id_pasos_receta INT NOT NULL AUTO_INCREMENT UNIQUE PRIMARY KEY,
-                        id_paso INT NOT NULL,
-                        id_receta INT,
-                        orden TINYINT NOT NULL,
-                        FOREIGN KEY (id_receta) REFERENCES recetas (id_receta) ON DELETE CASCADE,
-                        FOREIGN KEY (id_paso) REFERENCES pasos (id_paso) ON DELETE CASCADE)"""
-
-tags = """CREATE table IF NOT EXISTS etiquetas (
-                id_etiqueta INT NOT NULL AUTO_INCREMENT UNIQUE PRIMARY KEY,
-                nombre VARCHAR(45))"""
-
-tags_recipe = """CREATE table IF NOT EXISTS etiquetas_receta (
-                id_etiquetas_receta INT NOT NULL AUTO_INCREMENT UNIQUE PRIMARY KEY,
-                id_etiqueta INT NOT NULL,
-                id_receta INT NOT NULL,
-                FOREIGN KEY (id_receta) REFERENCES recetas (id_receta) ON DELETE CASCADE,
-                FOREIGN KEY (id_etiqueta) REFERENCES etiquetas (id_etiqueta) ON DELETE CASCADE)"""
-
-# Execute table creation queries
-cur.execute(recipes)
-cur.execute(ingredients)
-cur.execute(prep_steps)
-cur.execute(tags)
-cur.execute(ingredients_recipe)
-cur.execute(prep_steps_recipe)
-cur.execute(tags_recipe)
-
-# Commit the changes and close the connection
-conn.commit()
-conn.close()
+if __name__ == '__main__':
+    main()
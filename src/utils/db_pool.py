@@ -0,0 +1,150 @@
+"""Connection Pool for Recipe Manager
+
+This module keeps a bounded, process-wide pool of MySQL connections so that every window of the application
+reuses the same handful of connections instead of opening a new one each time.
+
+Connections are health-checked when they are checked out of the pool, and the pool keeps counters for hits
+(an idle connection was reused), misses (a new connection had to be opened) and the time spent waiting for a
+free connection when the pool was exhausted.
+"""
+
+from src.utils.db_config import DB_CONFIG, POOL_CONFIG
+import mysql.connector
+import threading
+import time
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available before the pool timeout expires."""
+
+
+class ConnectionPool:
+    """A bounded pool of MySQL connections.
+
+    Parameters
+    ----------
+        size (int): The maximum number of connections the pool may open.
+        timeout (float): Seconds to wait for a free connection before raising PoolTimeoutError.
+
+    Attributes
+    ----------
+        hits (int): Number of checkouts served by an idle pooled connection.
+        misses (int): Number of checkouts that had to open a new connection.
+        wait_time (float): Total seconds spent waiting for a free connection.
+    """
+    def __init__(self, size: int, timeout: float) -> None:
+        self.size = size
+        self.timeout = timeout
+        self._idle = []
+        self._open = 0
+        self._condition = threading.Condition()
+
+        self.hits = 0
+        self.misses = 0
+        self.wait_time = 0.0
+
+    def _new_connection(self):
+        """Opens a new connection using the 'DB_CONFIG' dictionary.
+
+        Connections run in autocommit mode, so every query reads the latest committed data without having to
+        reconnect or end a stale transaction first.
+        """
+        return mysql.connector.connect(**DB_CONFIG, buffered=True, autocommit=True)
+
+    def acquire(self):
+        """Checks out a healthy connection from the pool.
+
+        An idle connection is reused if it is still alive; dead idle connections are discarded. If there is no
+        idle connection and the pool is below its size, a new connection is opened. Otherwise the caller waits
+        until another window releases one.
+
+        Returns
+        -------
+            mysql.connector.connection.MySQLConnection: A connection ready to be used.
+
+        Raises
+        ------
+            PoolTimeoutError: If no connection became available within 'timeout' seconds.
+        """
+        with self._condition:
+            start = time.perf_counter()
+            waited = False
+            try:
+                while True:
+                    while self._idle:
+                        connection = self._idle.pop()
+                        if connection.is_connected():
+                            self.hits += 1
+                            return connection
+                        self._open -= 1
+                    if self._open < self.size:
+                        self._open += 1
+                        self.misses += 1
+                        break
+                    remaining = self.timeout - (time.perf_counter() - start)
+                    if remaining <= 0:
+                        raise PoolTimeoutError(f'No hay conexiones libres luego de {self.timeout} segundos')
+                    waited = True
+                    self._condition.wait(remaining)
+            finally:
+                if waited:
+                    self.wait_time += time.perf_counter() - start
+        try:
+            return self._new_connection()
+        except Exception:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, connection) -> None:
+        """Returns a connection to the pool.
+
+        Any transaction left open by the caller is rolled back so the next user gets a clean session.
+
+        Parameters
+        ----------
+            connection (mysql.connector.connection.MySQLConnection): The connection to return.
+        """
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+            healthy = True
+        except mysql.connector.Error:
+            healthy = False
+        with self._condition:
+            if healthy:
+                self._idle.append(connection)
+            else:
+                self._open -= 1
+            self._condition.notify()
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the pool counters.
+
+        Returns
+        -------
+            dict: A dictionary with the keys 'size', 'open', 'idle', 'hits', 'misses' and 'wait_time'.
+        """
+        with self._condition:
+            return {
+                'size': self.size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'hits': self.hits,
+                'misses': self.misses,
+                'wait_time': self.wait_time
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Returns the process-wide connection pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(POOL_CONFIG['size'], POOL_CONFIG['timeout'])
+        return _pool
@@ -1,299 +1,466 @@
 # from db_config import DB_CONFIG
-from src.utils.db_config import DB_CONFIG
+from src.utils.db_config import POOL_CONFIG
+from src.utils.db_pool import get_pool
+from src.utils.name_cache import NameCache, get_ingredient_interner, get_name_cache
+from src.utils.recipe_cache import get_recipe_cache
+from src.utils.recipe_diff import RowDiff, diff_recipe
+from src.utils.search_index import fold_text
 import mysql.connector
+from contextlib import contextmanager
 from datetime import date
+from functools import partial
+from operator import itemgetter
+from typing import NamedTuple
 import random
+import re
+import time
+
+
+def chunked(items: list, size: int) -> list:
+    """Splits a list into consecutive chunks of at most 'size' items."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class StatementCounter:
+    """Wraps a cursor and counts the statements run through it. Every other attribute is read from the cursor."""
+    def __init__(self, cursor) -> None:
+        self.cursor = cursor
+        self.statements = 0
+
+    def execute(self, query: str, params=()) -> None:
+        self.statements += 1
+        self.cursor.execute(query, params)
+
+    def executemany(self, query: str, seq_params: list) -> None:
+        self.statements += 1
+        self.cursor.executemany(query, seq_params)
+
+    def __getattr__(self, name: str):
+        return getattr(self.cursor, name)
+
+
+def full_text_terms(text: str, min_length: int = 3) -> str:
+    """Builds a MATCH ... AGAINST boolean-mode query that matches any of the words of 'text' as a prefix.
+
+    Operators typed by the user are dropped, and so are words shorter than 'min_length', since InnoDB does not index
+    them (innodb_ft_min_token_size). Returns an empty string if no word is left.
+    """
+    words = [word for word in re.findall(r'\w+', text) if len(word) >= min_length]
+    return ' '.join(f'{word}*' for word in words)
+
+
+def name_matcher(text: str):
+    """Returns a function that checks locally whether a recipe name matches a `DBUtils.search_by_name` search for
+    'text', with the same rules.
+
+    Every word of 'text' long enough to be indexed must start a word of the name. If there is none, the whole name
+    must start with 'text'. Case and accents are ignored. The words of 'text' are folded and compiled once, so
+    filtering many names only folds each name.
+    """
+    terms = full_text_terms(text)
+    if not terms:
+        prefix = fold_text(text)
+        return lambda name: fold_text(name).startswith(prefix)
+    # CADA PALABRA BUSCADA DEBE EMPEZAR UNA PALABRA DEL NOMBRE
+    patterns = [re.compile(r'(?<!\w)' + re.escape(fold_text(term[:-1]))) for term in terms.split()]
+
+    def matches(name: str) -> bool:
+        folded = fold_text(name)
+        return all(pattern.search(folded) for pattern in patterns)
+    return matches
+
+
+class RecipeIngredient(NamedTuple):
+    """An ingredient of a recipe, as read by `DBUtils.get_recipe_by_id`.
+
+    Attributes
+    ----------
+        id (int): The ID of the ingredientes_receta record.
+        id_ingrediente (int): The ID of the ingredient.
+        nombre (str): The name of the ingredient.
+        cantidad (int): The amount used by the recipe.
+        medida (str): The unit of the amount.
+    """
+    id: int
+    id_ingrediente: int
+    nombre: str
+    cantidad: int
+    medida: str
+
+    def amount(self) -> str:
+        """Returns the amount and its unit as shown in the windows, e.g. '200 gramos'."""
+        return f'{self.cantidad} {self.medida}'
+
+
+class RecipeStep(NamedTuple):
+    """A preparation step of a recipe, as read by `DBUtils.get_recipe_by_id`.
+
+    Attributes
+    ----------
+        id (int): The ID of the pasos_receta record.
+        id_paso (int): The ID of the step. Steps are shared, so a recipe may use the same step more than once.
+        orden (int): The position of the step in the recipe.
+        descripcion (str): The text of the step.
+    """
+    id: int
+    id_paso: int
+    orden: int
+    descripcion: str
+
+
+class RecipeTag(NamedTuple):
+    """A tag of a recipe, as read by `DBUtils.get_recipe_by_id`.
+
+    Attributes
+    ----------
+        id (int): The ID of the tag (id_etiqueta).
+        nombre (str): The name of the tag.
+    """
+    id: int
+    nombre: str
+
+
+# COLUMNAS DE CADA TIPO DE FILA EN LA CONSULTA DE get_recipe_by_id
+INGREDIENT_COLUMNS = itemgetter(7, 8, 9, 10, 11)
+# LOS PASOS LLEVAN id_paso EN LA COLUMNA id_ingrediente
+STEP_COLUMNS = itemgetter(7, 8, 13, 12)
+TAG_COLUMNS = itemgetter(7, 14)
+# CONSTRUCTORES SIN LA VALIDACION DE _make, QUE DUPLICA EL COSTO POR FILA
+new_ingredient = partial(tuple.__new__, RecipeIngredient)
+new_step = partial(tuple.__new__, RecipeStep)
+new_tag = partial(tuple.__new__, RecipeTag)
+
 
 class DBUtils:
     """A utility class to manage database connections and operations.
 
-    This class provides methods to establish a connection to the database using the provided configuration,
-    as well as to disconnect from the database. It also contains methods to perform various database operations.
+    This class provides methods to check out a connection from the shared connection pool and to return it,
+    as well as methods to perform various database operations.
 
     Attributes
     ----------
         connection (mysql.connector.connection.MySQLConnection): The database connection object.
+        pool (ConnectionPool): The process-wide pool the connection is borrowed from.
+        cache (RecipeCache): The process-wide cache of formatted recipes read by `get_recipe_by_id`.
+        ingredient_names (NameInterner): The process-wide table of ingredient IDs by folded name, used by
+            `ingredient_ids`.
+        tag_names (NameCache): The process-wide cache of tag IDs by name, used by `tag_ids`.
+        step_names (NameCache): The process-wide cache of step IDs by description, used by `step_ids`.
+        CHUNK_SIZE (int): The maximum number of IDs sent in a single 'IN (...)' list.
+        SEARCH_LIMIT (int): The maximum number of recipes returned by a full-text search.
     """
+    CHUNK_SIZE = 1000
+    SEARCH_LIMIT = 500
+
     def __init__(self):
         self.connection = None
+        self.pool = get_pool()
+        self.cache = get_recipe_cache()
+        self.ingredient_names = get_ingredient_interner()
+        self.tag_names = get_name_cache('etiquetas')
+        self.step_names = get_name_cache('pasos')
+        self.last_used = 0.0
 
     def connect(self) -> None:
-        """Establishes a connection to the database.
+        """Checks out a connection from the shared connection pool.
 
-        This method uses the 'DB_CONFIG' dictionary to connect to the database using the 'mysql.connector' library.
-        The connection object is stored in the 'connection' attribute of the class.
+        The connection object is stored in the 'connection' attribute of the class. Calling this method while a
+        connection is already held does nothing.
         """
-        self.connection = mysql.connector.connect(**DB_CONFIG, buffered=True)
+        if self.connection is None:
+            self.connection = self.pool.acquire()
+            self.last_used = time.monotonic()
 
     def disconnect(self) -> None:
-        """Closes the current database connection, if one is active.
+        """Returns the current connection to the pool, if one is held.
 
-        This method closes the database connection represented by the 'connection' attribute of the class.
+        The connection is not closed, so the next window that connects reuses it without a new handshake.
         """
-        if self.connection:
-            self.connection.close()
+        if self.connection is not None:
+            self.pool.release(self.connection)
+            self.connection = None
 
-# INGREDIENTS CRUD -------------------------------------------------
+    @contextmanager
+    def borrow(self):
+        """Holds a pooled connection only for the duration of a 'with' block.
 
-    def create_ingredient(self, ingredient_name: str) -> int:
-        """Creates a new ingredient in the database or retrieves the ID of an existing ingredient with the given name.
-
-        Parameters
-        -----------
-            ingredient_name (str): The name of the ingredient to be created or checked.
+        Windows use it around each operation instead of keeping a connection while they are open, so the pool is
+        not drained by windows left open. A connection that was already held when the block started is kept.
 
-        Returns
-        -------
-            int: The ID of the newly created ingredient or the ID of the existing ingredient with the given name.
+        Raises
+        ------
+            PoolTimeoutError: If no connection became available within the pool timeout.
         """
-        cursor = self.connection.cursor()
+        held = self.connection is not None
+        self.ensure_connection()
         try:
-            existing_ingredient_id = self.check_record_existence(ingredient_name, 'ingredientes')
-            if existing_ingredient_id is None:
-                query = "INSERT INTO ingredientes (nombre) VALUES (%s)"
-                values = (ingredient_name,)
-                cursor.execute(query, values)
-                self.connection.commit()
-                
-                cursor.execute("SELECT LAST_INSERT_ID()")
-                return cursor.fetchone()[0]
-            else:
-                return existing_ingredient_id
+            yield self
         finally:
-            cursor.close()
-    
-    def read_ingredients(self, ingredients_recipe_ids: list[int]) -> list:
-        """Retrieves the details of ingredients used in a recipe based on the given list of recipe IDs.
+            if not held:
+                self.disconnect()
 
-        Parameters
-        -----------
-            ingredients_recipe_ids (List[int]): A list of recipe IDs to fetch ingredient details.
+    def ensure_connection(self) -> None:
+        """Makes sure the held connection is alive before running a query.
 
-        Returns
-        -------
-            List[Tuple(str, float, str)]: A list of tuples, each containing the ingredient name, quantity, and measurement unit.
+        A connection used within the last 'ping_interval' seconds is trusted as is, so frequent queries pay no
+        extra round trip. Older connections are pinged and transparently reconnected if the server dropped them.
+        If the reconnect fails, the connection is returned to the pool and a fresh one is checked out.
         """
-        cursor = self.connection.cursor()
-        ingredients_data = []
-        try:
-            for id in ingredients_recipe_ids:
-                query = f"""SELECT ingredientes.nombre, ingredientes_receta.cantidad, ingredientes_receta.medida 
-                        FROM ingredientes JOIN ingredientes_receta
-                        ON ingredientes_receta.id_ingrediente = ingredientes.id_ingrediente
-                        WHERE ingredientes_receta.id_ingredientes_receta = {id}"""
-                cursor.execute(query)
-                ingredient = cursor.fetchall()
-                ingredients_data.extend(ingredient)
-            return ingredients_data
-        finally:
-            cursor.close()
-
-# INGREDIENTS_RECIPE ---------------------------------
+        if self.connection is None:
+            self.connect()
+            return
+        now = time.monotonic()
+        if now - self.last_used > POOL_CONFIG['ping_interval']:
+            try:
+                self.connection.ping(reconnect=True, attempts=2, delay=0)
+            except mysql.connector.Error:
+                self.disconnect()
+                self.connect()
+        self.last_used = now
+
+    def pool_stats(self) -> dict:
+        """Returns the hit, miss and wait time counters of the shared connection pool."""
+        return self.pool.stats()
+
+    def cache_stats(self) -> dict:
+        """Returns the hit, miss, eviction, expiration and invalidation counters of the shared recipe cache."""
+        return self.cache.stats()
 
-    def add_ingredient_to_recipe(self, ingredient_id: int, amount: int, units: str) -> int:
-        """Adds an ingredient to a recipe in the database.
+# INGREDIENTS CRUD -------------------------------------------------
 
-        Parameters
-        -----------
-            - ingredient_id (int): The ID of the ingredient to be added to the recipe.
-            - amount (int): The amount of the ingredient needed in the recipe.
-            - units (str): The measurement units for the ingredient (e.g., grams, cups, teaspoons, etc.).
+    def read_ingredient_names(self) -> list[str]:
+        """Retrieves the name of every ingredient, used to suggest existing names while typing a new one.
 
         Returns
         -------
-            - int: The ID of the newly created record in the ingredientes_receta table.
+            list[str]: The names of the 'ingredientes' table.
         """
+        cursor = self.connection.cursor()
         try:
-            cursor = self.connection.cursor()
-            query = "INSERT INTO ingredientes_receta (id_ingrediente, cantidad, medida) VALUES (%s, %s, %s)"
-            values = (ingredient_id, amount, units)
-            cursor.execute(query, values)
-            self.connection.commit()
-            cursor.execute("SELECT LAST_INSERT_ID()")
-            return cursor.fetchone()[0]
+            cursor.execute("SELECT nombre FROM ingredientes")
+            return [row[0] for row in cursor.fetchall()]
         finally:
             cursor.close()
 
-    def add_recipe_id_to_ingredients(self, ingredient_recipe_id: int, recipe_id: int) -> None:
-        """Associates a recipe ID with an existing ingredient record in the ingredientes_receta table.
+# PREP_METHOD_RECIPE ---------------------------------
 
-        This function is used to link an ingredient record to a specific recipe in the database.
+    def mark_steps_unlinked(self, cursor, step_ids: list[int]) -> None:
+        """Records that the given steps were removed from a recipe, on the cursor of the caller's transaction.
 
-        Parameters
-        -----------
-            - ingredient_recipe_id (int): The ID of the ingredient record (id_ingredientes_receta) to be associated with the recipe.
-            - recipe_id (int): The ID of the recipe (id_receta) to which the ingredient should be linked.
+        Steps are shared, so an unlinked step may be old, and other processes may still have its ID in their name
+        cache. `db_gc` only deletes an unused step a grace period after its last unlink.
         """
-        try:
-            cursor = self.connection.cursor()
-            query = "UPDATE ingredientes_receta SET id_receta = %s WHERE id_ingredientes_receta = %s"
-            values = (recipe_id, ingredient_recipe_id)
-            cursor.execute(query, values)
-            self.connection.commit()
-        finally:
-            cursor.close()
+        if not step_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(step_ids))
+        cursor.execute(f"UPDATE pasos SET desvinculado_el = CURRENT_TIMESTAMP() WHERE id_paso IN ({placeholders})",
+                       list(step_ids))
 
-    def delete_ingredient_to_recipe(self, ingredient_recipe_id: int) -> None:
-        """Deletes an ingredient record from the ingredientes_receta table.
-        
-        This function is used to remove an ingredient record associated with a recipe from the database.
+# RECIPE -----------------------------------------
 
-        Parameters
-        -----------
-            - ingredient_recipe_id (int): The ID of the ingredient record (id_ingredientes_receta) to be deleted.
-        """
-        try:
-            cursor = self.connection.cursor()
-            query = "DELETE FROM ingredientes_receta WHERE id_ingredientes_receta = %s"
-            values = (ingredient_recipe_id,)
-            cursor.execute(query, values)
-            self.connection.commit()
-        finally:
-            cursor.close()
+    def save_recipe_bulk(self, recipe: dict) -> int:
+        """Saves a new recipe together with its tags, ingredients and preparation steps in a single transaction.
 
-    def check_record_existence(self, name: str, table: str) -> int:
-        """Checks the existence of a record with the given name in the specified table.
-        
-        This function queries the database table with the provided name and checks if a record exists with the given name.
+        The recipe windows keep the recipe being created in a `RecipeDraft`, so nothing is written until it is saved.
+        Then the whole recipe is written inside one transaction: the recipe row, the ingredients, tags and steps
+        that do not exist yet, and a multi-row insert for each kind of link. New IDs are read from 'cursor.lastrowid',
+        so no extra 'SELECT LAST_INSERT_ID()' round trips are needed. If any statement fails, nothing is saved.
 
         Parameters
-        -----------
-            - name (str): The name to be checked for existence in the table.
-            - table (str): The name of the table to search for the record.
-        
-        Returns
-        -------
-            - The primary key or unique identifier of the record if it exists, otherwise None.
-        """
-        cursor = self.connection.cursor()
-        query = f"SELECT * FROM {table} WHERE nombre = %s"
-        values = (name,)
-        cursor.execute(query, values)
-        result = cursor.fetchone()
-        cursor.close()
-        return result if result == None else result[0]
-
-# PREP METHODS CRUD -------------------------------------------------
-
-    def create_prep_method(self, prep_method_description: str) -> int:
-        """Creates a new preparation method (step) in the database.
+        ----------
+            recipe (dict): A dictionary containing the details of the new recipe. It should have the following keys:
+                - 'name' (str): The name of the recipe.
+                - 'prep_time' (int): The preparation time of the recipe in minutes.
+                - 'cook_time' (int): The cooking time of the recipe in minutes.
+                - 'image' (str): The URL or path of the recipe's image (optional).
+                - 'favorite' (bool): Indicates whether the recipe is marked as a favorite (True or False).
+                - 'tags' (list[str]): The names of the tags of the recipe.
+                - 'ingredients' (list[tuple[str, int, str]]): The name, amount and unit of each ingredient, in order.
+                - 'steps' (list[str]): The descriptions of the preparation steps, in order.
 
-        Parameters
-        -----------
-            - prep_method_description (str): The description of the new preparation method.
-        
         Returns
         -------
-            - int: The ID of the newly created preparation method (step).
+            int: The ID of the newly created recipe in the recetas table.
         """
         cursor = self.connection.cursor()
         try:
-            query = "INSERT INTO pasos (descripcion) VALUES (%s)"
-            values = (prep_method_description,)
+            self.connection.start_transaction()
+            query = "INSERT INTO recetas (nombre, tiempo_preparacion, tiempo_coccion, imagen, favorito) VALUES (%s, %s, %s, %s, %s)"
+            values = (recipe['name'], recipe['prep_time'], recipe['cook_time'], recipe['image'], recipe['favorite'])
             cursor.execute(query, values)
-            self.connection.commit()
+            recipe_id = cursor.lastrowid
+
+            tags = [tag for tag in recipe['tags'] if tag]
+            if tags:
+                tag_ids = self.tag_ids(cursor, tags)
+                query = "INSERT INTO etiquetas_receta (id_etiqueta, id_receta) VALUES (%s, %s)"
+                cursor.executemany(query, [(tag_id, recipe_id) for tag_id in tag_ids.values()])
+
+            if recipe['ingredients']:
+                ingredient_ids = self.ingredient_ids(cursor, [name for name, amount, unit in recipe['ingredients']])
+                query = "INSERT INTO ingredientes_receta (id_ingrediente, id_receta, cantidad, medida) VALUES (%s, %s, %s, %s)"
+                values = [(ingredient_ids[fold_text(name)], recipe_id, amount, unit) for name, amount, unit in recipe['ingredients']]
+                cursor.executemany(query, values)
+
+            if recipe['steps']:
+                step_ids = self.step_ids(cursor, recipe['steps'])
+                query = "INSERT INTO pasos_receta (id_paso, id_receta, orden) VALUES (%s, %s, %s)"
+                values = [(step_ids[fold_text(step)], recipe_id, order) for order, step in enumerate(recipe['steps'], start=1)]
+                cursor.executemany(query, values)
 
-            cursor.execute("SELECT LAST_INSERT_ID()")
-            return cursor.fetchone()[0]
+            self.connection.commit()
+            return recipe_id
+        except Exception:
+            self.connection.rollback()
+            raise
         finally:
             cursor.close()
 
-    def delete_prep_method(self, prep_method_id: int) -> None:
-        """Deletes a preparation method (step) from the database.
-        
-        This function is used to remove a specific preparation method (step) record from the pasos table.
+    def ingredient_ids(self, cursor, names: list[str]) -> dict[str, int]:
+        """Returns the IDs of the ingredients with the given names, creating the ones that do not exist.
+
+        Ingredients are identified by their folded name (see `fold_text`), stored in the uniquely indexed
+        'nombre_clave' column, so "Tomate", "tomate" and "tomáte" resolve to the same row. Names already interned by
+        the process-wide ingredient interner are resolved without a query; the rest of a recipe's ingredients are read
+        with a single query. See `dictionary_ids`.
 
         Parameters
-        -----------
-            - prep_method_id (int): The ID of the preparation method (step) record to be deleted.
+        ----------
+            cursor (mysql.connector.cursor.MySQLCursor): The cursor of the caller's transaction.
+            names (list[str]): The ingredient names.
+
+        Returns
+        -------
+            dict[str, int]: The ID of each ingredient, keyed by its folded name.
         """
-        try:
-            cursor = self.connection.cursor()
-            query = "DELETE FROM pasos WHERE id_paso = %s"
-            values = (prep_method_id,)
-            cursor.execute(query, values)
-            self.connection.commit()
-        finally:
-            cursor.close()
+        return self.dictionary_ids(cursor, self.ingredient_names, 'ingredientes', 'id_ingrediente', 'nombre',
+                                   'nombre_clave', names)
+
+    def tag_ids(self, cursor, names: list[str]) -> dict[str, int]:
+        """Returns the IDs of the tags with the given names, creating the ones that do not exist. See `dictionary_ids`."""
+        return self.dictionary_ids(cursor, self.tag_names, 'etiquetas', 'id_etiqueta', 'nombre', 'nombre_clave', names)
+
+    def step_ids(self, cursor, descriptions: list[str]) -> dict[str, int]:
+        """Returns the IDs of the steps with the given descriptions, creating the ones that do not exist. See `dictionary_ids`."""
+        return self.dictionary_ids(cursor, self.step_names, 'pasos', 'id_paso', 'descripcion', 'descripcion_clave',
+                                   descriptions)
+
+    def dictionary_ids(self, cursor, cache: NameCache, table: str, id_column: str, name_column: str, key_column: str,
+                       names: list[str]) -> dict[str, int]:
+        """Returns the IDs of the rows of a dictionary table with the given names, creating the ones that do not exist.
+
+        Ingredients, tags and steps are stored once per name, enforced by a unique index on 'key_column', a binary
+        column that holds the folded name (see `fold_text`). The caches are keyed with the same folded names, so a
+        cached ID is always the row the unique index would match. Names found in the name cache cost nothing; the rest
+        are read with a single query, and the ones still missing are created with
+        'INSERT ... ON DUPLICATE KEY UPDATE', which returns the ID of the existing row if another connection created it
+        in between. The inserts run on the given cursor, so they belong to the caller's transaction, and are not
+        cached until they are read again.
 
-# PREP_METHOD_RECIPE ---------------------------------
+        Parameters
+        ----------
+            cursor (mysql.connector.cursor.MySQLCursor): The cursor of the caller's transaction.
+            cache (NameCache | NameInterner): The name cache of the table.
+            table (str): The dictionary table: 'ingredientes', 'etiquetas' or 'pasos'.
+            id_column (str): Its primary key.
+            name_column (str): Its name column.
+            key_column (str): Its uniquely indexed folded name column.
+            names (list[str]): The names.
 
-    def add_prep_method_to_recipe(self, prep_method_id: int, order: int, recipe_id: int) -> None:
-        """Associates a preparation method (step) with a recipe in the database.
-        
-        This function links a preparation method (step) with a specific recipe and sets the order in which the step should be performed.
+        Returns
+        -------
+            dict[str, int]: The ID of each name, keyed by its folded name.
+        """
+        ids = {}
+        missing = {}
+        for name in names:
+            key = fold_text(name)
+            if key in ids or key in missing:
+                continue
+            row_id = cache.get(key)
+            if row_id is None:
+                missing[key] = name
+            else:
+                ids[key] = row_id
+        if not missing:
+            return ids
+        placeholders = ', '.join(['%s'] * len(missing))
+        cursor.execute(f"SELECT {id_column}, {key_column} FROM {table} WHERE {key_column} IN ({placeholders})",
+                       list(missing))
+        for row_id, key in cursor.fetchall():
+            ids[key] = row_id
+            cache.put(key, row_id)
+        query = (f"INSERT INTO {table} ({name_column}, {key_column}) VALUES (%s, %s) "
+                 f"ON DUPLICATE KEY UPDATE {id_column} = LAST_INSERT_ID({id_column})")
+        for key, name in missing.items():
+            if key not in ids:
+                cursor.execute(query, (name, key))
+                ids[key] = cursor.lastrowid
+        return ids
+
+    def read_recipes_page(self, after_id: int = 0, limit: int = 200) -> list:
+        """Retrieves one page of recipes, ordered by ID, starting after the given recipe ID.
+
+        This function uses keyset pagination: the page is located through the primary key with 'id_receta > after_id',
+        so the cost of a page does not depend on how many recipes come before it. The ingredient names are
+        aggregated only for the recipes of the page.
 
         Parameters
-        -----------
-            - prep_method_id (int): The ID of the preparation method (step) to be associated with the recipe.
-            - order (int): The order in which the preparation method (step) should be performed in the recipe.
-            - recipe_id (int): The ID of the recipe to which the preparation method (step) should be linked.
+        ----------
+            after_id (int): The ID of the last recipe of the previous page, or 0 for the first page.
+            limit (int): The maximum number of recipes in the page.
+
+        Returns
+        -------
+            list: A list of tuples with the following elements:
+                - ID of the recipe (int).
+                - Name of the recipe (str).
+                - Preparation time of the recipe in minutes (int).
+                - Cooking time of the recipe in minutes (int).
+                - Timestamp when the recipe was created (str).
+                - Comma-separated string of ingredient names used in the recipe (str).
         """
         try:
             cursor = self.connection.cursor()
-            query = "INSERT INTO pasos_receta (id_paso, id_receta, orden) VALUES (%s, %s, %s)"
-            values = (prep_method_id, recipe_id, order)
-            cursor.execute(query, values)
-            self.connection.commit()
+            query = """
+                    SELECT pagina.id_receta, pagina.nombre, pagina.tiempo_preparacion, pagina.tiempo_coccion, pagina.creado_el,
+                    GROUP_CONCAT(ingredientes.nombre ORDER BY ingredientes_receta.id_ingredientes_receta SEPARATOR ',') AS ingredientes
+                    FROM (
+                        SELECT id_receta, nombre, tiempo_preparacion, tiempo_coccion, creado_el
+                        FROM recetas
+                        WHERE id_receta > %s
+                        ORDER BY id_receta
+                        LIMIT %s
+                    ) AS pagina
+                    LEFT JOIN ingredientes_receta ON ingredientes_receta.id_receta = pagina.id_receta
+                    LEFT JOIN ingredientes ON ingredientes.id_ingrediente = ingredientes_receta.id_ingrediente
+                    GROUP BY pagina.id_receta, pagina.nombre, pagina.tiempo_preparacion, pagina.tiempo_coccion, pagina.creado_el
+                    ORDER BY pagina.id_receta;"""
+            cursor.execute(query, (after_id, limit))
+            return cursor.fetchall()
         finally:
             cursor.close()
 
-# RECIPE -----------------------------------------
+    def read_recipes_by_ids(self, recipe_ids: list[int]) -> list:
+        """Retrieves the given recipes, in the order of the given IDs.
 
-    def create_recipe(self, new_recipe):
-        """Creates a new recipe in the database.
-        
-        This function adds a new recipe with the provided details to the recetas table.
+        Used to display the results of the in-memory indexes, which only return recipe IDs. The rows are fetched with
+        one 'IN (...)' query per chunk of 'CHUNK_SIZE' IDs. IDs of recipes that no longer exist are skipped.
 
         Parameters
-        -----------
-            - new_recipe (dict): A dictionary containing the details of the new recipe. It should have the following keys:
-                - 'name' (str): The name of the recipe.
-                - 'prep_time' (int): The preparation time of the recipe in minutes.
-                - 'cook_time' (int): The cooking time of the recipe in minutes.
-                - 'image' (str): The URL or path of the recipe's image (optional).
-                - 'favorite' (bool): Indicates whether the recipe is marked as a favorite (True or False).
-        
+        ----------
+            recipe_ids (list[int]): The IDs of the recipes to retrieve.
+
         Returns
         -------
-            - int: The ID of the newly created recipe in the recetas table.
+            list: A list of tuples with the same elements returned by `read_recipes_page`.
         """
         cursor = self.connection.cursor()
+        rows_by_id = {}
         try:
-            query = "INSERT INTO recetas (nombre, tiempo_preparacion, tiempo_coccion, imagen, favorito) VALUES (%s, %s, %s, %s, %s)"
-            values = (
-                new_recipe['name'],
-                new_recipe['prep_time'],
-                new_recipe['cook_time'],
-                new_recipe['image'],
-                new_recipe['favorite']
-            )
-            cursor.execute(query, values)
-            self.connection.commit()
-
-            cursor.execute("SELECT LAST_INSERT_ID()")
-            return cursor.fetchone()[0]
-        finally:
-            cursor.close()
-
-    def read_recipes(self) -> list:
-        """Retrieves a list of all recipes from the database.
-        
-        This function fetches information about all recipes stored in the recetas table and also includes a comma-separated list of ingredient names associated with each recipe.
-
-        Parameters
-        -----------
-            - list: A list of dictionaries, each representing a recipe with the following keys:
-                - 'id_receta' (int): The ID of the recipe.
-                - 'nombre' (str): The name of the recipe.
-                - 'tiempo_preparacion' (int): The preparation time of the recipe in minutes.
-                - 'tiempo_coccion' (int): The cooking time of the recipe in minutes.
-                - 'creado_el' (str): The timestamp when the recipe was created.
-                - 'ingredientes' (str): A comma-separated list of ingredient names used in the recipe.
-        """
-        try:
-            cursor = self.connection.cursor()
-            query = """
+            for chunk in chunked(list(dict.fromkeys(recipe_ids)), self.CHUNK_SIZE):
+                placeholders = ', '.join(['%s'] * len(chunk))
+                query = f"""
                     SELECT recetas.id_receta, recetas.nombre, recetas.tiempo_preparacion, recetas.tiempo_coccion, recetas.creado_el,
                     (
                         SELECT GROUP_CONCAT(ingredientes.nombre SEPARATOR ',')
@@ -302,55 +469,86 @@ class DBUtils:
                         ON ingredientes.id_ingrediente = ingredientes_receta.id_ingrediente
                         WHERE ingredientes_receta.id_receta = recetas.id_receta
                     ) AS ingredientes
-                    FROM
-                        recetas;"""
-            cursor.execute(query)
-            return cursor.fetchall()        
+                    FROM recetas
+                    WHERE recetas.id_receta IN ({placeholders});"""
+                cursor.execute(query, chunk)
+                for row in cursor.fetchall():
+                    rows_by_id[row[0]] = row
+            return [rows_by_id[id] for id in recipe_ids if id in rows_by_id]
         finally:
             cursor.close()
-    
-    def get_edited_data_by_id(self, recipe_id: int) -> list:
-        """Retrieves edited data for a specific recipe based on its ID from the database.
 
-        This function fetches information about a specific recipe and the associated ingredients (as a comma-separated list) from the recetas and ingredientes tables in the database.
+    def iter_recipe_names(self, batch_size: int = 5000):
+        """Yields the ID and name of every recipe as the rows arrive from the server.
 
         Parameters
         ----------
-            - recipe_id (int): The ID of the recipe for which edited data is to be retrieved.
+            batch_size (int): The number of rows fetched from the server at a time.
 
-        Returns
-        -------
-            - list: A list of dictionaries, each representing a recipe with the following keys:
-                - 'id_receta' (int): The ID of the recipe.
-                - 'nombre' (str): The name of the recipe.
-                - 'tiempo_preparacion' (int): The preparation time of the recipe in minutes.
-                - 'tiempo_coccion' (int): The cooking time of the recipe in minutes.
-                - 'creado_el' (str): The timestamp when the recipe was created.
-                - 'ingredientes' (str): A comma-separated list of ingredient names used in the recipe.
+        Yields
+        ------
+            Tuple(int, str): The recipe ID and name.
         """
+        cursor = self.connection.cursor(buffered=False)
         try:
-            cursor = self.connection.cursor()
-            query = """
-                        SELECT recetas.id_receta, recetas.nombre, recetas.tiempo_preparacion, recetas.tiempo_coccion, recetas.creado_el,
-                        (
-                            SELECT GROUP_CONCAT(ingredientes.nombre SEPARATOR ',')
-                            FROM ingredientes
-                            JOIN ingredientes_receta
-                            ON ingredientes.id_ingrediente = ingredientes_receta.id_ingrediente
-                            WHERE ingredientes_receta.id_receta = recetas.id_receta
-                        ) AS ingredientes
-                        FROM
-                            recetas WHERE id_receta = %s;"""
-            value = (recipe_id,)
-            cursor.execute(query, value)
-            return cursor.fetchall()
+            cursor.execute("SELECT id_receta, nombre FROM recetas")
+            rows = cursor.fetchmany(batch_size)
+            while rows:
+                yield from rows
+                rows = cursor.fetchmany(batch_size)
+        finally:
+            if self.connection.unread_result:
+                self.connection.consume_results()
+            cursor.close()
+
+    def iter_recipe_terms(self, recipe_id: int = None, batch_size: int = 5000):
+        """Yields the ingredients and tags of every recipe, or of a single recipe, as the rows arrive from the server.
+
+        This is the data the in-memory indexes of `RecipeCatalog` are built from. The rows are streamed with an
+        unbuffered cursor, so loading the whole catalog does not hold every row in memory at once.
+
+        Parameters
+        ----------
+            recipe_id (int, optional): Only yield the terms of this recipe.
+            batch_size (int): The number of rows fetched from the server at a time.
+
+        Yields
+        ------
+            Tuple(int, str, int, str): The recipe ID, the kind of term ('ingrediente' or 'etiqueta'), the ID of the
+            ingredient or tag, and its name.
+        """
+        # LOS INGREDIENTES DE RECETAS SIN GUARDAR TIENEN id_receta NULL
+        condition = '= %s' if recipe_id is not None else 'IS NOT NULL'
+        params = (recipe_id, recipe_id) if recipe_id is not None else ()
+        query = f"""
+            SELECT ingredientes_receta.id_receta, 'ingrediente', ingredientes.id_ingrediente, ingredientes.nombre
+            FROM ingredientes_receta
+            JOIN ingredientes ON ingredientes.id_ingrediente = ingredientes_receta.id_ingrediente
+            WHERE ingredientes_receta.id_receta {condition}
+            UNION ALL
+            SELECT etiquetas_receta.id_receta, 'etiqueta', etiquetas.id_etiqueta, etiquetas.nombre
+            FROM etiquetas_receta
+            JOIN etiquetas ON etiquetas.id_etiqueta = etiquetas_receta.id_etiqueta
+            WHERE etiquetas_receta.id_receta {condition};"""
+        cursor = self.connection.cursor(buffered=False)
+        try:
+            cursor.execute(query, params)
+            rows = cursor.fetchmany(batch_size)
+            while rows:
+                yield from rows
+                rows = cursor.fetchmany(batch_size)
         finally:
+            if self.connection.unread_result:
+                self.connection.consume_results()
             cursor.close()
 
     def get_recipe_by_id(self, recipe_id: int) -> dict:
         """Retrieves a specific recipe and its details from the database based on its ID.
 
         This function fetches information about a recipe and its associated ingredients, preparation steps, and tags from the database tables recetas, ingredientes, ingredientes_receta, pasos, pasos_receta, etiquetas, and etiquetas_receta.
+        Everything is read in a single round trip: the ingredients, steps and tags of the recipe are combined with UNION ALL, each kind of row with its own typed columns, and joined to the recipe row. No value is concatenated into a string, so names and steps may contain commas or parentheses and are never truncated by 'group_concat_max_len'.
+        This is not faster to decode: the client receives one row per ingredient, step and tag instead of one row of strings, so a recipe with 100 ingredients takes longer to fetch than the former GROUP_CONCAT query, and building the typed rows costs about the same as splitting the strings (see benchmarks/recipe_decode.py).
+        Formatted recipes are kept in the shared recipe cache, so opening a recently opened recipe does not query the database again.
 
         Parameters
         ----------
@@ -359,104 +557,95 @@ class DBUtils:
         Returns
         -------
             -  dict: A dictionary representing the recipe with the following keys:
-                - 'id_receta' (int): The ID of the recipe.
+                - 'id' (int): The ID of the recipe.
                 - 'nombre' (str): The name of the recipe.
-                - 'tiempo_preparacion' (int): The preparation time of the recipe in minutes.
-                - 'tiempo_coccion' (int): The cooking time of the recipe in minutes.
+                - 'tiempo de preparacion' (int): The preparation time of the recipe in minutes.
+                - 'tiempo de coccion' (int): The cooking time of the recipe in minutes.
                 - 'imagen' (str): The URL or path of the recipe's image (optional).
                 - 'favorito' (bool): Indicates whether the recipe is marked as a favorite (True or False).
-                - 'ingredientes' (str): A comma-separated list of ingredient names with their quantity and measurement.
-                - 'pasos' (str): A comma-separated list of preparation steps for the recipe.
-                - 'etiquetas' (str): A comma-separated list of tags associated with the recipe.
+                - 'ingredientes' (list[RecipeIngredient]): The ingredients of the recipe, in the order they were added.
+                - 'preparacion' (list[RecipeStep]): The preparation steps of the recipe, in order.
+                - 'etiquetas' (list[RecipeTag]): The tags associated with the recipe.
         """
+        cached = self.cache.get(recipe_id)
+        if cached is not None:
+            return cached
+        # LA GENERACION SE TOMA ANTES DE LEER: SI LA RECETA CAMBIA MIENTRAS TANTO, LA LECTURA NO SE GUARDA
+        generation = self.cache.generation(recipe_id)
         try:
             cursor = self.connection.cursor()
             query = """
                 SELECT
-                    recetas.id_receta, recetas.nombre, recetas.tiempo_preparacion, 
+                    recetas.id_receta, recetas.nombre, recetas.tiempo_preparacion,
                     recetas.tiempo_coccion, recetas.imagen, recetas.favorito,
-                    (
-                        SELECT GROUP_CONCAT(ingredientes.nombre, ' (', ingredientes_receta.cantidad, ' ', ingredientes_receta.medida, ')' SEPARATOR ',')
-                        FROM ingredientes JOIN ingredientes_receta
-                        ON ingredientes.id_ingrediente = ingredientes_receta.id_ingrediente
-                        WHERE ingredientes_receta.id_receta = recetas.id_receta
-                    ) AS ingredientes,
-                    (
-                        SELECT GROUP_CONCAT(pasos.descripcion SEPARATOR ',')
-                        FROM pasos JOIN pasos_receta
-                        ON pasos.id_paso = pasos_receta.id_paso
-                        WHERE pasos_receta.id_receta = recetas.id_receta
-                    ) AS pasos,
-                    (
-                        SELECT GROUP_CONCAT(etiquetas.nombre SEPARATOR ',')
-                        FROM etiquetas JOIN etiquetas_receta
-                        ON etiquetas.id_etiqueta = etiquetas_receta.id_etiqueta
-                        WHERE etiquetas_receta.id_receta = recetas.id_receta
-                    ) AS etiquetas
+                    partes.tipo, partes.id, partes.id_ingrediente, partes.ingrediente, partes.cantidad,
+                    partes.medida, partes.paso, partes.orden, partes.etiqueta
                 FROM recetas
-                WHERE recetas.id_receta = %s;
+                LEFT JOIN (
+                    SELECT 1 AS tipo, ingredientes_receta.id_receta, ingredientes_receta.id_ingredientes_receta AS id,
+                        ingredientes_receta.id_ingrediente, ingredientes.nombre AS ingrediente, ingredientes_receta.cantidad,
+                        ingredientes_receta.medida, NULL AS paso, NULL AS orden, NULL AS etiqueta
+                    FROM ingredientes_receta JOIN ingredientes
+                    ON ingredientes.id_ingrediente = ingredientes_receta.id_ingrediente
+                    WHERE ingredientes_receta.id_receta = %s
+                    UNION ALL
+                    SELECT 2, pasos_receta.id_receta, pasos_receta.id_pasos_receta, pasos_receta.id_paso, NULL, NULL, NULL,
+                        pasos.descripcion, pasos_receta.orden, NULL
+                    FROM pasos_receta JOIN pasos
+                    ON pasos.id_paso = pasos_receta.id_paso
+                    WHERE pasos_receta.id_receta = %s
+                    UNION ALL
+                    SELECT 3, etiquetas_receta.id_receta, etiquetas_receta.id_etiqueta, NULL, NULL, NULL, NULL,
+                        NULL, NULL, etiquetas.nombre
+                    FROM etiquetas_receta JOIN etiquetas
+                    ON etiquetas.id_etiqueta = etiquetas_receta.id_etiqueta
+                    WHERE etiquetas_receta.id_receta = %s
+                ) AS partes ON partes.id_receta = recetas.id_receta
+                WHERE recetas.id_receta = %s
+                ORDER BY partes.tipo, partes.orden, partes.id;
             """
-            value = (recipe_id,)
-            cursor.execute(query, value)
+            cursor.execute(query, (recipe_id,) * 4)
             result = cursor.fetchall()
-            return self.format_recipe(result[0])
+            recipe = self.format_recipe(result)
+            self.cache.put(recipe_id, recipe, generation)
+            return recipe
         finally:
             cursor.close()
 
-    def format_recipe(self, recipe: list):
-        """Formats a recipe list to a standardized structure.
+    def format_recipe(self, rows: list) -> dict:
+        """Builds the recipe dictionary returned by `get_recipe_by_id` from the rows of its query.
 
-        This function takes a recipe list with specific elements and restructures it into a standardized dictionary with more descriptive keys for easier readability and consistency.
-        """
-        names_list, amounts_list = self.separate_ingredients(recipe[6])
-        selected_recipe = {
-            'id': recipe[0],
-            'nombre': recipe[1],
-            'ingredientes': names_list,
-            'cantidades': amounts_list,
-            'preparacion': recipe[7],
-            'tiempo de preparacion': recipe[2],
-            'tiempo de coccion': recipe[3],
-            'imagen': recipe[4],
-            'etiquetas': recipe[8],
-            'favorito': recipe[5]
-        }
-        return selected_recipe
-    
-    def separate_ingredients(self, ingredients: str) -> tuple[list[str]]:
-        """Separates ingredient names and quantities from a comma-separated string.
-
-        This function takes a comma-separated string of ingredient names with their quantities enclosed in parentheses and separates them into two lists: one containing the ingredient names and another containing the corresponding
-        quantities.
-        
-        Parameters
-        ----------
-            - ingredients (str): A comma-separated string of ingredient names with their quantities in the format: "ingredient1 (quantity1), ingredient2 (quantity2), ..."
-        
-        Returns
-        -------
-        - tuple: A tuple containing two lists:
-            - The first list contains the ingredient names.
-            - The second list contains the corresponding ingredient quantities.
+        Every row repeats the recipe columns, followed by the kind of the row (1 ingredient, 2 step, 3 tag) and the
+        columns of that kind. Rows come sorted by kind, so each kind is a contiguous slice that is turned into typed
+        rows without testing the kind of every row. A recipe without ingredients, steps or tags comes back as a single
+        row whose kind is NULL.
 
-        Example
-        -------
-        If ingredients = "Salt (1 tsp), Sugar (2 cups), Flour (500 g)", the function will return: (["Salt", "Sugar", "Flour"], ["1 tsp", "2 cups", "500 g"])
+        Raises
+        ------
+            IndexError: If there are no rows, that is, the recipe does not exist.
         """
-        names = []
-        amounts = []
-        ingredient_list = ingredients.split(',')
-        for ingredient in ingredient_list:
-            name, amount = ingredient.split('(')
-            amount = amount.strip(')')
-            amounts.append(amount)
-            names.append(name.strip())
-        return ','.join(names), ','.join(amounts)
+        header = rows[0]
+        if header[6] is None:
+            rows = []
+        kinds = [row[6] for row in rows]
+        steps_start = kinds.count(1)
+        tags_start = steps_start + kinds.count(2)
+        return {
+            'id': header[0],
+            'nombre': header[1],
+            'ingredientes': list(map(new_ingredient, map(INGREDIENT_COLUMNS, rows[:steps_start]))),
+            'preparacion': list(map(new_step, map(STEP_COLUMNS, rows[steps_start:tags_start]))),
+            'tiempo de preparacion': header[2],
+            'tiempo de coccion': header[3],
+            'imagen': header[4],
+            'etiquetas': list(map(new_tag, map(TAG_COLUMNS, rows[tags_start:]))),
+            'favorito': header[5]
+        }
 
     def delete_recipe(self, recipe_id: int) -> None:
         """Deletes a recipe and its associated records from the database based on its ID.
 
-        This function deletes a specific recipe and its related records from the database tables recetas, ingredientes_receta, pasos_receta, and etiquetas_receta based on the provided recipe_id.
+        This function deletes a specific recipe and its related records from the database tables recetas, ingredientes_receta, pasos_receta, and etiquetas_receta based on the provided recipe_id. The unlink time of its steps is recorded in the same transaction, see `mark_steps_unlinked`.
         
         Parameters
         -------
@@ -464,12 +653,21 @@ class DBUtils:
         """
         try:
             cursor = self.connection.cursor()
+            self.connection.start_transaction()
+            # LOS PASOS QUEDAN DESVINCULADOS POR EL ON DELETE CASCADE, QUE NO DISPARA TRIGGERS
+            cursor.execute("""UPDATE pasos JOIN pasos_receta ON pasos_receta.id_paso = pasos.id_paso
+                              SET pasos.desvinculado_el = CURRENT_TIMESTAMP()
+                              WHERE pasos_receta.id_receta = %s""", (recipe_id,))
             query = "DELETE FROM recetas WHERE id_receta = %s"
             values = (recipe_id,)
             cursor.execute(query, values)
             self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
         finally:
             cursor.close()
+            self.cache.invalidate(recipe_id)
     
     def update_recipe(self, recipe: dict) -> None:
         """Updates a recipe's information in the database based on the provided data.
@@ -488,235 +686,206 @@ class DBUtils:
         """
         try:
             cursor = self.connection.cursor()
-            query = """UPDATE recetas 
-            SET nombre = %s, tiempo_preparacion = %s, tiempo_coccion = %s, imagen = %s, favorito = %s WHERE id_receta = %s"""
-            values = (recipe['nombre'], recipe['tiempo de preparacion'], recipe['tiempo de coccion'], recipe['imagen'], recipe['favorito'], recipe['id'])
-            cursor.execute(query, values)
+            self.update_recipe_row(cursor, recipe)
             self.connection.commit()
         finally:
             cursor.close()
+            self.cache.invalidate(recipe['id'])
+
+    def update_recipe_row(self, cursor, recipe: dict) -> None:
+        """Updates the 'recetas' row of a recipe on the cursor of the caller's transaction. See `update_recipe`."""
+        query = """UPDATE recetas 
+        SET nombre = %s, tiempo_preparacion = %s, tiempo_coccion = %s, imagen = %s, favorito = %s WHERE id_receta = %s"""
+        values = (recipe['nombre'], recipe['tiempo de preparacion'], recipe['tiempo de coccion'], recipe['imagen'], recipe['favorito'], recipe['id'])
+        cursor.execute(query, values)
 
-    def check_and_update(self, recipe_details: dict, original: dict) -> None:
+    def check_and_update(self, recipe_details: dict, original: dict, recipe: dict = None) -> int:
         """Checks for changes in the recipe details and performs updates in the database accordingly.
 
-        This function compares the new recipe details (recipe_details) with the original recipe details (original) to identify changes in ingredients, preparation methods, and tags. It then updates the database to reflect the changes.
+        This function compares the new recipe details (recipe_details) with the original recipe details (original) with `diff_recipe`, which matches ingredients and steps by their IDs and tags by their names in linear time. The changes are then applied inside one transaction, with at most one statement per kind of change:
+        - One DELETE for the removed ingredients, steps and tags each, and one UPDATE that records when the removed steps were unlinked.
+        - One multi-row INSERT for the added ingredients, steps and tags each, after resolving the names of the ingredients and tags with one query. Only new steps and names that do not exist yet need an insert of their own.
+        - One UPDATE ... CASE that renumbers the steps whose position changed.
+        If 'recipe' is given, the 'recetas' row is updated in the same transaction, so the name, times, image and
+        favorite status are never saved without the ingredients, steps and tags. If any statement fails, nothing is
+        changed. The recipe is dropped from the recipe cache, so the next read sees the update.
 
         Parameters
         ----------
-            recipe_details (dict): A dictionary representing the new recipe details with the following keys:
-                - 'id' (int): The ID of the recipe being updated.
-                - 'ingredientes' (list): A list of ingredient names for the updated recipe.
-                - 'preparacion' (list): A list of preparation methods for the updated recipe.
-                - 'etiquetas' (list): A list of tags for the updated recipe.
-                - 'ingredients_id' (list): A list of ingredient IDs associated with the updated recipe.
-                - 'methods_id' (list): A list of preparation method IDs associated with the updated recipe.
-
-            original (dict): A dictionary representing the original recipe details with the following keys:
-                - 'id' (int): The ID of the original recipe.
-                - 'ingredientes' (list): A list of ingredient names in the original recipe.
-                - 'preparacion' (list): A list of preparation methods in the original recipe.
-                - 'etiquetas' (list): A list of tags in the original recipe.
-        """
-        delete_ing = self.check_items(original['ingredientes'], recipe_details['ingredientes'])
-        delete_prep = self.check_items(original['preparacion'], recipe_details['preparacion'])
-        delete_tags = self.check_items(original['etiquetas'], recipe_details['etiquetas'])
-        if delete_ing != []:
-            for ing in delete_ing:
-                self.delete_ingredient_by_name(ing, original['id'])
-        for ing in recipe_details['ingredients_id']:
-            self.add_recipe_id_to_ingredients(ing, original['id'])
-        if delete_prep != []:
-            for prep in delete_prep:
-                self.delete_method_by_name(prep, original['id'])
-        for prep in recipe_details['methods_id']:
-            self.add_prep_method_to_recipe(prep, 1, original['id'])
-        if delete_tags != []:
-            for tag in delete_tags:
-                self.delete_tag_by_name(tag, original['id'])
-        new_tags = self.check_tags(original['etiquetas'], recipe_details['etiquetas'])
-        for tag in new_tags:
-            tag_id = self.create_tag(tag)
-            self.create_tag_recipe(tag_id, original['id'])
-
-    def check_items(self, original, new):
-        original_item = original.split(',')
-        new_item = new.split(',')
-        for item in new_item:
-            if item in original_item:
-                original_item.remove(item)
-        return original_item
-    
-    def check_tags(self, original: str, new: str) -> list[str]:
-        """Compares two comma-separated strings and returns items present in the original string but not in the new string.
+            recipe_details (dict): The edited recipe, as returned by `RecipeDraft.changes`, with the following keys:
+                - 'ingredientes' (list[RecipeIngredient]): The ingredients of the updated recipe. New ones have no ID.
+                - 'preparacion' (list[RecipeStep]): The preparation steps of the updated recipe. New ones have no ID.
+                - 'etiquetas' (list[str]): The tag names of the updated recipe.
 
-        This function takes two comma-separated strings, 'original' and 'new', and compares them to identify items present in the 'original' string but not in the 'new' string. The function returns a list containing those items.
-
-        Parameters
-        ----------
-            original (str): The original comma-separated string.
-            new (str): The new comma-separated string.
+            original (dict): The recipe as returned by `get_recipe_by_id` before it was edited.
+            recipe (dict, optional): The edited 'recetas' row, with the keys described in `update_recipe`.
 
         Returns
         -------
-            list[str]: A list containing items that are present in the 'original' string but not in the 'new' string.
-
-        Example
-        -------
-            If original = "Salt,Sugar,Flour" and new = "Sugar,Flour", the function will return ['Salt'].
-        """
-        original_item = original.split(',')
-        new_item = new.split(',')
-        for item in new_item:
-            if item in original_item:
-                new_item.remove(item)
-        return new_item
-
-    def delete_ingredient_by_name(self, name: str, recipe_id: int):
-        """Deletes an ingredient from a recipe by its name and recipe ID.
-
-        This function deletes a specific ingredient from a recipe based on its name and the recipe's unique ID.
-        The function first fetches the ingredient ID associated with the given name from the 'ingredientes' table.
-        It then deletes the corresponding record from the 'ingredientes_receta' table, which links the ingredient to the recipe.
-
-        Parameters
-        ----------
-            name (str): The name of the ingredient to be deleted from the recipe.
-            recipe_id (int): The ID of the recipe from which the ingredient should be removed.
+            int: The number of statements run. 0 if nothing changed.
         """
+        diff = diff_recipe(original, recipe_details)
+        if not diff and recipe is None:
+            return 0
+        recipe_id = original['id']
+        cursor = StatementCounter(self.connection.cursor())
         try:
-            cursor = self.connection.cursor()
-            query_get_id = "SELECT id_ingrediente FROM ingredientes WHERE nombre = %s"
-            cursor.execute(query_get_id, (name,))
-            ingredient_id = cursor.fetchone()
-
-            query = "DELETE FROM ingredientes_receta WHERE id_receta = %s AND id_ingrediente = %s"
-            values = (recipe_id, ingredient_id[0])
-            cursor.execute(query, values)
+            self.connection.start_transaction()
+            if recipe is not None:
+                self.update_recipe_row(cursor, recipe)
+            self.update_ingredients(cursor, recipe_id, diff.ingredients)
+            self.update_steps(cursor, recipe_id, diff.steps)
+            self.update_tags(cursor, recipe_id, diff.tags)
             self.connection.commit()
+            return cursor.statements
+        except Exception:
+            self.connection.rollback()
+            raise
         finally:
             cursor.close()
+            self.cache.invalidate(recipe_id)
+
+    def update_ingredients(self, cursor, recipe_id: int, diff: RowDiff) -> None:
+        """Applies the changes made to the ingredients of a recipe on the cursor of the caller's transaction."""
+        if diff.removed:
+            placeholders = ', '.join(['%s'] * len(diff.removed))
+            query = f"DELETE FROM ingredientes_receta WHERE id_receta = %s AND id_ingredientes_receta IN ({placeholders})"
+            cursor.execute(query, [recipe_id] + [ingredient.id for ingredient in diff.removed])
+        if diff.added:
+            ingredient_ids = self.ingredient_ids(cursor, [ingredient.nombre for order, ingredient in diff.added])
+            query = "INSERT INTO ingredientes_receta (id_ingrediente, id_receta, cantidad, medida) VALUES (%s, %s, %s, %s)"
+            values = [(ingredient_ids[fold_text(ingredient.nombre)], recipe_id, ingredient.cantidad, ingredient.medida)
+                      for order, ingredient in diff.added]
+            cursor.executemany(query, values)
+
+    def update_steps(self, cursor, recipe_id: int, diff: RowDiff) -> None:
+        """Applies the changes made to the preparation steps of a recipe on the cursor of the caller's transaction.
+
+        Removed steps are only unlinked from the recipe, since other recipes may share them, and their unlink time is
+        recorded; unused 'pasos' rows are left to `db_gc`.
+        """
+        if diff.removed:
+            placeholders = ', '.join(['%s'] * len(diff.removed))
+            query = f"DELETE FROM pasos_receta WHERE id_receta = %s AND id_pasos_receta IN ({placeholders})"
+            cursor.execute(query, [recipe_id] + [step.id for step in diff.removed])
+            self.mark_steps_unlinked(cursor, list(dict.fromkeys(step.id_paso for step in diff.removed)))
+        if diff.added:
+            step_ids = self.step_ids(cursor, [step.descripcion for order, step in diff.added])
+            query = "INSERT INTO pasos_receta (id_paso, id_receta, orden) VALUES (%s, %s, %s)"
+            values = [(step_ids[fold_text(step.descripcion)], recipe_id, order) for order, step in diff.added]
+            cursor.executemany(query, values)
+        if diff.moved:
+            cases = ' '.join(['WHEN %s THEN %s'] * len(diff.moved))
+            placeholders = ', '.join(['%s'] * len(diff.moved))
+            query = f"UPDATE pasos_receta SET orden = CASE id_pasos_receta {cases} END WHERE id_receta = %s AND id_pasos_receta IN ({placeholders})"
+            values = [value for order, step in diff.moved for value in (step.id, order)]
+            cursor.execute(query, values + [recipe_id] + [step.id for order, step in diff.moved])
+
+    def update_tags(self, cursor, recipe_id: int, diff: RowDiff) -> None:
+        """Applies the changes made to the tags of a recipe on the cursor of the caller's transaction."""
+        if diff.removed:
+            placeholders = ', '.join(['%s'] * len(diff.removed))
+            query = f"DELETE FROM etiquetas_receta WHERE id_receta = %s AND id_etiqueta IN ({placeholders})"
+            cursor.execute(query, [recipe_id] + [tag.id for tag in diff.removed])
+        if diff.added:
+            tag_ids = self.tag_ids(cursor, [tag for order, tag in diff.added])
+            query = "INSERT INTO etiquetas_receta (id_etiqueta, id_receta) VALUES (%s, %s)"
+            cursor.executemany(query, [(tag_ids[fold_text(tag)], recipe_id) for order, tag in diff.added])
 
-    def delete_tag_by_name(self, name: str, recipe_id: int) -> None:
-        """Deletes a tag from a recipe by its name and recipe ID.
+# SEARCH ----------------------------------------------------------
+    
+    def search_by_name(self, name: str) -> list:
+        """Searches for recipes with a word in their name starting with each word of the search term.
 
-        This function deletes a specific tag from a recipe based on its name and the recipe's unique ID.
-        The function first fetches the tag ID associated with the given name from the 'etiquetas' table.
-        It then deletes the corresponding record from the 'etiquetas_receta' table, which links the tag to the recipe.
+        This function uses the FULLTEXT index on 'recetas.nombre' with prefix matching in boolean mode, so it does not
+        scan the table, and it is case- and accent-insensitive ('limon' finds 'Tarta de limón'). Search terms with no
+        word long enough to be indexed fall back to a 'LIKE term%' lookup on the name index.
 
         Parameters
         ----------
-            name (str): The name of the tag to be deleted from the recipe.
-            recipe_id (int): The ID of the recipe from which the tag should be removed.
-        """
-        try:
-            cursor = self.connection.cursor()
-            query_get_id = "SELECT id_etiqueta FROM etiquetas WHERE nombre = %s"
-            cursor.execute(query_get_id, (name,))
-            tag_id = cursor.fetchone()
-
-            query = "DELETE FROM etiquetas_receta WHERE id_receta = %s AND id_etiqueta = %s"
-            values = (recipe_id, tag_id[0])
-            cursor.execute(query, values)
-            self.connection.commit()
-        finally:
-            cursor.close()
-
-    def delete_method_by_name(self, name: str, recipe_id: int) -> None:
-        """Deletes a preparation method from a recipe by its name and recipe ID.
-
-        This function deletes a specific preparation method from a recipe based on its name and the recipe's unique ID.
-        The function first fetches the preparation method ID associated with the given name from the 'pasos' table.
-        It then deletes the corresponding record from the 'pasos_receta' table, which links the preparation method to the recipe.
+            name (str): The search term to look for in recipe names.
 
-        Parameters 
-        ----------
-            name (str): The name of the preparation method to be deleted from the recipe.
-            recipe_id (int): The ID of the recipe from which the preparation method should be removed.
+        Returns
+        -------
+            list: A list of recipes matching the search criteria. Each recipe is represented as a tuple with the following elements:
+                - ID of the recipe (int).
+                - Name of the recipe (str).
+                - Preparation time of the recipe in minutes (int).
+                - Cooking time of the recipe in minutes (int).
+                - Timestamp when the recipe was created (str).
+                - Comma-separated string of ingredient names used in the recipe (str).
         """
+        terms = full_text_terms(name)
+        if terms:
+            # TODAS LAS PALABRAS SON OBLIGATORIAS
+            condition = "MATCH(recetas.nombre) AGAINST (%s IN BOOLEAN MODE)"
+            value = ' '.join(f'+{term}' for term in terms.split())
+        else:
+            condition = "recetas.nombre LIKE %s"
+            value = f"{name.strip().replace('%', '').replace('_', '')}%"
         try:
             cursor = self.connection.cursor()
-            query_get_id = "SELECT id_paso FROM pasos WHERE nombre = %s"
-            cursor.execute(query_get_id, (name,))
-            prep_id = cursor.fetchone()
+            query = f"""
+                SELECT recetas.id_receta, recetas.nombre, recetas.tiempo_preparacion, recetas.tiempo_coccion, recetas.creado_el,
+                (
+                    SELECT GROUP_CONCAT(ingredientes.nombre SEPARATOR ',')
+                    FROM ingredientes
+                    JOIN ingredientes_receta
+                    ON ingredientes.id_ingrediente = ingredientes_receta.id_ingrediente
+                    WHERE ingredientes_receta.id_receta = recetas.id_receta
+                ) AS ingredientes
+                FROM recetas
+                WHERE {condition};
+            """
+            cursor.execute(query, (value,))
 
-            query = "DELETE FROM pasos_receta WHERE id_receta = %s AND id_paso = %s"
-            values = (recipe_id, prep_id[0])
-            cursor.execute(query, values)
-            self.connection.commit()
+            found_recipes = cursor.fetchall()
+            return found_recipes
         finally:
             cursor.close()
 
-# TAGS --------------------------------------
+    def search_by_filter(self, query) -> list:
+        """Searches for recipes matching every condition of a `RecipeQuery`.
 
-    def create_tag(self, tag_name: str) -> int:
-        """Creates a new tag in the 'etiquetas' table and returns its ID.
-
-        This function inserts a new tag with the provided name into the 'etiquetas' table. The function returns the ID of the newly created tag.
+        All the conditions (time ranges, favourite, creation date, tags and ingredients) are resolved by a single
+        statement, see 'recipe_query.py'.
 
         Parameters
         ----------
-            tag_name (str): The name of the new tag to be created.
+            query (RecipeQuery): The filter to apply.
 
         Returns
         -------
-            int: The ID of the newly created tag.
+            list: A list of tuples with the same elements returned by `search_by_name`, ordered by recipe ID.
         """
-        cursor = self.connection.cursor()
+        statement, params = query.build()
         try:
-            query = "INSERT INTO etiquetas (nombre) VALUES (%s)"
-            values = (tag_name,)
-            cursor.execute(query, values)
-            self.connection.commit()
-
-            cursor.execute("SELECT LAST_INSERT_ID()")
-            return cursor.fetchone()[0]
-        finally:
-            cursor.close()
-            
-# TAG_RECIPE ------------------------------------
-
-    def create_tag_recipe(self, tag_id: int, recipe_id: int) -> None:
-        """Links a tag to a recipe by creating a record in the 'etiquetas_receta' table.
-
-        This function links a tag to a recipe by inserting a new record into the 'etiquetas_receta' table.
-        The record establishes a connection between the given tag ID and the given recipe ID.
-
-        Parameters
-        ----------
-            tag_id (int): The ID of the tag to be linked to the recipe.
-            recipe_id (int): The ID of the recipe to which the tag should be linked.
-        """
-        cursor = self.connection.cursor()
-        try:
-            query = "INSERT INTO etiquetas_receta (id_etiqueta, id_receta) VALUES (%s, %s)"
-            values = (tag_id, recipe_id)
-            cursor.execute(query, values)
-            self.connection.commit()
+            cursor = self.connection.cursor()
+            cursor.execute(statement, params)
+            return cursor.fetchall()
         finally:
             cursor.close()
 
-# SEARCH ----------------------------------------------------------
-    
-    def search_by_name(self, name: str) -> list:
-        """Searches for recipes with names containing the given search term.
+    def search_full_text(self, text: str) -> list:
+        """Searches the names, preparation steps and ingredients of every recipe and ranks the results by relevance.
 
-        This function performs a search in the 'recetas' table for recipes with names that contain the provided search term.
-        It returns a list of recipes that match the search criteria.
+        Each word of 'text' is matched as a prefix, case- and accent-insensitively, against the FULLTEXT indexes of
+        'recetas.nombre', 'pasos.descripcion' and 'ingredientes.nombre'. The relevance of a recipe is the sum of the
+        relevance of its matches, weighted so that a match in the name counts more than one in an ingredient, and one
+        in an ingredient more than one in a step.
 
         Parameters
         ----------
-            name (str): The search term to look for in recipe names.
+            text (str): The words to search for.
 
         Returns
         -------
-            list: A list of recipes matching the search criteria. Each recipe is represented as a tuple with the following elements:
-                - ID of the recipe (int).
-                - Name of the recipe (str).
-                - Preparation time of the recipe in minutes (int).
-                - Cooking time of the recipe in minutes (int).
-                - Timestamp when the recipe was created (str).
-                - Comma-separated string of ingredient names used in the recipe (str).
+            list: Up to SEARCH_LIMIT recipes, most relevant first, as tuples with the same elements returned by
+            `search_by_name`. An empty list if 'text' has no word long enough to be indexed.
         """
+        terms = full_text_terms(text)
+        if not terms:
+            return []
         try:
             cursor = self.connection.cursor()
             query = """
@@ -728,13 +897,33 @@ class DBUtils:
                     ON ingredientes.id_ingrediente = ingredientes_receta.id_ingrediente
                     WHERE ingredientes_receta.id_receta = recetas.id_receta
                 ) AS ingredientes
-                FROM recetas
-                WHERE recetas.nombre LIKE %s;
+                FROM (
+                    SELECT coincidencias.id_receta, SUM(coincidencias.relevancia) AS relevancia
+                    FROM (
+                        SELECT recetas.id_receta, MATCH(recetas.nombre) AGAINST (%s IN BOOLEAN MODE) * 3 AS relevancia
+                        FROM recetas
+                        WHERE MATCH(recetas.nombre) AGAINST (%s IN BOOLEAN MODE)
+                        UNION ALL
+                        SELECT ingredientes_receta.id_receta, MATCH(ingredientes.nombre) AGAINST (%s IN BOOLEAN MODE) * 2
+                        FROM ingredientes
+                        JOIN ingredientes_receta ON ingredientes.id_ingrediente = ingredientes_receta.id_ingrediente
+                        WHERE MATCH(ingredientes.nombre) AGAINST (%s IN BOOLEAN MODE)
+                        UNION ALL
+                        SELECT pasos_receta.id_receta, MATCH(pasos.descripcion) AGAINST (%s IN BOOLEAN MODE)
+                        FROM pasos
+                        JOIN pasos_receta ON pasos.id_paso = pasos_receta.id_paso
+                        WHERE MATCH(pasos.descripcion) AGAINST (%s IN BOOLEAN MODE)
+                    ) AS coincidencias
+                    WHERE coincidencias.id_receta IS NOT NULL
+                    GROUP BY coincidencias.id_receta
+                    ORDER BY relevancia DESC
+                    LIMIT %s
+                ) AS ranking
+                JOIN recetas ON recetas.id_receta = ranking.id_receta
+                ORDER BY ranking.relevancia DESC, recetas.id_receta;
             """
-            cursor.execute(query, (f'%{name}%',))
-
-            found_recipes = cursor.fetchall()
-            return found_recipes
+            cursor.execute(query, (terms,) * 6 + (self.SEARCH_LIMIT,))
+            return cursor.fetchall()
         finally:
             cursor.close()
 
@@ -872,4 +1061,4 @@ class DBUtils:
 if __name__ == "__main__":
     db = DBUtils()
     db.connect()
-    ing = db.read_ingredients([1,2,4])
\ No newline at end of file
+    ing = db.read_ingredient_names()
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""Background Database Worker for Recipe Manager
+
+Tkinter widgets may only be touched from the thread that runs the main loop, so a slow query run from a button
+handler freezes the whole window. DBWorker runs database calls on a small pool of worker threads, each with its own
+pooled DBUtils connection, and hands the results back to the Tk thread through 'after()' callbacks.
+
+Tasks can be grouped under a key (for example 'search'). Submitting a new task with the same key cancels the
+previous one: if it has not started it never runs, and if it is already running its result is discarded.
+"""
+
+from src.utils.db_utils import DBUtils
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+
+
+class DBWorker:
+    """Runs DBUtils calls off the Tk thread and delivers their results back on it.
+
+    Parameters
+    ----------
+        widget (tk.Widget): Any widget of the application, used to schedule the 'after()' callbacks.
+        workers (int): The number of worker threads (and database connections) used.
+        poll_ms (int): How often, in milliseconds, finished tasks are checked while there are tasks pending.
+        on_busy (callable, optional): Called with True when the first task is submitted and with False when the
+            last pending task finishes. Used to show a busy indicator.
+    """
+    def __init__(self, widget, workers: int = 2, poll_ms: int = 20, on_busy=None) -> None:
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self.on_busy = on_busy
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='db-worker')
+        self.results = queue.Queue()
+        self.local = threading.local()
+        self.connections = []
+        self.connections_lock = threading.Lock()
+        self.generations = {}
+        self.futures = {}
+        self.pending = 0
+        self.polling = False
+
+    def db_utils(self) -> DBUtils:
+        """Returns the DBUtils of the current worker thread, connecting it on first use."""
+        db_utils = getattr(self.local, 'db_utils', None)
+        if db_utils is None:
+            db_utils = DBUtils()
+            db_utils.connect()
+            self.local.db_utils = db_utils
+            with self.connections_lock:
+                self.connections.append(db_utils)
+        return db_utils
+
+    def submit(self, task, *args, on_done=None, on_error=None, key: str = None) -> None:
+        """Runs 'task(db_utils, *args)' on a worker thread.
+
+        Parameters
+        ----------
+            task (callable): The function to run. It receives the worker's DBUtils followed by 'args'.
+            *args: Extra arguments passed to the task.
+            on_done (callable, optional): Called on the Tk thread with the result of the task.
+            on_error (callable, optional): Called on the Tk thread with the exception raised by the task.
+            key (str, optional): Tasks with the same key supersede each other; only the newest result is delivered.
+        """
+        generation = None
+        if key is not None:
+            self.cancel(key)
+            generation = self.generations[key]
+        self.pending += 1
+        if self.pending == 1 and self.on_busy is not None:
+            self.on_busy(True)
+        future = self.executor.submit(self.run, task, args, key, generation, on_done, on_error)
+        if key is not None:
+            self.futures[key] = future
+        future.add_done_callback(self.on_future_done)
+        if not self.polling:
+            self.polling = True
+            self.widget.after(self.poll_ms, self.poll)
+
+    def on_future_done(self, future) -> None:
+        """Counts cancelled tasks as finished, since they never reach 'run' to report their outcome."""
+        if future.cancelled():
+            self.results.put(None)
+
+    def run(self, task, args, key, generation, on_done, on_error) -> None:
+        """Runs a task on the worker thread and queues its outcome for the Tk thread."""
+        try:
+            db_utils = self.db_utils()
+            db_utils.ensure_connection()
+            result = task(db_utils, *args)
+            self.results.put((key, generation, on_done, result))
+        except Exception as e:
+            self.results.put((key, generation, on_error, e))
+
+    def cancel(self, key: str) -> None:
+        """Cancels the pending task with the given key and discards its result if it is already running."""
+        self.generations[key] = self.generations.get(key, 0) + 1
+        future = self.futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def poll(self) -> None:
+        """Delivers the outcome of finished tasks on the Tk thread. Stops polling when nothing is pending."""
+        deliveries = []
+        while True:
+            try:
+                outcome = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if outcome is None:
+                continue
+            key, generation, callback, value = outcome
+            if key is not None and generation != self.generations.get(key):
+                continue
+            if key is not None:
+                self.futures.pop(key, None)
+            if callback is not None:
+                deliveries.append((callback, value))
+        if self.pending > 0:
+            self.widget.after(self.poll_ms, self.poll)
+        else:
+            self.polling = False
+            if self.on_busy is not None:
+                self.on_busy(False)
+        for callback, value in deliveries:
+            callback(value)
+
+    def shutdown(self) -> None:
+        """Stops the worker threads and returns their connections to the pool."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        with self.connections_lock:
+            for db_utils in self.connections:
+                db_utils.disconnect()
+            self.connections = []
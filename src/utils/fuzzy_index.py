@@ -0,0 +1,143 @@
+"""Typo-Tolerant Search Index for Recipe Manager
+
+FuzzyIndex finds recipes whose name, ingredients or tags are spelled almost like the search term ('berengena' finds
+'berenjena'). Comparing the term with every word of the catalog would grow with the vocabulary, so candidates are
+found through a trigram index first:
+
+- Every word of the vocabulary is split into trigrams ('  b', ' be', 'ber', ...), and each trigram points to the
+  words that contain it.
+- A single edit changes at most 3 trigrams, so a word within edit distance d of the term shares at least
+  'trigrams(term) - 3 * d' trigrams with it. Only the words sharing that many trigrams are compared with the
+  Levenshtein distance.
+
+Counting the shared trigrams over every bucket of the term would still read a share of the whole vocabulary: common
+trigrams (' ma', 'ta ') are in thousands of words. Two filters bound the candidates instead:
+
+- Length: a word within distance d has a length within d of the term's, so the words of each trigram are bucketed
+  by length and only 2d + 1 lengths are read.
+- Prefix: a word missing at most 3d of the term's trigrams contains at least one of any 3d + 1 of them, so only the
+  buckets of the 3d + 1 rarest trigrams of the term are read. The most frequent trigrams are never scanned; the
+  overlap of each candidate with the term is counted on its own trigrams.
+"""
+
+from src.utils.search_index import InvertedIndex, NotCursor, OrCursor, PostingCursor, fold_text, take
+import re
+
+
+def trigrams(word: str) -> set[str]:
+    """Returns the trigrams of a word, padded so the first letters count as much as the rest."""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def levenshtein(first: str, second: str, limit: int) -> int:
+    """Returns the edit distance between two strings, or 'limit + 1' as soon as it is known to exceed 'limit'."""
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    previous = list(range(len(second) + 1))
+    for i, char in enumerate(first, 1):
+        current = [i]
+        for j, other in enumerate(second, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def max_distance(term: str) -> int:
+    """Returns the number of typos tolerated in a term: none up to 3 letters, one up to 7, two from 8."""
+    if len(term) <= 3:
+        return 0
+    return 1 if len(term) <= 7 else 2
+
+
+class FuzzyIndex:
+    """Indexes the words of recipe names and the ingredient and tag names of every recipe for typo-tolerant search.
+
+    Attributes
+    ----------
+        terms (InvertedIndex): The recipes of each indexed word or name.
+        trigrams (dict[str, dict[int, set[str]]]): The indexed words and names that contain each trigram, by length.
+    """
+    def __init__(self) -> None:
+        self.terms = InvertedIndex()
+        self.trigrams = {}
+
+    def set_recipe(self, recipe_id: int, name: str, names) -> None:
+        """Indexes a recipe under its name, the words of its name, and the given ingredient and tag names."""
+        words = [word for word in re.findall(r'\w+', fold_text(name)) if len(word) >= 3]
+        before = self.terms.recipe_terms.get(recipe_id, set())
+        self.terms.set_terms(recipe_id, [name, *words, *names])
+        self.update_vocabulary(before | self.terms.recipe_terms[recipe_id])
+
+    def remove(self, recipe_id: int) -> None:
+        """Removes a recipe from the index. Does nothing if it is not indexed."""
+        before = self.terms.recipe_terms.get(recipe_id, set())
+        self.terms.remove(recipe_id)
+        self.update_vocabulary(before)
+
+    def update_vocabulary(self, changed: set) -> None:
+        """Adds to the trigram index the words that are now used by a recipe, and removes the ones no longer used."""
+        for term in changed:
+            used = term in self.terms.postings
+            for gram in trigrams(term):
+                if used:
+                    self.trigrams.setdefault(gram, {}).setdefault(len(term), set()).add(term)
+                    continue
+                lengths = self.trigrams.get(gram)
+                bucket = lengths.get(len(term)) if lengths is not None else None
+                if bucket is not None:
+                    bucket.discard(term)
+                    if not bucket:
+                        del lengths[len(term)]
+                        if not lengths:
+                            del self.trigrams[gram]
+
+    def candidates(self, term: str, limit_distance: int) -> list[str]:
+        """Returns the indexed words that share enough trigrams with a term to be within 'limit_distance' of it."""
+        grams = trigrams(term)
+        needed = max(1, len(grams) - 3 * limit_distance)
+        lengths = range(len(term) - limit_distance, len(term) + limit_distance + 1)
+        buckets = []
+        for gram in grams:
+            by_length = self.trigrams.get(gram, {})
+            buckets.append([by_length[length] for length in lengths if length in by_length])
+        # SOLO LOS 'len(grams) - needed + 1' TRIGRAMAS MAS RAROS: UNA PALABRA CERCANA TIENE AL MENOS UNO DE ELLOS
+        buckets.sort(key=lambda words: sum(map(len, words)))
+        seen = set()
+        for words in buckets[:len(grams) - needed + 1]:
+            for bucket in words:
+                seen.update(bucket)
+        return [word for word in seen if len(grams & trigrams(word)) >= needed]
+
+    def search(self, text: str, limit: int = None) -> list[tuple[int, int]]:
+        """Finds the recipes with a name, name word, ingredient or tag within a few typos of 'text'.
+
+        Returns
+        -------
+            list[tuple[int, int]]: The recipe ID and the number of typos of its closest match, ranked by fewest
+            typos and then by ID.
+        """
+        term = fold_text(text)
+        if not term:
+            return []
+        limit_distance = max_distance(term)
+        words = {}
+        for candidate in self.candidates(term, limit_distance):
+            distance = levenshtein(term, candidate, limit_distance)
+            if distance <= limit_distance:
+                words.setdefault(distance, []).append(candidate)
+        # LAS RECETAS SE LEEN POR DISTANCIA Y POR ID, HASTA JUNTAR 'limit', SIN LISTAR TODAS LAS COINCIDENCIAS
+        ranked = []
+        closer = []
+        for distance in sorted(words):
+            cursor = OrCursor([PostingCursor(self.terms.postings[word]) for word in words[distance]])
+            if closer:
+                cursor = NotCursor(cursor, OrCursor([PostingCursor(self.terms.postings[word]) for word in closer]))
+            remaining = None if limit is None else limit - len(ranked)
+            ranked.extend((recipe_id, distance) for recipe_id in take(cursor, remaining))
+            if limit is not None and len(ranked) >= limit:
+                break
+            closer.extend(words[distance])
+        return ranked
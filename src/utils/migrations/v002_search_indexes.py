@@ -0,0 +1,18 @@
+"""Adds the secondary indexes used by the lookups and searches of 'db_utils.py'.
+
+The name indexes are plain: existing databases may still hold names that only differ in case or accents ("Tomate",
+"tomate"), and a unique index on them would fail here or in the collation change of v003. Ingredient names only
+become unique in v007, on their folded key 'nombre_clave', after the duplicates are merged.
+"""
+
+DESCRIPTION = 'Indices de busqueda'
+
+
+def upgrade(ctx) -> None:
+    ctx.add_index('ingredientes', 'idx_ingredientes_nombre', 'nombre')
+    ctx.add_index('etiquetas', 'idx_etiquetas_nombre', 'nombre')
+    ctx.add_index('recetas', 'idx_recetas_nombre', 'nombre')
+    ctx.add_index('recetas', 'idx_recetas_tiempo_preparacion', 'tiempo_preparacion')
+    ctx.add_index('ingredientes_receta', 'idx_ingredientes_receta_receta', 'id_receta, id_ingrediente')
+    ctx.add_index('pasos_receta', 'idx_pasos_receta_receta', 'id_receta, orden')
+    ctx.add_index('etiquetas_receta', 'idx_etiquetas_receta_receta', 'id_receta, id_etiqueta')
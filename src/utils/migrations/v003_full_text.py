@@ -0,0 +1,37 @@
+"""Adds the FULLTEXT indexes used by 'DBUtils.search_full_text' and 'DBUtils.search_by_name'.
+
+The indexed columns are moved to the accent- and case-insensitive 'utf8mb4_0900_ai_ci' collation first, so the
+full-text parser folds 'limón' and 'limon' to the same token. Columns already using it (the MySQL 8 default) are
+left untouched.
+
+Changing the collation of an indexed column cannot be done in place: MySQL copies the whole table, and writes to it
+are blocked until the copy ends (reads go on). A copy-and-swap of the table is not an option, the '*_receta' tables
+have foreign keys to 'recetas' and 'ingredientes'. The migration must run while the application is closed; the
+dry run warns about every table that will be rebuilt and its number of rows, and '--synthetic N' measures how long
+the rebuild takes.
+"""
+
+DESCRIPTION = 'Indices de texto completo'
+
+columns = (
+    ('recetas', 'nombre', 'VARCHAR(75) NOT NULL'),
+    ('pasos', 'descripcion', 'VARCHAR(255)'),
+    ('ingredientes', 'nombre', 'VARCHAR(75) NOT NULL'),
+)
+
+
+def upgrade(ctx) -> None:
+    for table, column, definition in columns:
+        collation = ctx.scalar("""SELECT collation_name FROM information_schema.columns
+                                  WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s""",
+                               (table, column))
+        if collation == 'utf8mb4_0900_ai_ci':
+            continue
+        rows = ctx.scalar(f"SELECT COUNT(*) FROM {table}") or 0
+        ctx.warn(f"'{table}' se copia entera para cambiar la intercalacion de '{column}' ({rows} filas): "
+                 f"las escrituras quedan bloqueadas hasta que termine")
+        ctx.execute(f"ALTER TABLE {table} MODIFY {column} {definition} "
+                    f"CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci, ALGORITHM=COPY, LOCK=SHARED")
+    ctx.add_index('recetas', 'ft_recetas_nombre', 'nombre', kind='FULLTEXT')
+    ctx.add_index('pasos', 'ft_pasos_descripcion', 'descripcion', kind='FULLTEXT')
+    ctx.add_index('ingredientes', 'ft_ingredientes_nombre', 'nombre', kind='FULLTEXT')
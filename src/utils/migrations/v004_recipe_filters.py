@@ -0,0 +1,20 @@
+"""Adds the total time column and the indexes used by the filters of 'recipe_query.py'.
+
+'tiempo_total' is a stored generated column (preparation plus cooking time), so a range on it can use an index.
+Adding a stored generated column cannot be done in place: MySQL copies the whole 'recetas' table and blocks writes
+to it until the copy ends, so the migration must run while the application is closed (see v003).
+"""
+
+DESCRIPTION = 'Filtros de recetas'
+
+
+def upgrade(ctx) -> None:
+    if not ctx.column_exists('recetas', 'tiempo_total'):
+        rows = ctx.scalar("SELECT COUNT(*) FROM recetas") or 0
+        ctx.warn(f"'recetas' se copia entera para agregar la columna generada 'tiempo_total' ({rows} filas): "
+                 f"las escrituras quedan bloqueadas hasta que termine")
+    ctx.add_column('recetas', 'tiempo_total', 'INT AS (tiempo_preparacion + tiempo_coccion) STORED')
+    ctx.add_index('recetas', 'idx_recetas_tiempo_total', 'tiempo_total')
+    ctx.add_index('recetas', 'idx_recetas_tiempo_coccion', 'tiempo_coccion')
+    ctx.add_index('recetas', 'idx_recetas_creado_el', 'creado_el')
+    ctx.add_index('recetas', 'idx_recetas_favorito_creado', 'favorito, creado_el')
@@ -0,0 +1,16 @@
+"""Adds the creation time of 'ingredientes_receta' and 'pasos' rows, used by 'db_gc.py' to find orphans.
+
+Ingredients and steps are written before the recipe they belong to, so a row that is not linked to any recipe may
+still be in use by an open window. Only orphans older than a grace period are collected, which needs their age.
+Existing rows get the time of the migration, so the first collection waits a full grace period.
+The indexes let the collector find the orphans without scanning the tables.
+"""
+
+DESCRIPTION = 'Fecha de creacion de ingredientes y pasos'
+
+
+def upgrade(ctx) -> None:
+    ctx.add_column('ingredientes_receta', 'creado_el', 'TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP()')
+    ctx.add_column('pasos', 'creado_el', 'TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP()')
+    ctx.add_index('ingredientes_receta', 'idx_ingredientes_receta_huerfanos', 'id_receta, creado_el')
+    ctx.add_index('pasos', 'idx_pasos_creado_el', 'creado_el')
@@ -0,0 +1,54 @@
+"""Merges duplicated tags and steps and makes 'etiquetas.nombre' and 'pasos.descripcion' unique.
+
+Tags and steps used to be inserted once per recipe, so every recipe tagged "postre" had its own "postre" row. Each
+group of rows with the same name, as compared by the column collation, is merged into the row with the lowest ID:
+- The links of the join table are moved to that row.
+- A tag linked twice to the same recipe keeps a single link. A step may appear twice in a recipe, so its links are
+  only moved.
+- The other rows of the group are deleted.
+
+The unique indexes then keep the tables one row per name, and back the 'INSERT ... ON DUPLICATE KEY UPDATE' used by
+'DBUtils.dictionary_ids'. The plain index on 'etiquetas.nombre' from v002 is replaced by the unique one.
+"""
+
+DESCRIPTION = 'Etiquetas y pasos sin duplicados'
+
+# (TABLA, CLAVE, COLUMNA DEL NOMBRE, TABLA DE ENLACES, CLAVE DE LOS ENLACES, UN SOLO ENLACE POR RECETA)
+dictionaries = (
+    ('etiquetas', 'id_etiqueta', 'nombre', 'etiquetas_receta', 'id_etiquetas_receta', True),
+    ('pasos', 'id_paso', 'descripcion', 'pasos_receta', 'id_pasos_receta', False),
+)
+
+
+def canonical(table: str, key: str, name: str) -> str:
+    """Returns a derived table with the lowest ID of every duplicated name of 'table'."""
+    return f"""(SELECT {name} AS nombre, MIN({key}) AS id FROM {table}
+                WHERE {name} IS NOT NULL GROUP BY {name} HAVING COUNT(*) > 1)"""
+
+
+def merge(ctx, table: str, key: str, name: str, links: str, link_key: str, single_link: bool) -> None:
+    """Moves the links of the duplicated rows of 'table' to the first row of their group and deletes the rest."""
+    ctx.execute(f"""UPDATE {links}
+                    JOIN {table} ON {table}.{key} = {links}.{key}
+                    JOIN {canonical(table, key, name)} AS canonico ON canonico.nombre = {table}.{name}
+                    SET {links}.{key} = canonico.id
+                    WHERE {links}.{key} <> canonico.id""")
+    if single_link:
+        ctx.execute(f"""DELETE repetido FROM {links} AS repetido
+                        JOIN {links} AS primero
+                        ON primero.id_receta = repetido.id_receta AND primero.{key} = repetido.{key}
+                        AND primero.{link_key} < repetido.{link_key}""")
+    ctx.execute(f"""DELETE {table} FROM {table}
+                    JOIN {canonical(table, key, name)} AS canonico ON canonico.nombre = {table}.{name}
+                    WHERE {table}.{key} <> canonico.id""")
+
+
+def upgrade(ctx) -> None:
+    for table, key, name, links, link_key, single_link in dictionaries:
+        duplicates = ctx.scalar(f"SELECT COUNT(*) - COUNT(DISTINCT {name}) FROM {table} WHERE {name} IS NOT NULL")
+        if duplicates:
+            merge(ctx, table, key, name, links, link_key, single_link)
+    ctx.add_index('etiquetas', 'uq_etiquetas_nombre', 'nombre', unique=True)
+    if ctx.index_exists('etiquetas', 'idx_etiquetas_nombre'):
+        ctx.execute("ALTER TABLE etiquetas DROP INDEX idx_etiquetas_nombre, ALGORITHM=INPLACE, LOCK=NONE")
+    ctx.add_index('pasos', 'uq_pasos_descripcion', 'descripcion', unique=True)
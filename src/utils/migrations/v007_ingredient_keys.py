@@ -0,0 +1,57 @@
+"""Adds 'ingredientes.nombre_clave', the folded ingredient name used by 'DBUtils.ingredient_ids', and merges the
+ingredients whose names only differ in case, accents or spacing.
+
+Ingredients used to be looked up by exact name, so "Tomate", "tomate" and "tomáte" could be three rows. The keys are
+computed with the same 'fold_text' the application uses, and each group of rows with the same key is merged into the
+row with the lowest ID: the links of 'ingredientes_receta' are moved to it and the other rows are deleted. The
+merge and the backfill run as set-based statements over a temporary table, not one statement per ingredient.
+
+The key may be longer than the name ('ß' -> 'ss'), so the column is wider than 'nombre'. It uses a binary collation:
+keys are already folded, and must only be equal when 'fold_text' says so.
+
+Databases migrated by an earlier v002 have a unique index on 'nombre' ('uq_ingredientes_nombre'). It is replaced by
+the plain 'idx_ingredientes_nombre': the folded key is the only uniqueness rule.
+"""
+
+from src.utils.search_index import fold_text
+
+DESCRIPTION = 'Clave normalizada de ingredientes'
+
+key_column = 'VARCHAR(150) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin'
+
+keys_table = f"""CREATE TEMPORARY TABLE claves_ingredientes (
+                    id_ingrediente INT NOT NULL PRIMARY KEY,
+                    id_canonico INT NOT NULL,
+                    nombre_clave {key_column} NOT NULL)"""
+
+
+def upgrade(ctx) -> None:
+    ctx.add_column('ingredientes', 'nombre_clave', f'{key_column} DEFAULT NULL')
+    canonical = {}
+    rows = []
+    for ingredient_id, name in ctx.query("SELECT id_ingrediente, nombre FROM ingredientes ORDER BY id_ingrediente"):
+        key = fold_text(name)
+        rows.append((ingredient_id, canonical.setdefault(key, ingredient_id), key))
+
+    ctx.execute(keys_table)
+    if rows:
+        ctx.executemany("INSERT INTO claves_ingredientes (id_ingrediente, id_canonico, nombre_clave) VALUES (%s, %s, %s)",
+                        rows)
+    if len(canonical) < len(rows):
+        ctx.execute("""UPDATE ingredientes_receta
+                       JOIN claves_ingredientes ON claves_ingredientes.id_ingrediente = ingredientes_receta.id_ingrediente
+                       SET ingredientes_receta.id_ingrediente = claves_ingredientes.id_canonico
+                       WHERE claves_ingredientes.id_canonico <> claves_ingredientes.id_ingrediente""")
+        ctx.execute("""DELETE ingredientes FROM ingredientes
+                       JOIN claves_ingredientes ON claves_ingredientes.id_ingrediente = ingredientes.id_ingrediente
+                       WHERE claves_ingredientes.id_canonico <> claves_ingredientes.id_ingrediente""")
+    ctx.execute("""UPDATE ingredientes
+                   JOIN claves_ingredientes ON claves_ingredientes.id_ingrediente = ingredientes.id_ingrediente
+                   SET ingredientes.nombre_clave = claves_ingredientes.nombre_clave""")
+    ctx.execute("DROP TEMPORARY TABLE claves_ingredientes")
+
+    ctx.execute(f"ALTER TABLE ingredientes MODIFY nombre_clave {key_column} NOT NULL")
+    ctx.add_index('ingredientes', 'uq_ingredientes_nombre_clave', 'nombre_clave', unique=True)
+    ctx.add_index('ingredientes', 'idx_ingredientes_nombre', 'nombre')
+    if ctx.index_exists('ingredientes', 'uq_ingredientes_nombre'):
+        ctx.execute("ALTER TABLE ingredientes DROP INDEX uq_ingredientes_nombre, ALGORITHM=INPLACE, LOCK=NONE")
@@ -0,0 +1,17 @@
+"""Adds 'pasos.desvinculado_el', the last time a step was removed from a recipe, used by 'db_gc.py'.
+
+Steps are shared since v006, so a step is usually old when it becomes an orphan: its creation time says nothing about
+how long it has been unused, and the collector deleted a step just removed from a recipe while the name caches of
+other processes still held its ID. 'DBUtils' now records when a step is unlinked, and the collector waits a grace
+period after that time instead.
+
+Existing orphans get the time of the migration, so the first collection waits a full grace period.
+"""
+
+DESCRIPTION = 'Fecha de desvinculacion de pasos'
+
+
+def upgrade(ctx) -> None:
+    ctx.add_column('pasos', 'desvinculado_el', 'TIMESTAMP NULL DEFAULT NULL')
+    ctx.execute("""UPDATE pasos SET desvinculado_el = CURRENT_TIMESTAMP()
+                   WHERE NOT EXISTS (SELECT 1 FROM pasos_receta WHERE pasos_receta.id_paso = pasos.id_paso)""")
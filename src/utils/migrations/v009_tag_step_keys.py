@@ -0,0 +1,71 @@
+"""Adds 'etiquetas.nombre_clave' and 'pasos.descripcion_clave', the folded names used by 'DBUtils.tag_ids' and
+'DBUtils.step_ids', and makes them the unique keys of the tables.
+
+v006 made 'etiquetas.nombre' and 'pasos.descripcion' unique under their column collation, but the name caches key
+tags and steps with 'fold_text', which also collapses spaces and may differ from the collation (a binary 'pasos'
+column told "Sal" from "sal"). A cached ID could then belong to a different row than the one the unique index would
+have matched. As v007 did for ingredients, the folded key is now stored in a binary column and the unique index is
+built on it, so the database and the caches compare names with the same rule:
+- Each group of rows with the same key is merged into the row with the lowest ID: the links of the join table are
+  moved to it, a tag linked twice to the same recipe keeps a single link, and the other rows are deleted.
+- The unique indexes of v006 are dropped. 'etiquetas.nombre' keeps a plain index for 'DBUtils.search_by_tags'.
+
+Rows without a name get no key.
+"""
+
+from src.utils.search_index import fold_text
+
+DESCRIPTION = 'Clave normalizada de etiquetas y pasos'
+
+key_column = 'VARCHAR({}) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin DEFAULT NULL'
+
+# (TABLA, CLAVE, COLUMNA DEL NOMBRE, COLUMNA DE LA CLAVE, LARGO, TABLA DE ENLACES, CLAVE DE LOS ENLACES, UN SOLO ENLACE)
+dictionaries = (
+    ('etiquetas', 'id_etiqueta', 'nombre', 'nombre_clave', 90, 'etiquetas_receta', 'id_etiquetas_receta', True),
+    ('pasos', 'id_paso', 'descripcion', 'descripcion_clave', 300, 'pasos_receta', 'id_pasos_receta', False),
+)
+
+keys_table = """CREATE TEMPORARY TABLE claves (
+                    id INT NOT NULL PRIMARY KEY,
+                    id_canonico INT NOT NULL,
+                    clave VARCHAR(300) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL)"""
+
+
+def add_keys(ctx, table: str, key: str, name: str, column: str, length: int, links: str, link_key: str,
+             single_link: bool) -> None:
+    """Adds and fills the key column of 'table', merging the rows whose names fold to the same key."""
+    ctx.add_column(table, column, key_column.format(length))
+    canonical = {}
+    rows = []
+    for row_id, value in ctx.query(f"SELECT {key}, {name} FROM {table} WHERE {name} IS NOT NULL ORDER BY {key}"):
+        folded = fold_text(value)
+        rows.append((row_id, canonical.setdefault(folded, row_id), folded))
+
+    ctx.execute(keys_table)
+    if rows:
+        ctx.executemany("INSERT INTO claves (id, id_canonico, clave) VALUES (%s, %s, %s)", rows)
+    if len(canonical) < len(rows):
+        ctx.execute(f"""UPDATE {links} JOIN claves ON claves.id = {links}.{key}
+                        SET {links}.{key} = claves.id_canonico
+                        WHERE claves.id_canonico <> claves.id""")
+        if single_link:
+            ctx.execute(f"""DELETE repetido FROM {links} AS repetido
+                            JOIN {links} AS primero
+                            ON primero.id_receta = repetido.id_receta AND primero.{key} = repetido.{key}
+                            AND primero.{link_key} < repetido.{link_key}""")
+        ctx.execute(f"""DELETE {table} FROM {table} JOIN claves ON claves.id = {table}.{key}
+                        WHERE claves.id_canonico <> claves.id""")
+    ctx.execute(f"""UPDATE {table} JOIN claves ON claves.id = {table}.{key}
+                    SET {table}.{column} = claves.clave""")
+    ctx.execute("DROP TEMPORARY TABLE claves")
+
+
+def upgrade(ctx) -> None:
+    for dictionary in dictionaries:
+        add_keys(ctx, *dictionary)
+    ctx.add_index('etiquetas', 'uq_etiquetas_nombre_clave', 'nombre_clave', unique=True)
+    ctx.add_index('pasos', 'uq_pasos_descripcion_clave', 'descripcion_clave', unique=True)
+    ctx.add_index('etiquetas', 'idx_etiquetas_nombre', 'nombre')
+    for table, index in (('etiquetas', 'uq_etiquetas_nombre'), ('pasos', 'uq_pasos_descripcion')):
+        if ctx.index_exists(table, index):
+            ctx.execute(f"ALTER TABLE {table} DROP INDEX {index}, ALGORITHM=INPLACE, LOCK=NONE")
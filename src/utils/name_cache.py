@@ -0,0 +1,145 @@
+"""Name Cache for Recipe Manager
+
+Tags and preparation steps are dictionaries: every name is stored once and recipes link to it by ID. The same names
+("postre", "Precalentar el horno") are looked up again each time a recipe is saved, so NameCache keeps the IDs of the
+names read last:
+
+- Keys are folded names (see `fold_text`), the values of the binary key columns ('nombre_clave', 'descripcion_clave')
+  the unique indexes of the tables are built on, so a cached ID is always the row the database would match.
+- The cache is bounded: when it is full, the least recently used name is evicted.
+- Every entry expires 'ttl' seconds after it was stored, so rows deleted by another process are eventually forgotten.
+- Only IDs read from committed rows are stored, never the ID of a row inserted by a transaction that may roll back.
+
+There is one cache per table, shared by every DBUtils instance of the process.
+
+Ingredients use a NameInterner instead: the application never deletes an ingredient and the vocabulary is small, so
+every ingredient name read once stays interned for the life of the process, without a bound or a time to live. Only
+migrations merge ingredients (v007): `db_migrate.migrate` clears the caches of its process, and the application must
+be restarted after migrating.
+"""
+
+from src.utils.db_config import NAME_CACHE_CONFIG
+from collections import OrderedDict
+import threading
+import time
+
+
+class NameCache:
+    """A bounded LRU cache from folded names to row IDs, with a time to live.
+
+    Parameters
+    ----------
+        size (int): The maximum number of names kept.
+        ttl (float): Seconds an entry stays valid after it was stored.
+
+    Attributes
+    ----------
+        entries (OrderedDict[str, tuple[float, int]]): The expiry time and ID of each cached name, least recently
+            used first.
+        hits (int): Number of names resolved by the cache.
+        misses (int): Number of names that had to be read from the database.
+    """
+    def __init__(self, size: int, ttl: float) -> None:
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> int:
+        """Returns the ID cached for a folded name, or None if it is not cached or has expired."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, row_id: int) -> None:
+        """Stores the ID of a folded name, evicting the least recently used names if the cache is full."""
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, row_id)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drops every cached name, e.g. after rows of the table were deleted."""
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the cache counters, with the keys 'size', 'entries', 'hits' and 'misses'."""
+        with self.lock:
+            return {'size': self.size, 'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class NameInterner:
+    """An unbounded table from folded names to row IDs, for dictionaries whose rows are never deleted.
+
+    Lookups are a single dictionary read without taking the lock: a name is only ever added, always with the same ID,
+    so a reader sees either no entry or the right one.
+
+    Attributes
+    ----------
+        ids (dict[str, int]): The ID of each interned folded name.
+        hits (int): Number of names resolved by the interner.
+        misses (int): Number of names that had to be read from the database.
+    """
+    def __init__(self) -> None:
+        self.ids = {}
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> int:
+        """Returns the ID interned for a folded name, or None if it has not been read yet."""
+        row_id = self.ids.get(key)
+        if row_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return row_id
+
+    def put(self, key: str, row_id: int) -> None:
+        """Interns the ID of a folded name."""
+        with self.lock:
+            self.ids[key] = row_id
+
+    def clear(self) -> None:
+        """Forgets every interned name, e.g. after a migration merged rows."""
+        with self.lock:
+            self.ids = {}
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the interner counters, with the keys 'entries', 'hits' and 'misses'."""
+        return {'entries': len(self.ids), 'hits': self.hits, 'misses': self.misses}
+
+
+_interner = None
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_name_cache(table: str) -> NameCache:
+    """Returns the process-wide name cache of a table, creating it on first use."""
+    with _caches_lock:
+        if table not in _caches:
+            _caches[table] = NameCache(NAME_CACHE_CONFIG['size'], NAME_CACHE_CONFIG['ttl'])
+        return _caches[table]
+
+
+def get_ingredient_interner() -> NameInterner:
+    """Returns the process-wide ingredient name interner, creating it on first use."""
+    global _interner
+    with _caches_lock:
+        if _interner is None:
+            _interner = NameInterner()
+        return _interner
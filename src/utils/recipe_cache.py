@@ -0,0 +1,151 @@
+"""Recipe Cache for Recipe Manager
+
+Opening a recipe runs one query over the recipe, its ingredients, steps and tags, and then formats the result. The same
+popular recipes are opened again and again, so RecipeCache keeps the formatted recipes of the last ones opened:
+
+- The cache is bounded: when it is full, the least recently used recipe is evicted.
+- Every entry expires 'ttl' seconds after it was read, so changes made outside the application are picked up too.
+- DBUtils invalidates the entry of a recipe whenever it changes the recipe, its ingredients, its steps or its tags.
+- A read that missed the cache may finish after a concurrent change invalidated the recipe, and would then store the
+  recipe as it was before the change for a whole time to live. Every invalidation bumps the generation of the recipe:
+  the reader takes the generation before querying the database and `put` drops the result if it changed.
+
+The cache is shared by every DBUtils instance of the process, and keeps counters for hits, misses, evictions,
+expirations and invalidations.
+"""
+
+from src.utils.db_config import CACHE_CONFIG
+from collections import OrderedDict
+import threading
+import time
+
+
+def copy_recipe(recipe: dict) -> dict:
+    """Returns a copy of a recipe dictionary whose lists can be modified without changing the original."""
+    return {key: list(value) if isinstance(value, list) else value for key, value in recipe.items()}
+
+
+class RecipeCache:
+    """A bounded LRU cache of formatted recipes, with a time to live.
+
+    Parameters
+    ----------
+        size (int): The maximum number of recipes kept.
+        ttl (float): Seconds an entry stays valid after it was stored.
+
+    Attributes
+    ----------
+        entries (OrderedDict[int, tuple[float, dict]]): The expiry time and recipe of each cached recipe ID, least
+            recently used first.
+        hits (int): Number of reads served by the cache.
+        misses (int): Number of reads that had to go to the database.
+        evictions (int): Number of entries dropped to make room for a new one.
+        expirations (int): Number of entries dropped because their time to live had passed.
+        invalidations (int): Number of entries dropped because the recipe changed.
+        generations (dict[int, int]): The number of invalidations of each recipe ever invalidated. It grows with the
+            number of distinct recipes changed while the process runs.
+        epoch (int): The number of times the whole cache was cleared.
+        discarded (int): Number of reads not stored because the recipe changed while it was being read.
+    """
+    def __init__(self, size: int, ttl: float) -> None:
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.generations = {}
+        self.epoch = 0
+        self.discarded = 0
+
+    def get(self, recipe_id: int) -> dict:
+        """Returns a copy of the cached recipe, or None if it is not cached or has expired.
+
+        A copy is returned so the windows can modify the recipe they are showing without changing the cached one.
+        Ingredients, steps and tags are immutable rows, so only the dictionary and its lists are copied.
+        """
+        with self.lock:
+            entry = self.entries.get(recipe_id)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self.entries[recipe_id]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(recipe_id)
+            self.hits += 1
+            return copy_recipe(entry[1])
+
+    def generation(self, recipe_id: int) -> tuple[int, int]:
+        """Returns the current generation of a recipe, to be passed to `put` with the recipe read after this call."""
+        with self.lock:
+            return self.epoch, self.generations.get(recipe_id, 0)
+
+    def put(self, recipe_id: int, recipe: dict, generation: tuple[int, int] = None) -> None:
+        """Stores a copy of a recipe, evicting the least recently used ones if the cache is full.
+
+        If 'generation' is given and the recipe was invalidated since it was taken, the recipe may be older than the
+        change and is not stored.
+        """
+        recipe = copy_recipe(recipe)
+        with self.lock:
+            if generation is not None and generation != (self.epoch, self.generations.get(recipe_id, 0)):
+                self.discarded += 1
+                return
+            self.entries[recipe_id] = (time.monotonic() + self.ttl, recipe)
+            self.entries.move_to_end(recipe_id)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, recipe_id: int) -> None:
+        """Drops the cached copy of a recipe, and makes the reads of the recipe already running skip the cache."""
+        with self.lock:
+            self.generations[recipe_id] = self.generations.get(recipe_id, 0) + 1
+            if self.entries.pop(recipe_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drops every cached recipe, and makes the reads already running skip the cache."""
+        with self.lock:
+            self.epoch += 1
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the cache counters.
+
+        Returns
+        -------
+            dict: A dictionary with the keys 'size', 'entries', 'hits', 'misses', 'evictions', 'expirations',
+            'invalidations' and 'discarded'.
+        """
+        with self.lock:
+            return {
+                'size': self.size,
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'discarded': self.discarded
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_recipe_cache() -> RecipeCache:
+    """Returns the process-wide recipe cache, creating it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RecipeCache(CACHE_CONFIG['size'], CACHE_CONFIG['ttl'])
+        return _cache
@@ -0,0 +1,97 @@
+"""Recipe Diff for Recipe Manager
+
+Saving an edited recipe used to compare comma-joined names with quadratic 'list.remove' loops, and then ran a lookup
+and a delete, each committed on its own, for every ingredient, step or tag that changed. This module only computes
+what changed between the recipe as it was read and the edited one; `DBUtils.check_and_update` applies the result with
+a few batched statements in one transaction.
+
+Rows are matched by a key in linear time: ingredients and steps by the ID of their link to the recipe, so two rows
+with the same text are never confused, and tags by their folded name. Rows without a key are new. Only steps have an
+order stored in the database, so only their moves are reported.
+"""
+
+from src.utils.search_index import fold_text
+from operator import attrgetter
+from typing import Callable, NamedTuple
+
+
+class RowDiff(NamedTuple):
+    """The changes made to one list of rows of a recipe.
+
+    Attributes
+    ----------
+        added (list[tuple[int, Any]]): The new rows, with their 1-based position in the edited list.
+        removed (list): The original rows that are not in the edited list.
+        moved (list[tuple[int, Any]]): The kept rows whose stored position changed, with their new 1-based position.
+    """
+    added: list
+    removed: list
+    moved: list
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.moved)
+
+
+class RecipeDiff(NamedTuple):
+    """The changes made to the ingredients, steps and tags of a recipe."""
+    ingredients: RowDiff
+    steps: RowDiff
+    tags: RowDiff
+
+    def __bool__(self) -> bool:
+        return bool(self.ingredients or self.steps or self.tags)
+
+
+def diff_rows(original: list, edited: list, key: Callable, position: Callable = None) -> RowDiff:
+    """Computes the rows added, removed and moved between two lists in O(n + m).
+
+    Parameters
+    ----------
+        original (list): The rows as they were read.
+        edited (list): The rows after the edition.
+        key (Callable): Returns the key that identifies a row, or None for a row that is new.
+        position (Callable, optional): Returns the stored 1-based position of an original row. If it is given, kept
+            rows whose position differs from their place in 'edited' are reported as moved.
+
+    Returns
+    -------
+        RowDiff: The changes. Repeated keys in 'edited' are only counted once.
+    """
+    stored = {key(row): row for row in original}
+    kept = set()
+    added = []
+    moved = []
+    for index, row in enumerate(edited, start=1):
+        row_key = key(row)
+        if row_key is not None and row_key in kept:
+            continue
+        if row_key is None or row_key not in stored:
+            added.append((index, row))
+            if row_key is not None:
+                kept.add(row_key)
+            continue
+        kept.add(row_key)
+        if position is not None and position(stored[row_key]) != index:
+            moved.append((index, row))
+    removed = [row for row_key, row in stored.items() if row_key not in kept]
+    return RowDiff(added, removed, moved)
+
+
+def diff_recipe(original: dict, edited: dict) -> RecipeDiff:
+    """Computes the changes between a recipe as returned by `DBUtils.get_recipe_by_id` and its edited version.
+
+    Parameters
+    ----------
+        original (dict): The recipe before it was edited.
+        edited (dict): The edited recipe, as returned by `RecipeDraft.changes`. Its tags are names.
+
+    Returns
+    -------
+        RecipeDiff: The changes. Added tags are names; removed tags are `RecipeTag` rows.
+    """
+    return RecipeDiff(
+        ingredients=diff_rows(original['ingredientes'], edited['ingredientes'], attrgetter('id')),
+        steps=diff_rows(original['preparacion'], edited['preparacion'], attrgetter('id'), attrgetter('orden')),
+        # LAS ETIQUETAS SE COMPARAN COMO LA COLUMNA 'nombre': SIN MAYUSCULAS NI ACENTOS
+        tags=diff_rows(original['etiquetas'], edited['etiquetas'], lambda tag: fold_text(getattr(tag, 'nombre', tag)))
+    )
@@ -0,0 +1,121 @@
+"""Recipe Draft for Recipe Manager
+
+The recipe windows used to write every ingredient and step to the database as soon as it was added, and to delete it
+again when it was removed, so building one recipe took dozens of commits that were discarded if the window was
+cancelled. RecipeDraft holds the ingredients, steps, tags and image of the recipe being created or edited in memory:
+the dialogs only change the draft, and the database is written once, when the recipe is saved.
+
+New ingredients and steps have no ID until they are saved. An edited recipe keeps the IDs of the rows it was read
+with, so saving it only has to apply the differences.
+"""
+
+from src.utils.db_utils import RecipeIngredient, RecipeStep
+import os
+
+
+class RecipeDraft:
+    """The ingredients, steps, tags and image of a recipe, as edited in a recipe window.
+
+    Parameters
+    ----------
+        recipe (dict, optional): A recipe as returned by `DBUtils.get_recipe_by_id`, to edit it. By default the
+            draft is empty, for a new recipe.
+
+    Attributes
+    ----------
+        id (int): The ID of the edited recipe, or None for a new one.
+        ingredients (list[RecipeIngredient]): The ingredients, in order. New ones have no ID.
+        steps (list[RecipeStep]): The preparation steps, in order. New ones have no ID.
+        tags (list[str]): The tag names.
+        image (str): The path the recipe will reference for its image, or None.
+        image_source (str): The file chosen for the image, copied to the images folder on save, or None.
+    """
+    def __init__(self, recipe: dict = None) -> None:
+        recipe = recipe or {}
+        self.id = recipe.get('id')
+        self.ingredients = list(recipe.get('ingredientes', []))
+        self.steps = list(recipe.get('preparacion', []))
+        self.tags = [tag.nombre for tag in recipe.get('etiquetas', [])]
+        self.image = recipe.get('imagen')
+        self.image_source = None
+
+    def add_ingredient(self, name: str, amount: int, unit: str) -> RecipeIngredient:
+        """Adds a new ingredient at the end of the list and returns it."""
+        ingredient = RecipeIngredient(None, None, name.strip(), amount, unit)
+        self.ingredients.append(ingredient)
+        return ingredient
+
+    def remove_last_ingredient(self) -> RecipeIngredient:
+        """Removes the last ingredient of the list and returns it.
+
+        Raises
+        ------
+            IndexError: If there are no ingredients.
+        """
+        return self.ingredients.pop()
+
+    def add_step(self, description: str) -> RecipeStep:
+        """Adds a new step at the end of the preparation and returns it."""
+        step = RecipeStep(None, None, len(self.steps) + 1, description)
+        self.steps.append(step)
+        return step
+
+    def remove_last_step(self) -> RecipeStep:
+        """Removes the last step of the preparation and returns it.
+
+        Raises
+        ------
+            IndexError: If there are no steps.
+        """
+        return self.steps.pop()
+
+    def set_tags(self, text: str) -> None:
+        """Sets the tags from a comma-separated text. Blank tags and repetitions are dropped."""
+        self.tags = list(dict.fromkeys(tag.strip() for tag in text.split(',') if tag.strip()))
+
+    def tags_text(self) -> str:
+        """Returns the tags as the comma-separated text shown in the windows."""
+        return ','.join(self.tags)
+
+    def set_image(self, source: str) -> None:
+        """Chooses a new image file. It is copied to the images folder when the recipe is saved."""
+        self.image_source = source
+        self.image = "images\\" + os.path.basename(source)  # CORREGIR FORMATO
+
+    def clear_image(self) -> None:
+        """Removes the image of the recipe."""
+        self.image = None
+        self.image_source = None
+
+    def ingredient_rows(self) -> list[tuple[str, str]]:
+        """Returns the amount and name of every ingredient, as shown in the ingredient lists."""
+        return [(ingredient.amount(), ingredient.nombre) for ingredient in self.ingredients]
+
+    def new_recipe(self, name: str, prep_time: int, cook_time: int, favorite: int) -> dict:
+        """Returns the dictionary saved by `DBUtils.save_recipe_bulk` for a new recipe with this draft.
+
+        Parameters
+        ----------
+            name (str): The name of the recipe.
+            prep_time (int): The preparation time of the recipe in minutes.
+            cook_time (int): The cooking time of the recipe in minutes.
+            favorite (int): 1 if the recipe is a favorite, 0 otherwise.
+        """
+        return {
+            'name': name,
+            'prep_time': prep_time,
+            'cook_time': cook_time,
+            'image': self.image,
+            'favorite': favorite,
+            'tags': self.tags,
+            'ingredients': [(ingredient.nombre, ingredient.cantidad, ingredient.medida) for ingredient in self.ingredients],
+            'steps': [step.descripcion for step in self.steps]
+        }
+
+    def changes(self) -> dict:
+        """Returns the dictionary compared by `DBUtils.check_and_update` with the recipe the draft was read from."""
+        return {
+            'ingredientes': self.ingredients,
+            'preparacion': self.steps,
+            'etiquetas': self.tags
+        }
@@ -0,0 +1,131 @@
+"""Recipe Query Builder for Recipe Manager
+
+RecipeQuery combines several filters (time ranges, favourite, creation date, tags and ingredients) into a single
+parameterized SELECT over 'recetas', instead of chaining one search per criterion and intersecting the results in
+Python. Every condition is written against an indexed column so MySQL can pick the most selective index:
+
+- Preparation, cooking and total time ranges use 'idx_recetas_tiempo_preparacion', 'idx_recetas_tiempo_coccion' and
+  'idx_recetas_tiempo_total' (the stored generated column 'tiempo_total').
+- Favourite and creation date use 'idx_recetas_favorito_creado' and 'idx_recetas_creado_el'.
+- Tags and ingredients are semi-joins on the unique folded-name indexes ('nombre_clave') and the '*_receta' join
+  tables.
+
+Example:
+    query = RecipeQuery().prep_time(maximum=30).total_time(maximum=60).favorite().with_tags(['vegano'])
+    recipes = db_utils.search_by_filter(query)
+"""
+
+from src.utils.search_index import fold_text
+from datetime import date
+
+
+class RecipeQuery:
+    """A composable filter over the recipes. Every method adds a condition and returns the query, so calls can be
+    chained. Conditions are combined with AND.
+
+    Attributes
+    ----------
+        conditions (list[str]): The SQL conditions of the WHERE clause.
+        params (list): The parameters of the conditions, in order.
+        max_rows (int, optional): The maximum number of recipes returned.
+    """
+    def __init__(self) -> None:
+        self.conditions = []
+        self.params = []
+        self.max_rows = None
+
+    def range(self, column: str, minimum=None, maximum=None) -> 'RecipeQuery':
+        """Adds an inclusive range on a column of 'recetas'. A missing bound is not checked."""
+        if minimum is not None:
+            self.conditions.append(f'recetas.{column} >= %s')
+            self.params.append(minimum)
+        if maximum is not None:
+            self.conditions.append(f'recetas.{column} <= %s')
+            self.params.append(maximum)
+        return self
+
+    def prep_time(self, minimum: int = None, maximum: int = None) -> 'RecipeQuery':
+        """Filters by preparation time, in minutes."""
+        return self.range('tiempo_preparacion', minimum, maximum)
+
+    def cook_time(self, minimum: int = None, maximum: int = None) -> 'RecipeQuery':
+        """Filters by cooking time, in minutes."""
+        return self.range('tiempo_coccion', minimum, maximum)
+
+    def total_time(self, minimum: int = None, maximum: int = None) -> 'RecipeQuery':
+        """Filters by preparation plus cooking time, in minutes."""
+        return self.range('tiempo_total', minimum, maximum)
+
+    def created(self, since: date = None, until: date = None) -> 'RecipeQuery':
+        """Filters by creation date. Both dates are inclusive."""
+        if since is not None:
+            self.conditions.append('recetas.creado_el >= %s')
+            self.params.append(since)
+        if until is not None:
+            # HASTA EL FINAL DEL DIA INDICADO
+            self.conditions.append('recetas.creado_el < %s + INTERVAL 1 DAY')
+            self.params.append(until)
+        return self
+
+    def favorite(self, is_favorite: bool = True) -> 'RecipeQuery':
+        """Keeps only the favourite recipes, or only the ones that are not favourites."""
+        self.conditions.append('recetas.favorito = %s')
+        self.params.append(1 if is_favorite else 0)
+        return self
+
+    def with_tags(self, tags: list[str]) -> 'RecipeQuery':
+        """Keeps the recipes that have every one of the given tags."""
+        return self.with_all('etiquetas', 'id_etiqueta', 'etiquetas_receta', tags)
+
+    def with_ingredients(self, ingredients: list[str]) -> 'RecipeQuery':
+        """Keeps the recipes that use every one of the given ingredients."""
+        return self.with_all('ingredientes', 'id_ingrediente', 'ingredientes_receta', ingredients)
+
+    def with_all(self, table: str, key: str, join_table: str, names: list[str]) -> 'RecipeQuery':
+        """Keeps the recipes linked through 'join_table' to a row of 'table' for every one of the given names.
+
+        Names are compared by their folded key (see `fold_text`), stored in the binary 'nombre_clave' column, so the
+        duplicates removed here and the names counted by the HAVING clause follow the same rule.
+        """
+        keys = list(dict.fromkeys(fold_text(name) for name in names if name.strip()))
+        if not keys:
+            return self
+        placeholders = ', '.join(['%s'] * len(keys))
+        self.conditions.append(f"""recetas.id_receta IN (
+                    SELECT {join_table}.id_receta
+                    FROM {join_table}
+                    JOIN {table} ON {table}.{key} = {join_table}.{key}
+                    WHERE {table}.nombre_clave IN ({placeholders})
+                    GROUP BY {join_table}.id_receta
+                    HAVING COUNT(DISTINCT {table}.nombre_clave) = %s)""")
+        self.params.extend(keys)
+        self.params.append(len(keys))
+        return self
+
+    def limit(self, max_rows: int) -> 'RecipeQuery':
+        """Limits the number of recipes returned."""
+        self.max_rows = max_rows
+        return self
+
+    def build(self) -> tuple[str, tuple]:
+        """Returns the SQL statement and its parameters.
+
+        The statement returns the same columns as `DBUtils.read_recipes_page`, ordered by recipe ID.
+        """
+        where = f"WHERE {' AND '.join(self.conditions)}" if self.conditions else ''
+        limit = 'LIMIT %s' if self.max_rows is not None else ''
+        params = self.params + ([self.max_rows] if self.max_rows is not None else [])
+        query = f"""
+                SELECT recetas.id_receta, recetas.nombre, recetas.tiempo_preparacion, recetas.tiempo_coccion, recetas.creado_el,
+                (
+                    SELECT GROUP_CONCAT(ingredientes.nombre SEPARATOR ',')
+                    FROM ingredientes
+                    JOIN ingredientes_receta
+                    ON ingredientes.id_ingrediente = ingredientes_receta.id_ingrediente
+                    WHERE ingredientes_receta.id_receta = recetas.id_receta
+                ) AS ingredientes
+                FROM recetas
+                {where}
+                ORDER BY recetas.id_receta
+                {limit};"""
+        return query, tuple(params)
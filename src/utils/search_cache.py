@@ -0,0 +1,71 @@
+"""Search Result Cache for Recipe Manager
+
+Search-as-you-type runs a search on almost every keystroke. SearchCache keeps the results of the latest searches so
+that:
+
+- Going back to a previous query (for example with backspace) does not query the database again.
+- A query that extends a previous one ('pollo' after 'pol') is answered by filtering the previous results locally,
+  when the search guarantees that the new results are a subset of the old ones.
+
+The second point only holds for searches where typing more can only narrow the results, and whose results are not
+truncated. The name search qualifies in its FULLTEXT mode: every word must start a word of the name ('+pol*'), so
+lengthening a word or adding one keeps a subset. Its fallback for short terms, 'LIKE term%', matches the start of
+the whole name instead, so a query that extends a short one ('pollo' after 'po') may find more: the main window only
+refines from queries with an indexed word (`can_refine`). A search that ORs its words, matches substrings or stops
+at a limit must not be refined.
+
+Refining runs on the Tk thread and costs one check per cached row, so only queries with at most 'refine_limit' results
+are refined. A longer list is searched again on the background worker, like a query that was never cached.
+
+The cache is emptied whenever a recipe is created, edited or deleted.
+"""
+
+from collections import OrderedDict
+
+
+class SearchCache:
+    """A least-recently-used cache of search results, keyed by query.
+
+    Parameters
+    ----------
+        can_refine (callable): Called with a cached query; returns True if the results of any query extending it
+            are a subset of its results.
+        matcher (callable): Called with a query; returns a function that is called with a result row and returns
+            True if the row matches the query. The query is prepared once per refinement, not once per row.
+        size (int): The maximum number of queries kept.
+        refine_limit (int): The maximum number of results of a cached query that is refined locally.
+    """
+    def __init__(self, can_refine, matcher, size: int = 32, refine_limit: int = 2000) -> None:
+        self.size = size
+        self.refine_limit = refine_limit
+        self.can_refine = can_refine
+        self.matcher = matcher
+        self.entries = OrderedDict()
+
+    def get(self, query: str) -> list:
+        """Returns the results of a query, from the cache or by refining a cached query. None if neither applies."""
+        rows = self.entries.get(query)
+        if rows is not None:
+            self.entries.move_to_end(query)
+            return rows
+        # EL PREFIJO MAS LARGO YA BUSCADO TIENE LA MENOR CANTIDAD DE FILAS PARA FILTRAR
+        base = max((cached for cached, rows in self.entries.items()
+                    if query.startswith(cached) and len(rows) <= self.refine_limit and self.can_refine(cached)),
+                   key=len, default=None)
+        if base is None:
+            return None
+        matches = self.matcher(query)
+        rows = [row for row in self.entries[base] if matches(row)]
+        self.put(query, rows)
+        return rows
+
+    def put(self, query: str, rows: list) -> None:
+        """Stores the results of a query, evicting the least recently used query if the cache is full."""
+        self.entries[query] = rows
+        self.entries.move_to_end(query)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Empties the cache."""
+        self.entries.clear()
@@ -0,0 +1,495 @@
+"""In-Memory Search Indexes for Recipe Manager
+
+These indexes hold a compact copy of the catalog in memory so that searches over many recipes do not need a round trip
+per term. The inverted index stores the recipe IDs of each term as a sorted array of 32-bit ints, so a posting costs 4
+bytes per recipe that uses the term, whatever the highest recipe ID. Queries are evaluated lazily with cursors that skip
+through the arrays with binary search, and stop as soon as enough results are found. The AND of two terms, the most
+common query, intersects the arrays in chunks instead (see `IntersectCursor`).
+"""
+
+from array import array
+from functools import lru_cache
+from itertools import compress
+import bisect
+import heapq
+import re
+import unicodedata
+
+
+@lru_cache(maxsize=65536)
+def fold_text(text: str) -> str:
+    """Normalizes a name for lookups: lowercase, without accents and with single spaces ('Limón ' -> 'limon').
+
+    Results are cached: the same ingredient and tag names are folded once per recipe that uses them.
+    """
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.split())
+
+
+class PostingCursor:
+    """Walks a sorted array of recipe IDs. `advance` skips ahead with binary search instead of one ID at a time."""
+    def __init__(self, ids) -> None:
+        self.ids = ids
+        self.position = 0
+
+    def advance(self, target: int) -> int:
+        """Returns the first ID greater than or equal to 'target', or None if there is none.
+
+        Targets must not decrease between calls, so the cursor never moves back.
+        """
+        self.position = bisect.bisect_left(self.ids, target, self.position)
+        return self.ids[self.position] if self.position < len(self.ids) else None
+
+
+class AndCursor:
+    """The IDs present in every child cursor, found by leapfrogging: each child skips to the largest ID seen so far."""
+    def __init__(self, children: list) -> None:
+        self.children = children
+
+    def advance(self, target: int) -> int:
+        candidate = target
+        while True:
+            for child in self.children:
+                found = child.advance(candidate)
+                if found is None:
+                    return None
+                if found != candidate:
+                    candidate = found
+                    break
+            else:
+                return candidate
+
+
+class IntersectCursor:
+    """The IDs present in two sorted arrays, intersected a chunk of the shorter array at a time.
+
+    Leapfrogging two postings pays a Python-level binary search per step, so an AND of two terms with few recipes in
+    common walks both arrays one ID at a time. Here each chunk of the shorter array is intersected with the slice of
+    the longer array between its first and last IDs in C: with a set when the slice is of a similar size, or with
+    a binary search per ID when the slice is much longer. Chunks are only intersected as the results are taken, and
+    they start small and double up to CHUNK_SIZE, so 'take' still stops soon after the limit when the terms have
+    many recipes in common.
+    """
+    FIRST_CHUNK = 128
+    CHUNK_SIZE = 4096
+    # UNA BUSQUEDA BINARIA POR ID CUESTA LO QUE RECORRER UNAS 32 POSICIONES DEL OTRO ARREGLO CON UN SET
+    PROBE_RATIO = 32
+
+    def __init__(self, first, second) -> None:
+        self.short, self.long = sorted((first, second), key=len)
+        self.start = 0
+        self.chunk_size = self.FIRST_CHUNK
+        self.found = array('i')
+        self.cursor = PostingCursor(self.found)
+
+    def advance(self, target: int) -> int:
+        while True:
+            found = self.cursor.advance(target)
+            if found is not None or self.start >= len(self.short):
+                return found
+            self.intersect_chunk(target)
+
+    def intersect_chunk(self, target: int) -> None:
+        """Appends to 'found' the common IDs of the next chunk of the shorter array, skipping the IDs below 'target'."""
+        short, long = self.short, self.long
+        start = bisect.bisect_left(short, target, self.start)
+        chunk = short[start:start + self.chunk_size]
+        self.start = start + len(chunk)
+        self.chunk_size = min(2 * self.chunk_size, self.CHUNK_SIZE)
+        if not chunk:
+            return
+        low = bisect.bisect_left(long, chunk[0])
+        high = bisect.bisect_right(long, chunk[-1], low)
+        if len(chunk) * self.PROBE_RATIO < high - low:
+            for recipe_id in chunk:
+                low = bisect.bisect_left(long, recipe_id, low, high)
+                if low < high and long[low] == recipe_id:
+                    self.found.append(recipe_id)
+        else:
+            self.found.extend(sorted(set(chunk).intersection(long[low:high])))
+
+
+class OrCursor:
+    """The IDs present in any child cursor."""
+    def __init__(self, children: list) -> None:
+        self.children = children
+
+    def advance(self, target: int) -> int:
+        found = [id for id in (child.advance(target) for child in self.children) if id is not None]
+        return min(found) if found else None
+
+
+class NotCursor:
+    """The IDs of the 'include' cursor that are not in the 'exclude' cursor."""
+    def __init__(self, include, exclude) -> None:
+        self.include = include
+        self.exclude = exclude
+
+    def advance(self, target: int) -> int:
+        while True:
+            found = self.include.advance(target)
+            if found is None or self.exclude.advance(found) != found:
+                return found
+            target = found + 1
+
+
+def take(cursor, limit: int = None) -> list[int]:
+    """Returns the IDs of a cursor in ascending order, stopping after 'limit' of them."""
+    ids = []
+    target = 0
+    while limit is None or len(ids) < limit:
+        found = cursor.advance(target)
+        if found is None:
+            break
+        ids.append(found)
+        target = found + 1
+    return ids
+
+
+def highest_bits(mask: int):
+    """Yields the positions of the set bits of a mask, highest first."""
+    while mask:
+        bit = mask.bit_length() - 1
+        yield bit
+        mask ^= 1 << bit
+
+
+class QuerySyntaxError(ValueError):
+    """Raised when a boolean query cannot be parsed."""
+
+
+class InvertedIndex:
+    """Maps each term (an ingredient or tag name) to the sorted array of the recipes that use it.
+
+    Terms are folded with `fold_text`, so lookups ignore case and accents.
+
+    Attributes
+    ----------
+        postings (dict[str, array]): The sorted recipe IDs of each term.
+        recipe_terms (dict[int, set[str]]): The terms of each recipe, used to update or remove a recipe.
+        all_recipes (array): The sorted IDs of every indexed recipe, used to evaluate NOT.
+    """
+    OPERATORS = ('AND', 'OR', 'NOT')
+
+    def __init__(self) -> None:
+        self.postings = {}
+        self.recipe_terms = {}
+        self.all_recipes = array('i')
+
+    def set_terms(self, recipe_id: int, terms) -> None:
+        """Indexes a recipe under the given terms, replacing the terms it was indexed under before.
+
+        Recipes are usually indexed in ascending ID order, so inserting into the sorted arrays is an append.
+        """
+        self.remove(recipe_id)
+        folded = {fold_text(term) for term in terms if term and term.strip()}
+        for term in folded:
+            ids = self.postings.get(term)
+            if ids is None:
+                ids = self.postings[term] = array('i')
+            ids.insert(bisect.bisect_left(ids, recipe_id), recipe_id)
+        self.recipe_terms[recipe_id] = folded
+        self.all_recipes.insert(bisect.bisect_left(self.all_recipes, recipe_id), recipe_id)
+
+    def remove(self, recipe_id: int) -> None:
+        """Removes a recipe from the index. Does nothing if it is not indexed."""
+        terms = self.recipe_terms.pop(recipe_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            ids = self.postings[term]
+            del ids[bisect.bisect_left(ids, recipe_id)]
+            if not ids:
+                del self.postings[term]
+        del self.all_recipes[bisect.bisect_left(self.all_recipes, recipe_id)]
+
+    def lookup(self, term: str) -> array:
+        """Returns the sorted IDs of the recipes indexed under a term."""
+        return self.postings.get(fold_text(term), array('i'))
+
+    def query(self, expression: str, limit: int = None) -> list[int]:
+        """Evaluates a boolean query and returns the matching recipe IDs in ascending order.
+
+        Terms are ingredient or tag names; consecutive words form a single term ('aceite de oliva'). Terms are
+        combined with AND, OR and NOT (in uppercase), grouped with parentheses. NOT binds tighter than AND, and AND
+        tighter than OR. Two terms separated only by NOT, as in 'pollo NOT picante', are joined with AND.
+
+        The query is turned into a tree of cursors over the sorted postings, and IDs are only extracted until
+        'limit' of them are found, so the cost depends on the number of results returned, not on the catalog size.
+
+        Raises
+        ------
+            QuerySyntaxError: If the query is empty, unbalanced or ends with an operator.
+        """
+        tokens = self.tokenize(expression)
+        if not tokens:
+            raise QuerySyntaxError('La busqueda esta vacia')
+        cursor, position = self.parse_or(tokens, 0)
+        if position != len(tokens):
+            raise QuerySyntaxError(f"Simbolo inesperado: '{tokens[position]}'")
+        return take(cursor, limit)
+
+    def tokenize(self, expression: str) -> list[str]:
+        """Splits a query into operators, parentheses and terms, joining consecutive words into one term."""
+        tokens = []
+        words = []
+        for token in re.findall(r'\(|\)|[^\s()]+', expression):
+            if token in self.OPERATORS or token in '()':
+                if words:
+                    tokens.append(' '.join(words))
+                    words = []
+                tokens.append(token)
+            else:
+                words.append(token)
+        if words:
+            tokens.append(' '.join(words))
+        return tokens
+
+    def parse_or(self, tokens: list, position: int) -> tuple:
+        cursor, position = self.parse_and(tokens, position)
+        children = [cursor]
+        while position < len(tokens) and tokens[position] == 'OR':
+            cursor, position = self.parse_and(tokens, position + 1)
+            children.append(cursor)
+        return (children[0] if len(children) == 1 else OrCursor(children)), position
+
+    def parse_and(self, tokens: list, position: int) -> tuple:
+        include = []
+        exclude = []
+        cursor, negated, position = self.parse_not(tokens, position)
+        (exclude if negated else include).append(cursor)
+        while position < len(tokens) and tokens[position] in ('AND', 'NOT'):
+            if tokens[position] == 'AND':
+                position += 1
+            cursor, negated, position = self.parse_not(tokens, position)
+            (exclude if negated else include).append(cursor)
+        if not include:
+            include.append(PostingCursor(self.all_recipes))
+        if len(include) == 2 and all(isinstance(child, PostingCursor) for child in include):
+            # DOS TERMINOS: LOS ARREGLOS SE INTERSECAN DIRECTAMENTE, EL SALTO ENTRE CURSORES QUEDA PARA CADENAS LARGAS
+            cursor = IntersectCursor(include[0].ids, include[1].ids)
+        else:
+            cursor = include[0] if len(include) == 1 else AndCursor(include)
+        if exclude:
+            # 'a NOT b' SE EVALUA COMO UNA DIFERENCIA: SOLO SE RECORREN LOS IDS DE 'a'
+            cursor = NotCursor(cursor, exclude[0] if len(exclude) == 1 else OrCursor(exclude))
+        return cursor, position
+
+    def parse_not(self, tokens: list, position: int) -> tuple:
+        negated = False
+        while position < len(tokens) and tokens[position] == 'NOT':
+            negated = not negated
+            position += 1
+        cursor, position = self.parse_term(tokens, position)
+        return cursor, negated, position
+
+    def parse_term(self, tokens: list, position: int) -> tuple:
+        if position >= len(tokens):
+            raise QuerySyntaxError('La busqueda termina con un operador')
+        token = tokens[position]
+        if token == '(':
+            cursor, position = self.parse_or(tokens, position + 1)
+            if position >= len(tokens) or tokens[position] != ')':
+                raise QuerySyntaxError('Falta cerrar un parentesis')
+            return cursor, position + 1
+        if token in self.OPERATORS or token == ')':
+            raise QuerySyntaxError(f"Simbolo inesperado: '{token}'")
+        return PostingCursor(self.lookup(token)), position + 1
+
+
+class PantryIndex:
+    """Stores the ingredients of each recipe as a bitset to find the recipes that can be cooked with a pantry.
+
+    Each ingredient name, folded with `fold_text`, gets a bit position. A recipe is stored as the mask of the bits of
+    its ingredients, so the ingredients of a recipe found in a pantry P are the bits of 'mask & P', and counting them
+    is a single 'bit_count()'. Recipes are grouped by their number of ingredients: a recipe with n ingredients missing
+    at most k of them needs n - k of them in the pantry, so whole groups are skipped when the pantry is too small.
+
+    Counting the hits of every recipe is still a pass over the whole catalog, so the candidates are pruned first. A
+    recipe missing at most k ingredients has at least one of any k + 1 of its ingredients in the pantry, in particular
+    one of its k + 1 rarest ones. 'rarest[r]' maps each ingredient to the recipes for which it is the r-th rarest, so
+    the candidates of a query are the recipes listed under a pantry ingredient in the first k + 1 of them. Common
+    ingredients ('sal', 'aceite') are rarely the rarest of a recipe, so their lists stay short. Queries with k of
+    'RANKS' or more, which few recipes could fail, fall back to the pass over the groups.
+
+    Attributes
+    ----------
+        bits (dict[str, int]): The bit position of each ingredient name. Common ingredients get the lowest bits.
+        groups (dict[int, tuple[list[int], list[int]]]): The recipe IDs and masks of the recipes with each number of
+            ingredients, as two parallel lists.
+        positions (dict[int, tuple[int, int]]): The group and the position in the group of each recipe.
+        rarest (list[dict[int, set[int]]]): For each rank r < RANKS, the IDs of the recipes whose r-th rarest
+            ingredient (highest bit) is each bit.
+    """
+    RANKS = 3
+
+    def __init__(self) -> None:
+        self.bits = {}
+        self.groups = {}
+        self.positions = {}
+        self.rarest = [{} for _ in range(self.RANKS)]
+
+    def mask(self, names, create: bool = False) -> int:
+        """Returns the mask of a list of ingredient names. Unknown names are skipped, or get a bit if 'create'."""
+        mask = 0
+        for name in names:
+            folded = fold_text(name)
+            if not folded:
+                continue
+            bit = self.bits.get(folded)
+            if bit is None:
+                if not create:
+                    continue
+                bit = self.bits[folded] = len(self.bits)
+            mask |= 1 << bit
+        return mask
+
+    def build(self, recipes: dict) -> None:
+        """Indexes every recipe at once, replacing the current contents.
+
+        The most common ingredients get the lowest bits. Python ints grow with their highest bit, so this keeps the
+        masks of most recipes short even with a large vocabulary.
+
+        Parameters
+        ----------
+            recipes (dict[int, list[str]]): The ingredient names of each recipe.
+        """
+        frequency = {}
+        for names in recipes.values():
+            for folded in {fold_text(name) for name in names}:
+                if folded:
+                    frequency[folded] = frequency.get(folded, 0) + 1
+        self.bits = {name: bit for bit, name in enumerate(sorted(frequency, key=frequency.get, reverse=True))}
+        self.groups = {}
+        self.positions = {}
+        self.rarest = [{} for _ in range(self.RANKS)]
+        for recipe_id, names in recipes.items():
+            self.set_ingredients(recipe_id, names)
+
+    def set_ingredients(self, recipe_id: int, names) -> None:
+        """Indexes the ingredients of a recipe, replacing the ones it was indexed with before."""
+        self.remove(recipe_id)
+        mask = self.mask(names, create=True)
+        size = mask.bit_count()
+        ids, masks = self.groups.setdefault(size, ([], []))
+        self.positions[recipe_id] = (size, len(ids))
+        ids.append(recipe_id)
+        masks.append(mask)
+        for rank, bit in zip(range(self.RANKS), highest_bits(mask)):
+            self.rarest[rank].setdefault(bit, set()).add(recipe_id)
+
+    def remove(self, recipe_id: int) -> None:
+        """Removes a recipe from the index. Does nothing if it is not indexed."""
+        location = self.positions.pop(recipe_id, None)
+        if location is None:
+            return
+        size, position = location
+        ids, masks = self.groups[size]
+        for rank, bit in zip(range(self.RANKS), highest_bits(masks[position])):
+            recipes = self.rarest[rank][bit]
+            recipes.discard(recipe_id)
+            if not recipes:
+                del self.rarest[rank][bit]
+        # EL ULTIMO ELEMENTO DEL GRUPO OCUPA EL LUGAR DEL ELIMINADO
+        last_id = ids.pop()
+        last_mask = masks.pop()
+        if last_id != recipe_id:
+            ids[position] = last_id
+            masks[position] = last_mask
+            self.positions[last_id] = (size, position)
+
+    def query(self, pantry, max_missing: int = 0, limit: int = None) -> list[tuple[int, int, int]]:
+        """Finds the recipes that can be cooked with the given ingredients, missing at most 'max_missing' of them.
+
+        Parameters
+        ----------
+            pantry (list[str]): The names of the ingredients on hand.
+            max_missing (int): The maximum number of ingredients a recipe may be missing.
+            limit (int, optional): Only return the best 'limit' recipes.
+
+        Returns
+        -------
+            list[tuple[int, int, int]]: The recipe ID, the number of missing ingredients and the number of ingredients
+            of each matching recipe, ranked by fewest missing ingredients and then by highest coverage. Recipes
+            without ingredients are skipped.
+        """
+        on_hand = self.mask(pantry)
+        if max_missing < self.RANKS:
+            found = self.query_candidates(on_hand, max_missing)
+        else:
+            found = self.query_groups(on_hand, max_missing)
+        rank = lambda match: (match[1], match[1] / match[2], match[0])
+        if limit is not None:
+            return heapq.nsmallest(limit, found, key=rank)
+        return sorted(found, key=rank)
+
+    def query_candidates(self, on_hand: int, max_missing: int) -> list[tuple[int, int, int]]:
+        """Returns the unranked matches of a pantry mask, counting the hits of the pruned candidates only."""
+        candidates = set()
+        for size in range(1, max_missing + 1):
+            # LAS RECETAS CON HASTA k INGREDIENTES SE PUEDEN COCINAR AUNQUE FALTEN TODOS
+            candidates.update(self.groups.get(size, ((), ()))[0])
+        bits = list(highest_bits(on_hand))
+        for postings in self.rarest[:max_missing + 1]:
+            for bit in bits:
+                recipes = postings.get(bit)
+                if recipes:
+                    candidates.update(recipes)
+        found = []
+        for recipe_id in candidates:
+            size, position = self.positions[recipe_id]
+            missing = size - (self.groups[size][1][position] & on_hand).bit_count()
+            if missing <= max_missing:
+                found.append((recipe_id, missing, size))
+        return found
+
+    def query_groups(self, on_hand: int, max_missing: int) -> list[tuple[int, int, int]]:
+        """Returns the unranked matches of a pantry mask, counting the hits of every recipe of the groups that can
+        reach enough of them."""
+        available = on_hand.bit_count()
+        found = []
+        for size, (ids, masks) in self.groups.items():
+            needed = size - max_missing
+            if size == 0 or needed > available:
+                continue
+            hits = list(map(int.bit_count, map(on_hand.__and__, masks)))
+            for position in compress(range(len(ids)), map(needed.__le__, hits)):
+                found.append((ids[position], size - hits[position], size))
+        return found
+
+
+class PrefixIndex:
+    """A sorted array of names that answers prefix lookups with binary search.
+
+    Names are compared folded with `fold_text`, so 'tom' suggests 'Tomate' and 'limo' suggests 'limón'. Names that
+    fold to the same key are stored once.
+
+    Attributes
+    ----------
+        keys (list[str]): The folded names, sorted.
+        names (list[str]): The names as they were added, parallel to 'keys'.
+    """
+    def __init__(self, names=()) -> None:
+        pairs = sorted({fold_text(name): name for name in names if name and name.strip()}.items())
+        self.keys = [key for key, name in pairs]
+        self.names = [name for key, name in pairs]
+
+    def add(self, name: str) -> None:
+        """Adds a name, keeping the array sorted. Does nothing if an equivalent name is already stored."""
+        key = fold_text(name)
+        position = bisect.bisect_left(self.keys, key)
+        if not key or (position < len(self.keys) and self.keys[position] == key):
+            return
+        self.keys.insert(position, key)
+        self.names.insert(position, name)
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[str]:
+        """Returns up to 'limit' names starting with 'prefix', in alphabetical order."""
+        key = fold_text(prefix)
+        if not key:
+            return []
+        position = bisect.bisect_left(self.keys, key)
+        # LAS CLAVES CON EL PREFIJO SON CONTIGUAS EN EL ARREGLO ORDENADO
+        end = bisect.bisect_left(self.keys, key + '\uffff', position, min(len(self.keys), position + limit))
+        return self.names[position:end]
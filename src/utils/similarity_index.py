@@ -0,0 +1,110 @@
+"""Similar-Recipe Index for Recipe Manager
+
+Two recipes are similar when they share ingredients and tags: their similarity is the Jaccard index of their sets of
+ingredient and tag names. Comparing a recipe with every other one is too slow for a large catalog, so this module uses
+MinHash signatures and locality-sensitive hashing (LSH):
+
+- The MinHash signature of a set is, for each of a fixed family of hash functions, the minimum hash of its elements. The
+  probability that two signatures agree on a position equals the Jaccard index of the two sets.
+- The signature is split into bands. Recipes whose signatures are identical on a whole band share a bucket, so
+  only recipes sharing a bucket are compared. With 16 bands of 4 rows, a pair is found 2 times out of 3 at 0.5
+  similarity and 9 times out of 10 at 0.6, while dissimilar pairs rarely meet. `benchmarks.similarity` measures the
+  recall and latency on a synthetic catalog.
+
+Candidates are re-ranked with their exact Jaccard index.
+"""
+
+from src.utils.search_index import fold_text
+import hashlib
+import random
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+class SimilarityIndex:
+    """MinHash signatures and LSH buckets of the ingredient and tag sets of every recipe.
+
+    Parameters
+    ----------
+        num_hashes (int): The length of the MinHash signatures.
+        bands (int): The number of LSH bands. It must divide 'num_hashes'.
+        seed (int): The seed of the hash functions, so signatures are stable between runs.
+
+    Attributes
+    ----------
+        features (dict[int, frozenset[str]]): The folded ingredient and tag names of each recipe.
+        signatures (dict[int, tuple[int]]): The MinHash signature of each recipe.
+        buckets (dict[tuple, set[int]]): The recipes of each (band, band values) bucket.
+    """
+    def __init__(self, num_hashes: int = 64, bands: int = 16, seed: int = 1) -> None:
+        self.rows = num_hashes // bands
+        self.bands = bands
+        generator = random.Random(seed)
+        self.coefficients = [(generator.randrange(1, MERSENNE_PRIME), generator.randrange(MERSENNE_PRIME))
+                             for _ in range(num_hashes)]
+        self.feature_hashes = {}
+        self.features = {}
+        self.signatures = {}
+        self.buckets = {}
+
+    def hashes(self, feature: str) -> tuple:
+        """Returns the signature hashes of a feature. They are cached, since the vocabulary is small."""
+        hashes = self.feature_hashes.get(feature)
+        if hashes is None:
+            base = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'big')
+            hashes = tuple((a * base + b) % MERSENNE_PRIME for a, b in self.coefficients)
+            self.feature_hashes[feature] = hashes
+        return hashes
+
+    def band_keys(self, signature: tuple) -> list:
+        """Returns the LSH bucket keys of a signature, one per band."""
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def set_recipe(self, recipe_id: int, ingredients, tags) -> None:
+        """Indexes the ingredients and tags of a recipe, replacing the ones it was indexed with before."""
+        self.remove(recipe_id)
+        features = frozenset([f'i:{fold_text(name)}' for name in ingredients if name and name.strip()] +
+                             [f't:{fold_text(name)}' for name in tags if name and name.strip()])
+        if not features:
+            return
+        # EL MINIMO DE CADA FUNCION DE HASH SOBRE TODOS LOS ELEMENTOS
+        signature = tuple(map(min, zip(*map(self.hashes, features))))
+        self.features[recipe_id] = features
+        self.signatures[recipe_id] = signature
+        for key in self.band_keys(signature):
+            self.buckets.setdefault(key, set()).add(recipe_id)
+
+    def remove(self, recipe_id: int) -> None:
+        """Removes a recipe from the index. Does nothing if it is not indexed."""
+        signature = self.signatures.pop(recipe_id, None)
+        if signature is None:
+            return
+        del self.features[recipe_id]
+        for key in self.band_keys(signature):
+            bucket = self.buckets[key]
+            bucket.discard(recipe_id)
+            if not bucket:
+                del self.buckets[key]
+
+    def similar(self, recipe_id: int, k: int = 5) -> list[tuple[int, float]]:
+        """Returns up to 'k' recipes similar to the given one.
+
+        Returns
+        -------
+            list[tuple[int, float]]: The recipe ID and Jaccard similarity of each neighbour, most similar first.
+            An empty list if the recipe is not indexed.
+        """
+        signature = self.signatures.get(recipe_id)
+        if signature is None:
+            return []
+        candidates = set()
+        for key in self.band_keys(signature):
+            candidates |= self.buckets[key]
+        candidates.discard(recipe_id)
+        features = self.features[recipe_id]
+        scored = []
+        for candidate in candidates:
+            other = self.features[candidate]
+            scored.append((candidate, len(features & other) / len(features | other)))
+        scored.sort(key=lambda match: (-match[1], match[0]))
+        return scored[:k]
@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import ttk
-from src.utils.db_utils import DBUtils
+from src.utils.catalog import get_catalog
 from tkinter import messagebox as msg
 
 class AddIngredient(ttk.Frame):
@@ -8,8 +8,10 @@ class AddIngredient(ttk.Frame):
 
     This class creates a window to add a new ingredient to the current recipe.
     It provides a user interface to enter the name, quantity, and measurement of the ingredient.
-    Upon adding the ingredient, it connects to the database via the 'db_utils' object,
-    and associates the ingredient with the current recipe using the 'add_ingredient_to_recipe' method.
+    Upon adding the ingredient, it is added to the draft of the current recipe; nothing is written to the database
+    until the recipe is saved.
+    While the name is typed, the existing ingredient names starting with it are offered in a dropdown, so the
+    same ingredient is not created twice under slightly different names.
     The class also handles window closure and updates the parent recipe instance with the data of the new ingredient.
 
     Attributes
@@ -21,26 +23,32 @@ class AddIngredient(ttk.Frame):
     -------
         __init__(self, parent, recipe_instance): Constructor of the class.
         add_ingredient(self): Adds a new ingredient to the current recipe.
-        close_window(self, ingredient_value, new_ingredient): Closes the window and updates the parent recipe instance.
-        __del__(self): Destructor of the class that disconnects from the 'db_utils' object.
+        close_window(self): Closes the window and tells the parent recipe instance that an ingredient was added.
 
     Attributes
     ----------
         self.parent (Tk): The main window where the add ingredient window will be displayed.
         self.recipe_instance (Recipe): The instance of the current recipe being edited.
-        self.db_utils (DBUtils): An object handling the connection and queries to the database.
+        self.worker (DBWorker): The background worker of the main window, used to load the suggested names.
         self.ingrediente (tk.StringVar): Control variable for the name of the ingredient.
         self.cantidad (tk.IntVar): Control variable for the quantity of the ingredient.
         self.medida (tk.StringVar): Control variable for the measurement of the ingredient.
         self.medidas (list): List of measurement options for the ingredient.
+        self.catalog (RecipeCatalog): The shared catalog that holds the ingredient names used for suggestions.
+        self.name_box (ttk.Combobox): The ingredient name field, with the suggested names as options.
     """
     def __init__(self, parent, recipe_instance) -> None:
         super().__init__(parent, padding=(20))
         self.parent = parent
         self.recipe_instance = recipe_instance
 
-        self.db_utils = DBUtils()
-        self.db_utils.connect()
+        # LOS NOMBRES PARA SUGERIR SE CARGAN CON EL WORKER DE LA VENTANA PRINCIPAL
+        self.worker = recipe_instance.recipe_instance.worker
+        # NOMBRES DE INGREDIENTES EXISTENTES PARA SUGERIR
+        self.catalog = get_catalog()
+        if self.catalog.ingredient_names is None:
+            self.worker.submit(self.catalog.load_ingredient_names, on_done=self.names_loaded,
+                               on_error=lambda error: None)
 
         parent.title('Ingredientes')
         parent.geometry('250x140')
@@ -74,8 +82,9 @@ class AddIngredient(ttk.Frame):
         # NOMBRE DEL INGREDIENTE
         ttk.Label(self.parent, text="Ingredientes:", padding=3).grid(
             row=0, column=1, sticky=tk.EW)
-        ttk.Entry(self.parent, textvariable=self.ingrediente, justify=tk.RIGHT).grid(
-            row=0, column=2, sticky=tk.EW)
+        self.name_box = ttk.Combobox(self.parent, textvariable=self.ingrediente, justify=tk.RIGHT)
+        self.name_box.grid(row=0, column=2, sticky=tk.EW)
+        self.name_box.bind('<KeyRelease>', self.suggest_names)
         # CANTIDAD DEL INGREDIENTE
         ttk.Label(self.parent, text="Cantidad:", padding=3).grid(
             row=1, column=1, sticky=tk.EW)
@@ -92,55 +101,51 @@ class AddIngredient(ttk.Frame):
         ttk.Button(self.parent, text="Cancelar", command=self.parent.destroy).grid(
             row=3, column=2, padx=5, columnspan=2, sticky=tk.EW)
 
+    def names_loaded(self, result=None) -> None:
+        """Shows the suggestions for the text already typed once the background worker has loaded the names."""
+        if self.winfo_exists():
+            self.suggest_names()
+
+    def suggest_names(self, event=None) -> None:
+        """Offers the existing ingredient names that start with the text typed so far.
+
+        This method is bound to the key releases of the name field. The suggestions are shown when the dropdown of
+        the field is opened (with the arrow or the Down key).
+        """
+        if event is not None and event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+            return
+        # SIN SUGERENCIAS MIENTRAS LOS NOMBRES NO ESTEN CARGADOS
+        self.name_box['values'] = self.catalog.suggest_ingredients(self.ingrediente.get())
+
     def add_ingredient(self):
         """Add a new ingredient to the recipe.
 
-        This method takes the input values for a new ingredient (name, quantity, and unit of measurement),
-        creates the ingredient in the database using the 'create_ingredient' method from 'db_utils',
-        and then associates the ingredient with the current recipe using the 'add_ingredient_to_recipe' method.
-        Finally, it closes the current window and updates the parent recipe instance with the new ingredient data.
+        This method takes the input values for a new ingredient (name, quantity, and unit of measurement)
+        and adds them to the draft of the current recipe. The ingredient is created in the database when the recipe
+        is saved. Finally, it closes the current window.
 
         If an error occurs during the process, an error message will be displayed in a pop-up window.
 
         Raises:
-            Exception: If any error occurs during the ingredient creation or association process.
+            Exception: If any value is invalid, for example a quantity that is not a number.
         """
         try:
-            new_ingredient = {
-                "nombre": self.ingrediente.get(),
-                "cantidad": self.cantidad.get(),
-                "medida": self.medida.get()
-            }
-            new_ingredient_id = self.db_utils.create_ingredient(new_ingredient['nombre'])
-            ingredient_value = self.db_utils.add_ingredient_to_recipe(new_ingredient_id, new_ingredient['cantidad'], new_ingredient['medida'])
-            self.close_window(ingredient_value, new_ingredient)
+            if not self.ingrediente.get().strip():
+                raise ValueError('el ingrediente no tiene nombre')
+            self.recipe_instance.draft.add_ingredient(self.ingrediente.get(), self.cantidad.get(), self.medida.get())
+            self.close_window()
         except Exception as e:
             msg.showerror(message=f'Error: {e}', title='Nuevo Ingrediente', parent = self.parent)
 
-    def close_window(self, ingredient_value: int, new_ingredient: dict) -> None:
+    def close_window(self) -> None:
         """Close the ingredient window and update the parent recipe instance.
 
-        This method is called after successfully adding an ingredient to the recipe.
-        It updates the parent recipe instance with the ingredient's database ID (ingredient_value),
-        the formatted ingredient data (data_ing), and sets the 'add_flag' to True to indicate a new ingredient was added.
+        This method is called after successfully adding an ingredient to the draft of the recipe.
+        It sets the 'add_flag' of the parent recipe instance to True to indicate a new ingredient was added.
         Finally, it closes the current window.
 
-        Parameters:
-            ingredient_value (int): The ID of the newly created ingredient in the database.
-            new_ingredient (dict): A dictionary containing the details of the new ingredient.
-
         Note:
             The 'recipe_instance' and 'parent' attributes are assumed to be available in the current instance.
         """
-        self.recipe_instance.ingredient_value = ingredient_value
-        self.recipe_instance.data_ing = (str(new_ingredient['cantidad']) + ' ' + new_ingredient['medida'], new_ingredient['nombre'])
         self.recipe_instance.add_flag = True
         self.parent.destroy()
-
-    def __del__(self) -> None:
-        """Disconnect from the database when the instance is deleted.
-
-        This method is called automatically when the instance is being deleted or garbage-collected.
-        It ensures that the 'db_utils' object disconnects from the database to free up resources.
-        """
-        self.db_utils.disconnect()
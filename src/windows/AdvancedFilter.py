@@ -0,0 +1,129 @@
+import tkinter as tk
+from tkinter import ttk
+from tkinter import messagebox as msg
+from datetime import date
+from src.utils.recipe_query import RecipeQuery
+
+class AdvancedFilter(ttk.Frame):
+    """Class representing the window to filter recipes by several criteria at once.
+
+    This class creates a window where the user can combine ranges of preparation, cooking and total time, the
+    favourite status, a range of creation dates, tags and ingredients. Empty fields are not filtered.
+    Upon filtering, it builds a 'RecipeQuery' and hands it back to the main window, which runs it as a single query.
+
+    Attributes
+    ----------
+        parent (Tk): The window where the filter panel will be displayed.
+        recipe_instance (App): The main window, which receives the filter.
+        fields (dict[str, tk.StringVar]): Control variables for each field of the panel.
+    """
+    def __init__(self, parent, recipe_instance) -> None:
+        super().__init__(parent, padding=(20))
+        self.parent = parent
+        self.recipe_instance = recipe_instance
+
+        # TITULO
+        parent.title('Filtros')
+        # TAMAÑO DE LA VENTA
+        parent.geometry('460x380')
+        # DESACTIVA EL CAMBIO DE TAMAÑO
+        parent.resizable(0, 0)
+        parent.config(bg='#d9d9d9')
+
+        self.fields = {name: tk.StringVar() for name in (
+            'prep_min', 'prep_max', 'cook_min', 'cook_max', 'total_min', 'total_max',
+            'since', 'until', 'favorite', 'tags', 'ingredients')}
+
+        # GRID
+        for i in range(8):
+            parent.rowconfigure(i, weight=1)
+        parent.columnconfigure(0, weight=2)
+        parent.columnconfigure(1, weight=1)
+        parent.columnconfigure(2, weight=1)
+
+        ttk.Label(self.parent, text="Desde", padding=3).grid(row=0, column=1)
+        ttk.Label(self.parent, text="Hasta", padding=3).grid(row=0, column=2)
+
+        # RANGOS: TIEMPOS (MIN) Y FECHA DE CREACION (AAAA-MM-DD)
+        ranges = (
+            ("Preparacion (min):", 'prep_min', 'prep_max'),
+            ("Coccion (min):", 'cook_min', 'cook_max'),
+            ("Tiempo total (min):", 'total_min', 'total_max'),
+            ("Creada (AAAA-MM-DD):", 'since', 'until'),
+        )
+        for row, (label, minimum, maximum) in enumerate(ranges, 1):
+            ttk.Label(self.parent, text=label, padding=3).grid(row=row, column=0, sticky=tk.EW)
+            ttk.Entry(self.parent, textvariable=self.fields[minimum], justify=tk.RIGHT, width=10).grid(
+                row=row, column=1, padx=5, sticky=tk.EW)
+            ttk.Entry(self.parent, textvariable=self.fields[maximum], justify=tk.RIGHT, width=10).grid(
+                row=row, column=2, padx=5, sticky=tk.EW)
+
+        # FAVORITA, ETIQUETAS E INGREDIENTES
+        ttk.Label(self.parent, text="Favorita:", padding=3).grid(row=5, column=0, sticky=tk.EW)
+        ttk.Combobox(self.parent, textvariable=self.fields['favorite'], values=['', 'Si', 'No']).grid(
+            row=5, column=1, columnspan=2, padx=5, sticky=tk.EW)
+        ttk.Label(self.parent, text="Etiquetas (separadas por coma):", padding=3).grid(row=6, column=0, sticky=tk.EW)
+        ttk.Entry(self.parent, textvariable=self.fields['tags'], justify=tk.RIGHT).grid(
+            row=6, column=1, columnspan=2, padx=5, sticky=tk.EW)
+        ttk.Label(self.parent, text="Ingredientes (separados por coma):", padding=3).grid(row=7, column=0, sticky=tk.EW)
+        ttk.Entry(self.parent, textvariable=self.fields['ingredients'], justify=tk.RIGHT).grid(
+            row=7, column=1, columnspan=2, padx=5, sticky=tk.EW)
+
+        # BOTONES: FILTRAR || CANCELAR
+        ttk.Button(self.parent, text="Filtrar", command=self.apply_filter).grid(
+            row=8, column=0, padx=5, pady=10, sticky=tk.EW)
+        ttk.Button(self.parent, text="Cancelar", command=self.parent.destroy).grid(
+            row=8, column=1, columnspan=2, padx=5, pady=10, sticky=tk.EW)
+
+    def number(self, name: str) -> int:
+        """Returns the value of a numeric field, or None if it is empty.
+
+        Raises
+        ------
+            ValueError: If the field is not a whole number.
+        """
+        value = self.fields[name].get().strip()
+        return int(value) if value else None
+
+    def day(self, name: str) -> date:
+        """Returns the value of a date field, or None if it is empty.
+
+        Raises
+        ------
+            ValueError: If the field is not a date in AAAA-MM-DD format.
+        """
+        value = self.fields[name].get().strip()
+        return date.fromisoformat(value) if value else None
+
+    def apply_filter(self) -> None:
+        """Builds the filter from the fields of the panel and hands it to the main window.
+
+        This method is triggered when the 'Filtrar' button is clicked. If a field holds an invalid number or date,
+        an error message is shown and the window stays open.
+        """
+        try:
+            query = (RecipeQuery()
+                     .prep_time(self.number('prep_min'), self.number('prep_max'))
+                     .cook_time(self.number('cook_min'), self.number('cook_max'))
+                     .total_time(self.number('total_min'), self.number('total_max'))
+                     .created(self.day('since'), self.day('until'))
+                     .with_tags(self.fields['tags'].get().split(','))
+                     .with_ingredients(self.fields['ingredients'].get().split(',')))
+        except ValueError:
+            msg.showerror(message='Error: los tiempos deben ser numeros enteros y las fechas AAAA-MM-DD',
+                          title='Filtros', parent=self.parent)
+            return
+        if self.fields['favorite'].get() in ('Si', 'No'):
+            query.favorite(self.fields['favorite'].get() == 'Si')
+        self.close_window(query)
+
+    def close_window(self, query: RecipeQuery) -> None:
+        """Closes the window and hands the filter to the main window.
+
+        Parameters
+        ----------
+            query (RecipeQuery): The filter built from the fields of the panel.
+        """
+        self.recipe_instance.filter_query = query
+        self.recipe_instance.filter_flag = True
+        self.parent.destroy()
@@ -1,6 +1,9 @@
 from src.windows.AddIngredient import *
 from src.windows.AddMethod import *
 from src.windows.IBaseWindow import *
+from src.utils.recipe_draft import RecipeDraft
+from src.utils.db_utils import DBUtils
+from src.utils.catalog import get_catalog
 from constant import IMAGES_DIR 
 from tkinter import filedialog as fd
 from tkinter import messagebox as msg
@@ -19,44 +22,28 @@ class EditRecipe(ttk.Frame, IBaseWindow):
     ----------
         parent (tk.Tk or tk.Toplevel): The parent window to which this window is associated.
         title (str): The title of the window.
-        recipe_id (int): The ID of the recipe to be edited.
-        recipe_instance: An instance of the recipe to be edited.
+        recipe (dict): The recipe to be edited, as returned by `DBUtils.get_recipe_by_id`. The main window reads it on
+            the background worker before opening this window.
+        recipe_instance: The main window. Its background worker saves the recipe.
     """
-    def __init__(self, parent, title: str, recipe_id: int, recipe_instance) -> None:
+    def __init__(self, parent, title: str, recipe: dict, recipe_instance) -> None:
         ttk.Frame.__init__(self, parent, padding=(20))
         IBaseWindow.__init__(self, parent, title)
 
-        self.db_utils = DBUtils()
-        self.db_utils.connect()
-
-        self.id = recipe_id
+        self.id = recipe['id']
+        self.recipe = recipe
         self.recipe_instance = recipe_instance
-        self.recipe = self.db_utils.get_recipe_by_id(recipe_id)
-        self.recipe_original = self.recipe.copy()
+        # LOS CAMBIOS SE GUARDAN EN MEMORIA HASTA GUARDAR LA RECETA
+        self.draft = RecipeDraft(self.recipe)
         self.add_flag = False
+        # EVITA GUARDAR DOS VECES MIENTRAS EL WORKER ESCRIBE
+        self.saving = False
 
         self.name = tk.StringVar()
         self.preparation_time = tk.StringVar()
         self.cooking_time = tk.StringVar()
         self.tags = tk.StringVar()
         self.favorite = tk.StringVar()
-        
-        # GUARDA LOS IDS DE INGREDIENTES_RECETA
-        self.ingredient_value = None
-        self.ingredients_temp = []
-
-        #RECIBE LOS DATOS DEL TOP LEVEL
-        self.data_ing = None
-        # GUARDA NOMBRE Y MEDIDAS
-        self.tree_ing_data = []
-        
-        # RECIBE LOS DATOS DE TOP LEVEL
-        # IDS
-        self.prep_id = None
-        self.prep_id_list = []
-        # DESCRICIONES
-        self.prep_desc = None
-        self.prep_desc_list = []
 
         parent.rowconfigure(8, weight=1)  # buttons
 
@@ -90,39 +77,31 @@ class EditRecipe(ttk.Frame, IBaseWindow):
         self.name.set(self.recipe['nombre'])
         self.preparation_time.set(self.recipe['tiempo de preparacion'])
         self.cooking_time.set(self.recipe['tiempo de coccion'])
-        self.tags.set(self.recipe['etiquetas'])
+        self.tags.set(self.draft.tags_text())
         self.favorite.set('Si' if self.recipe['favorito'] == 1 else 'No')
 
     def load_ingredients(self) -> None:
         """Loads the ingredients into the Treeview.
 
-        This method retrieves the ingredient and quantity data from the recipe and inserts
+        This method retrieves the ingredient and quantity data from the draft and inserts
         them into the ingredient_list Treeview. Each ingredient is displayed as a row with its corresponding
         quantity in the Treeview.
         """
-        ingredients = self.recipe['ingredientes'].split(',')
-        amounts = self.recipe['cantidades'].split(',')
-        for i  in range(len(ingredients)):
-            if len(ingredients) != 0:
-                self.ingredient_list.insert(
-                '', tk.END, values=[amounts[i], ingredients[i]])
+        for amount, name in self.draft.ingredient_rows():
+            self.ingredient_list.insert(
+                '', tk.END, values=[amount, name])
 
     def new_ingredient(self) -> None:
         """Opens a new window to add a new ingredient.
 
         This method opens a new window (top-level) to allow the user to add a new ingredient
         to the recipe. The AddIngredient class is used to manage the new ingredient input.
-        After the ingredient is added, the method updates the recipe data and refreshes the
-        ingredient_list Treeview.
+        After the ingredient is added to the draft, the method refreshes the ingredient_list Treeview.
         """
         toplevel = tk.Toplevel(self.parent)
         add_ingredient_window = AddIngredient(toplevel, self).grid()
         toplevel.wait_window(add_ingredient_window)
         if self.add_flag:
-            self.recipe['cantidades'] = f"{self.recipe['cantidades']},{self.data_ing[0]}"
-            self.recipe['ingredientes'] = f"{self.recipe['ingredientes']},{self.data_ing[1]}"
-            self.ingredients_temp.append(self.ingredient_value)
-            self.tree_ing_data.append(self.data_ing[1])
             self.refresh_ingredient_tree()
             self.add_flag = False
 
@@ -130,8 +109,8 @@ class EditRecipe(ttk.Frame, IBaseWindow):
         """Refreshes the list of ingredients in the Treeview.
 
         This method updates the `ingredient_list` Treeview with the current ingredient data
-        in the `recipe` dictionary. It creates a new Treeview widget and loads the updated
-        ingredients from the recipe. If no changes were made, it displays an error message.
+        in the draft. It creates a new Treeview widget and loads the updated
+        ingredients from the draft. If no changes were made, it displays an error message.
         """
         try:
             self.ingredient_list = self.create_treeview(2, 1, 1, ('Cantidad', 'Ingredientes'))
@@ -142,19 +121,12 @@ class EditRecipe(ttk.Frame, IBaseWindow):
     def delete_ingredient(self) -> None:
         """Deletes the last ingredient from the list of ingredients.
 
-        This method removes the last ingredient from the `ingredient_list` Treeview and
-        the corresponding data from the `recipe` dictionary. It also updates the
-        `ingredients_temp` and `tree_ing_data` lists. If there are no ingredients left to delete,
+        This method removes the last ingredient from the draft and the `ingredient_list` Treeview.
+        The database is only changed when the recipe is saved. If there are no ingredients left to delete,
         it displays an error message.
         """
         try:
-            if self.ingredients_temp != []:
-                self.db_utils.delete_ingredient_to_recipe(self.ingredients_temp.pop())
-                self.tree_ing_data.pop()
-            ingredients = self.recipe['ingredientes'].split(',')[:-1]
-            amounts = self.recipe['cantidades'].split(',')[:-1]
-            self.recipe['ingredientes'] = ','.join(ingredients)
-            self.recipe['cantidades'] = ','.join(amounts)
+            self.draft.remove_last_ingredient()
             self.refresh_ingredient_tree()
         except IndexError:
             msg.showerror(message='No hay ningun ingrediente en la lista',
@@ -166,30 +138,24 @@ class EditRecipe(ttk.Frame, IBaseWindow):
     def load_prep_methods(self) -> None:
         """Loads the preparation steps into the Treeview.
 
-        This method retrieves the preparation steps from the `recipe` dictionary, splits
-        them into separate steps, and inserts them into the `method_list` Treeview.
+        This method retrieves the preparation steps from the draft and
+        inserts them into the `method_list` Treeview.
         The steps are enumerated starting from 1.
         """
-        prep_methods = self.recipe['preparacion'].split(',')
-        for i, prep_method in enumerate(prep_methods, start=1):
-            if len(prep_method) != 0:
-                self.method_list.insert('', tk.END, values=[i, prep_method])
+        for i, prep_method in enumerate(self.draft.steps, start=1):
+            self.method_list.insert('', tk.END, values=[i, prep_method.descripcion])
 
     def new_method(self) -> None:
         """Opens a window to add a new preparation step.
 
         This method opens a new window where the user can input a new preparation step.
-        The step is added to the `method_list` Treeview and the `recipe` dictionary.
-        It also updates the `prep_id_list` and `prep_desc_list` with the new step's data.
+        The step is added to the draft and the `method_list` Treeview.
         If the user cancels without adding a step, no changes are made.
         """
         toplevel = tk.Toplevel(self.parent)
         add_prep_method_window = AddMethod(toplevel, self).grid()
         toplevel.wait_window(add_prep_method_window)
         if self.add_flag:
-            self.recipe['preparacion'] = f"{self.recipe['preparacion']},{self.prep_desc}"
-            self.prep_id_list.append(self.prep_id)
-            self.prep_desc_list.append(self.prep_desc)
             self.refresh_method_tree()
             self.add_flag = False
 
@@ -197,7 +163,7 @@ class EditRecipe(ttk.Frame, IBaseWindow):
         """Updates the preparation steps list.
 
         This method refreshes the `method_list` Treeview by recreating it and
-        loading the preparation steps from the `recipe` dictionary.
+        loading the preparation steps from the draft.
         """
         try:
             self.method_list = self.create_treeview(4, 1, 0, ('Id', 'Pasos'))
@@ -209,16 +175,11 @@ class EditRecipe(ttk.Frame, IBaseWindow):
     def delete_method(self) -> None:
         """Deletes the last preparation step from the list.
 
-        This method removes the last preparation step from the `method_list` Treeview
-        and the `recipe` dictionary. It also updates the `prep_id_list` and `prep_desc_list`.
+        This method removes the last preparation step from the draft and the `method_list` Treeview.
         If there are no steps to delete, it shows an error message.
         """
         try:
-            if self.prep_id_list != []:
-                self.db_utils.delete_prep_method(self.prep_id_list.pop())
-                self.prep_desc_list.pop()
-            prep = self.recipe['preparacion'].split(',')[:-1]
-            self.recipe['preparacion'] = ','.join(prep)
+            self.draft.remove_last_step()
             self.refresh_method_tree()
         except IndexError:
             msg.showerror(message='No hay ningun paso en la lista',
@@ -228,15 +189,13 @@ class EditRecipe(ttk.Frame, IBaseWindow):
         """Saves the image file path to be stored.
 
         This method opens a file dialog where the user can choose an image file to be
-        associated with the recipe. The chosen image is copied to the IMAGES_DIR folder
-        and the file path is saved in the `recipe` dictionary. If no image is selected,
+        associated with the recipe. The chosen image is kept in the draft, and copied to the
+        IMAGES_DIR folder when the recipe is saved. If no image is selected,
         a message is shown indicating that the image was not saved.
         """
-        self.image = fd.askopenfilename(filetypes=(('jpg files', '*.jpg'), ('All files', '*.*')))
-        if self.image != None:
-            shutil.copy(self.image, IMAGES_DIR)
-            img_name = self.image.split('/')[-1]
-            self.recipe['imagen'] = "images\\" + img_name  # CORREGIR FORMATO
+        image = fd.askopenfilename(filetypes=(('jpg files', '*.jpg'), ('All files', '*.*')))
+        if image:
+            self.draft.set_image(image)
             msg.showinfo(message='Imagen agregada con exito', title='Agregar imagen',parent=self.parent)
         else:
             msg.showinfo(message='Imagen no guardada', title='Agregar imagen', parent=self.parent)
@@ -245,57 +204,83 @@ class EditRecipe(ttk.Frame, IBaseWindow):
         """Deletes the associated image of the recipe.
 
         This method checks if the recipe has an associated image. If there is no image,
-        it shows an information message. If an image is found, it deletes the file
-        and updates the `recipe` dictionary to remove the image reference. A success
+        it shows an information message. If an image is found, the draft drops the image
+        reference, and the file is deleted when the recipe is saved. A success
         message is displayed after deleting the image.
         """
-        if self.recipe['imagen'] == None:
+        if self.draft.image == None:
             msg.showinfo(title='Borrar imagen', message='Esta receta no tiene imagen', parent=self.parent)
         else:
-            os.remove(self.recipe['imagen'])
-            self.recipe['imagen'] = None
+            self.draft.clear_image()
             msg.showinfo(title='Borrar imagen', message='Imagen borrada', parent = self.parent)
 
     def save(self) -> None:
         """Saves the edited recipe to the database.
 
-        This method retrieves the edited data from the entry fields, updates the recipe's
-        name, preparation time, cooking time, and favorite status in the `recipe` dictionary.
-        Then, it creates a dictionary with the edited recipe data, including ingredient IDs
-        and preparation method IDs. The `db_utils.update_recipe()` method is called to update
-        the recipe in the database, and `db_utils.check_and_update()` is used to update
-        the ingredients and preparation methods. Finally, the `close_window()` method is called
-        to close the current window and pass the edited recipe data back to the parent window.
+        This method retrieves the edited data from the entry fields and the draft. Nothing was
+        written while editing: `db_utils.check_and_update()` updates the recipe and applies
+        the differences between the draft and the recipe as it was read, in a single
+        transaction, on the background worker of the main window. A new image is copied
+        now, and a replaced one deleted once the recipe is saved. Then `saved` closes the
+        window and passes the edited recipe data back to the parent window.
         """
+        if self.saving:
+            return
         try:
+            self.draft.set_tags(self.tags.get())
+            if self.draft.image_source:
+                shutil.copy(self.draft.image_source, IMAGES_DIR)
             updated_values = {
                 'id': self.id,
                 'nombre': self.name.get(),
                 'tiempo de preparacion': self.preparation_time.get(),
                 'tiempo de coccion': self.cooking_time.get(),
-                'imagen': self.recipe['imagen'],
+                'imagen': self.draft.image,
                 'favorito': 1 if self.favorite.get() == 'Si' else 0
             }
-            self.db_utils.update_recipe(updated_values)
-            edited_recipe = {
-                'ingredientes': self.recipe['ingredientes'],
-                'cantidades': self.recipe['cantidades'],
-                'preparacion': self.recipe['preparacion'],
-                'etiquetas': self.tags.get(),
-                'ingredients_id': self.ingredients_temp,
-                'methods_id': self.prep_id_list
-            }
-
-            self.db_utils.check_and_update(edited_recipe, self.recipe_original)
-            self.close_window([
-                updated_values['nombre'],
-                edited_recipe['ingredientes'],
-                updated_values['tiempo de preparacion'],
-                updated_values['tiempo de coccion'],
-            ])
+            edited_recipe = self.draft.changes()
+            self.saving = True
+            self.recipe_instance.worker.submit(DBUtils.check_and_update, edited_recipe, self.recipe, updated_values,
+                                               on_done=lambda result: self.saved(edited_recipe, updated_values),
+                                               on_error=self.save_failed)
         except Exception as e:
             msg.showerror(message=f'Error: {e}', title='Editar Receta', parent = self.parent)
-        
+
+    def saved(self, edited_recipe: dict, updated_values: dict) -> None:
+        """Finishes the save once the background worker has written the recipe.
+
+        The replaced image is deleted and the new ingredients are offered as suggestions. If the window was closed
+        while the recipe was being saved, the indexes of the main window are still updated.
+
+        Parameters
+        ----------
+            edited_recipe (dict): The changes of the draft, as returned by `RecipeDraft.changes`.
+            updated_values (dict): The values of the recipe row that were saved.
+        """
+        self.saving = False
+        if self.recipe['imagen'] not in (None, self.draft.image) and os.path.exists(self.recipe['imagen']):
+            os.remove(self.recipe['imagen'])
+        # LOS INGREDIENTES NUEVOS RECIEN EXISTEN AL GUARDAR LA RECETA
+        catalog = get_catalog()
+        for ingredient in edited_recipe['ingredientes']:
+            if ingredient.id is None:
+                catalog.add_ingredient_name(ingredient.nombre)
+        if not self.parent.winfo_exists():
+            self.recipe_instance.sync_recipe_indexes(self.id)
+            return
+        self.close_window([
+            updated_values['nombre'],
+            ','.join(ingredient.nombre for ingredient in edited_recipe['ingredientes']),
+            updated_values['tiempo de preparacion'],
+            updated_values['tiempo de coccion'],
+        ])
+
+    def save_failed(self, error: Exception) -> None:
+        """Shows the error raised while the background worker saved the recipe. The draft is kept, to save again."""
+        self.saving = False
+        parent = self.parent if self.parent.winfo_exists() else self.recipe_instance.parent
+        msg.showerror(message=f'Error: {error}', title='Editar Receta', parent=parent)
+
     def close_window(self, edit_data: list) -> None:
         """Closes the current window and passes the edited data to the parent window.
 
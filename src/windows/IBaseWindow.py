@@ -17,7 +17,8 @@ class IBaseWindow(ABC):
     Attributes
     ----------
         parent (tk.Tk or tk.Toplevel): The parent window to which this window is associated.
-        db_utils (DBUtils): An instance of the DBUtils class for database-related operations.
+        db_utils (DBUtils): An instance of the DBUtils class for database-related operations. It only holds a pooled
+            connection inside a `DBUtils.borrow` block.
 
     Note
     ----
@@ -31,8 +32,9 @@ class IBaseWindow(ABC):
         self.parent.config(bg='#d9d9d9')
         self.parent.resizable(0, 0)
         
+        # LA CONEXION SE PIDE AL POOL EN CADA OPERACION CON db_utils.borrow()
         self.db_utils = DBUtils()
-        self.db_utils.connect()
+        self.parent.bind('<Destroy>', self.release_connection, add='+')
 
         # COLUMNS
         for i in range(7):
@@ -44,6 +46,19 @@ class IBaseWindow(ABC):
             else:
                 self.parent.rowconfigure(i, weight=2)
 
+    def release_connection(self, event=None) -> None:
+        """Returns the window's database connection to the shared pool, if it still holds one.
+
+        Connections are only held during an operation (see `DBUtils.borrow`). This method is bound to the window's
+        `<Destroy>` event as a safety net, so a connection is never kept until the garbage collector runs `__del__`.
+
+        Parameters
+        ----------
+            event (tk.Event, optional): The event that triggered the release. Events coming from child widgets are ignored.
+        """
+        if event is None or event.widget is self.parent:
+            self.db_utils.disconnect()
+
     @abstractmethod
     def create_ui(self):
         """Abstract method to create the user interface for the specific window.
@@ -2,6 +2,8 @@ from src.windows.AddIngredient import *
 from src.windows.AddMethod import *
 from constant import IMAGES_DIR 
 from src.windows.IBaseWindow import *
+from src.utils.recipe_draft import RecipeDraft
+from src.utils.catalog import get_catalog
 from tkinter import filedialog as fd
 from tkinter import messagebox as msg
 import shutil
@@ -19,26 +21,11 @@ class NewRecipe(ttk.Frame, IBaseWindow):
         self.cooking_time = tk.IntVar()
         self.tags = tk.StringVar()
         self.favorite = tk.StringVar()
-        self.image = None
 
-        # GUARDA LOS IDS DE INGREDIENTES_RECETA
-        self.ingredient_value = None
-        self.ingredients_temp = []
-        
-        self.add_flag = False
+        # INGREDIENTES, PASOS, ETIQUETAS E IMAGEN SE GUARDAN EN MEMORIA HASTA CREAR LA RECETA
+        self.draft = RecipeDraft()
 
-        #RECIBE LOS DATOS DEL TOP LEVEL
-        self.data_ing = None
-        # GUARDA NOMBRE Y MEDIDAS
-        self.tree_ing_data = []
-        
-        # RECIBE LOS DATOS DE TOP LEVEL
-        # IDS
-        self.prep_id = None
-        self.prep_id_list = []
-        # DESCRICIONES
-        self.prep_desc = None
-        self.prep_desc_list = []
+        self.add_flag = False
 
         # AGREGAR LOS BOTONES
         parent.rowconfigure(8, weight=1)  # buttons
@@ -66,13 +53,12 @@ class NewRecipe(ttk.Frame, IBaseWindow):
     def load_ingredients(self) -> None:
         """Reads the ingredients from the list of ingredients and displays them in the Treeview.
 
-        This method is responsible for reading the list of ingredients (`tree_ing_data`)
+        This method is responsible for reading the ingredients of the draft (`draft.ingredients`)
         and displaying them in the `ingredient_list` Treeview. It iterates over each
         ingredient and inserts it into the Treeview for the user to view.
         """
-        for ingredient in self.tree_ing_data:
-            data = [ingredient[0], ingredient[1]]
-            self.ingredient_list.insert('', tk.END, values=data)
+        for amount, name in self.draft.ingredient_rows():
+            self.ingredient_list.insert('', tk.END, values=[amount, name])
 
     def new_ingredient(self) -> None: 
         """Opens a window to add a new ingredient.
@@ -80,16 +66,13 @@ class NewRecipe(ttk.Frame, IBaseWindow):
         This method opens a new window (a `Toplevel` widget) to allow the user to add
         a new ingredient to the recipe. It creates an instance of the `AddIngredient` class
         and waits for the window to be closed. After the window is closed, it checks the
-        `add_flag` attribute to see if a new ingredient was successfully added. If a new
-        ingredient was added, it updates the `ingredients_temp` list and the `tree_ing_data`
-        list with the new ingredient data and then refreshes the `ingredient_list` Treeview.
+        `add_flag` attribute to see if a new ingredient was successfully added to the draft.
+        If a new ingredient was added, it refreshes the `ingredient_list` Treeview.
         """
         toplevel = tk.Toplevel(self.parent)
         add_ingredient_window = AddIngredient(toplevel, self).grid()
         toplevel.wait_window(add_ingredient_window)
         if self.add_flag:
-            self.ingredients_temp.append(self.ingredient_value)
-            self.tree_ing_data.append(self.data_ing)
             self.refresh_ingredient_tree()
             self.add_flag = False
 
@@ -97,9 +80,9 @@ class NewRecipe(ttk.Frame, IBaseWindow):
         """Refreshes the ingredient list in the Treeview.
 
         This method recreates the `ingredient_list` Treeview with updated data from the
-        `tree_ing_data` list. It first calls the `create_treeview` method to create a new
+        draft. It first calls the `create_treeview` method to create a new
         Treeview with the appropriate columns. Then, it calls the `load_ingredients` method
-        to load the ingredient data from `tree_ing_data` into the newly created Treeview.
+        to load the ingredient data from the draft into the newly created Treeview.
         """
         self.ingredient_list = self.create_treeview(2, 1, 1, ('Cantidad', 'Ingredientes'))
         self.load_ingredients()
@@ -107,18 +90,14 @@ class NewRecipe(ttk.Frame, IBaseWindow):
     def delete_ingredient(self) -> None:
         """Deletes the last ingredient from the list.
 
-        This method removes the last ingredient from the `ingredients_temp` list, which
-        holds the IDs of ingredients associated with the recipe. It also removes the last
-        ingredient from the `tree_ing_data` list, which holds the ingredient data to be
-        displayed in the `ingredient_list` Treeview. After deleting the ingredient, it
+        This method removes the last ingredient from the draft. Nothing was written to the
+        database yet, so nothing has to be deleted there. After deleting the ingredient, it
         refreshes the `ingredient_list` Treeview to reflect the updated data.
 
-        If there are no ingredients to delete (i.e., the `ingredients_temp` list is empty),
-        it shows an error message to inform the user.
+        If there are no ingredients to delete, it shows an error message to inform the user.
         """
         try:
-            self.db_utils.delete_ingredient_to_recipe(self.ingredients_temp.pop())
-            self.tree_ing_data.pop()
+            self.draft.remove_last_ingredient()
             self.refresh_ingredient_tree()
         except IndexError:
             msg.showerror(message='No hay ningun ingrediente en la lista',
@@ -130,14 +109,13 @@ class NewRecipe(ttk.Frame, IBaseWindow):
     def load_prep_methods(self) -> None:
         """Loads the preparation steps into the method list Treeview.
 
-        This method reads the preparation steps from the `prep_desc_list` and displays them
-        in the `method_list` Treeview. The `prep_desc_list` contains the descriptions of the
-        preparation steps. It iterates through the `prep_desc_list`, and for each step,
-        creates a new row in the Treeview with the order number and the preparation detail.
+        This method reads the preparation steps of the draft and displays them in the
+        `method_list` Treeview. For each step, it creates a new row in the Treeview with
+        the order number and the preparation detail.
         The order number starts from 1 and increments for each preparation step.
         """
-        for order, detail in enumerate(self.prep_desc_list, start=1):
-            data = [order, detail]
+        for order, step in enumerate(self.draft.steps, start=1):
+            data = [order, step.descripcion]
             self.method_list.insert('', tk.END, values=data)
 
     def new_method(self) -> None:
@@ -145,17 +123,14 @@ class NewRecipe(ttk.Frame, IBaseWindow):
 
         This method opens a new top-level window using the `AddMethod` class to allow the
         user to add a new preparation step. It waits for the user to close the window by
-        using `wait_window`. If the user adds a new preparation step (`add_flag` is True),
-        the method appends the new step's ID and description to `prep_id_list` and
-        `prep_desc_list`, respectively. Then, it refreshes the `method_list` Treeview using
-        the `refresh_method_tree` method to display the updated list of preparation steps.
+        using `wait_window`. If the user adds a new preparation step to the draft (`add_flag`
+        is True), it refreshes the `method_list` Treeview using the `refresh_method_tree`
+        method to display the updated list of preparation steps.
         """
         toplevel = tk.Toplevel(self.parent)
         add_prep_method_window = AddMethod(toplevel, self).grid()
         toplevel.wait_window(add_prep_method_window)
         if self.add_flag:
-            self.prep_id_list.append(self.prep_id)
-            self.prep_desc_list.append(self.prep_desc)
             self.refresh_method_tree()
             self.add_flag = False
 
@@ -166,7 +141,7 @@ class NewRecipe(ttk.Frame, IBaseWindow):
         by first clearing the current Treeview and then re-populating it. It calls the
         `create_treeview` method with appropriate parameters to create a new Treeview with
         two columns: 'Id' and 'Pasos'. Then, it calls the `load_prep_methods` method to
-        load the preparation steps from `prep_desc_list` into the Treeview. This method is
+        load the preparation steps from the draft into the Treeview. This method is
         typically called after adding or deleting a preparation step to ensure the latest
         data is displayed.
         """
@@ -176,16 +151,13 @@ class NewRecipe(ttk.Frame, IBaseWindow):
     def delete_method(self) -> None:
         """Deletes the last preparation step from the list.
 
-        This method removes the last preparation step from the `prep_id_list` and
-        `prep_desc_list`. It then calls the `db_utils.delete_prep_method` method to delete
-        the corresponding preparation step from the database. After that, it calls
+        This method removes the last preparation step from the draft. After that, it calls
         `refresh_method_tree` to update the `method_list` Treeview with the updated list of
         preparation steps. If there are no preparation steps left to delete, it displays an
         error message using the `msg.showerror` method.
         """
         try:
-            self.db_utils.delete_prep_method(self.prep_id_list.pop())
-            self.prep_desc_list.pop()
+            self.draft.remove_last_step()
             self.refresh_method_tree()
         except IndexError:
             msg.showerror(message='No hay ningun paso en la lista', title='Eliminar paso de preparacion', parent = self.parent)
@@ -196,13 +168,14 @@ class NewRecipe(ttk.Frame, IBaseWindow):
         """Opens a file dialog to select an image file and saves its path.
 
         This method opens a file dialog to allow the user to select an image file (JPG format).
-        The selected image path is stored in the `image` attribute of the class. If the user
-        cancels the file dialog, the `image` attribute remains `None`. After selecting an
+        The selected image path is stored in the draft, and the file is copied when the recipe
+        is created. If the user cancels the file dialog, the draft is not changed. After selecting an
         image, the method displays a message using `msg.showinfo` indicating whether the image
         was added successfully or not.
         """
-        self.image = fd.askopenfilename(filetypes=(('jpg files', '*.jpg'), ('All files', '*.*')))
-        if self.image != None:
+        image = fd.askopenfilename(filetypes=(('jpg files', '*.jpg'), ('All files', '*.*')))
+        if image:
+            self.draft.set_image(image)
             msg.showinfo(message='Imagen agregada con exito', title='Agregar imagen', parent=self.parent )
         else:
             msg.showinfo(message='Imagen no guardada',  title='Agregar imagen', parent=self.parent)
@@ -247,119 +220,35 @@ class NewRecipe(ttk.Frame, IBaseWindow):
         """
         return 1 if favorite == 'Si' else 0
 
-    def get_tag_list(self, tags: str) -> list[str]:
-        """Extracts and returns a list of tags from a comma-separated string.
-
-        This method takes a comma-separated `tags` string as input and extracts individual
-        tags by splitting the string at each comma. It removes any leading and trailing spaces
-        from each tag and returns a list containing all the extracted tags.
-
-        Parameters
-        ----------
-            tags (str): A comma-separated string containing tags.
-
-        Returns
-        -------
-            list[str]: A list of individual tags extracted from the input string.
-        """
-        tag_list = tags.replace(' ', '').split(',')
-        return tag_list
-
-    def get_tags_id(self, tags: str) -> list[int]:
-        """Converts the comma-separated tags string to a list of tag IDs.
-
-        This method takes the `tags` string as input, splits it using commas, and creates tags
-        in the database for each individual tag if they do not exist. It then retrieves the
-        IDs of the created tags and returns them as a list. If a tag already exists in the
-        database, its ID will be retrieved instead of creating a new entry.
-
-        Parameters
-        ----------
-            tags (str): The comma-separated tags string.
-
-        Returns
-        -------
-            list[int]: A list of tag IDs for the given tags.
-        """
-        tag_list = self.get_tag_list(tags)
-        tag_id_list = []
-        for tag in tag_list:
-            tag_id = self.db_utils.create_tag(tag)
-            tag_id_list.append(tag_id)
-        return tag_id_list
-
-    def recipe_tags(self, tag_list: list[int], recipe_id: int) -> None:
-        """Associates tags with a recipe in the database.
-
-        This method takes a list of tag IDs (`tag_list`) and associates each tag with the
-        recipe identified by the given `recipe_id`. It creates entries in the database linking
-        the recipe with its corresponding tags.
-
-        Parameters
-        ----------
-            tag_list (list[int]): A list of tag IDs to be associated with the recipe.
-            recipe_id (int): The ID of the recipe to which the tags will be associated.
-        """
-        for tag in tag_list:
-            self.db_utils.create_tag_recipe(tag, recipe_id)
-
-    def recipe_ingredients(self, ingredients_ids: list[int], recipe_id: int):
-        """Associates ingredients with a recipe in the database.
-
-        This method takes a list of ingredient IDs (`ingredients_ids`) and associates each
-        ingredient with the recipe identified by the given `recipe_id`. It creates entries in
-        the database linking the recipe with its corresponding ingredients.
-
-        Parameters
-        ----------
-            ingredients_ids (list[int]): A list of ingredient IDs to be associated with the recipe.
-            recipe_id (int): The ID of the recipe to which the ingredients will be associated.
-        """
-        for id in ingredients_ids:
-            self.db_utils.add_recipe_id_to_ingredients(id, recipe_id)
-
-    def recipe_prep_methods(self, prep_method_ids: list[int], recipe_id: int) -> None:
-        """Associates preparation methods with a recipe in the database.
-
-        This method takes a list of preparation method IDs (`prep_method_ids`) and associates
-        each preparation method with the recipe identified by the given `recipe_id`. It creates
-        entries in the database linking the recipe with its corresponding preparation methods
-        and stores the order of the methods for the recipe.
-
-        Parameters
-        ----------
-            prep_method_ids (list[int]): A list of preparation method IDs to be associated with the recipe.
-            recipe_id (int): The ID of the recipe to which the preparation methods will be associated.
-        """
-        for order, method_id in enumerate(prep_method_ids, start=1):
-            self.db_utils.add_prep_method_to_recipe(method_id, order, recipe_id)
-
     def save(self) -> None:
         """Stores the entered recipe data into the database.
 
         This method retrieves the data entered by the user in the window and stores it into the
-        database as a new recipe. It uses various helper methods to create tags, associate tags,
-        ingredients, and preparation methods with the new recipe, and then closes the window.
+        database as a new recipe. Until now the ingredients, steps, tags and image only lived in
+        the draft: the recipe and all of them are written in a single transaction by
+        `db_utils.save_recipe_bulk`, and then the window is closed.
         """
         try:
-            new_recipe = {
-                'name': self.name.get(),
-                'prep_time': self.preparation_time.get(),
-                'cook_time': self.cooking_time.get(),
-                'image': self.get_source(self.image),
-                'favorite': self.get_fav(self.favorite.get()),
-            }
-            recipe_id = self.db_utils.create_recipe(new_recipe)
-            tag_ids = self.get_tags_id(self.tags.get())
-            self.recipe_tags(tag_ids, recipe_id)
-            self.recipe_ingredients(self.ingredients_temp, recipe_id)
-            self.recipe_prep_methods(self.prep_id_list, recipe_id)
+            self.draft.set_tags(self.tags.get())
+            new_recipe = self.draft.new_recipe(
+                self.name.get(),
+                self.preparation_time.get(),
+                self.cooking_time.get(),
+                self.get_fav(self.favorite.get())
+            )
+            new_recipe['image'] = self.get_source(self.draft.image_source)
+            with self.db_utils.borrow():
+                recipe_id = self.db_utils.save_recipe_bulk(new_recipe)
+            # LOS INGREDIENTES NUEVOS RECIEN EXISTEN AL GUARDAR LA RECETA
+            catalog = get_catalog()
+            for name, amount, unit in new_recipe['ingredients']:
+                catalog.add_ingredient_name(name)
 
             self.close_window(
                 {
                     'id': recipe_id,
                     'name': new_recipe['name'],
-                    'ingredients': self.tree_ing_data,
+                    'ingredients': self.draft.ingredient_rows(),
                     'prep_time': new_recipe['prep_time'],
                     'cook_time': new_recipe['cook_time'],
                     'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
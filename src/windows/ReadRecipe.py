@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk
 from src.windows.IBaseWindow import *
+from src.utils.catalog import CatalogLoadingError, get_catalog
 from PIL import ImageTk, Image
 
 class ReadRecipe(ttk.Frame, IBaseWindow):
@@ -13,28 +14,30 @@ class ReadRecipe(ttk.Frame, IBaseWindow):
     ----------
         parent (tk.Tk or tk.Toplevel): The parent window to which this window is associated.
         title (str): The title of the window.
-        recipe_id (str): The ID of the recipe to be displayed.
+        recipe (dict): The recipe to be displayed, as returned by `DBUtils.get_recipe_by_id`. The main window reads it
+            on the background worker before opening this window.
+        worker (DBWorker): The background worker of the main window, used to find the similar recipes.
 
     Attributes
     ----------
         db_utils (DBUtils): An instance of the DBUtils class for database-related operations.
-        id (str): The ID of the recipe being displayed.
-        recipe (dict): A dictionary containing the details of the recipe fetched from the database.
+        id (int): The ID of the recipe being displayed.
+        recipe (dict): A dictionary containing the details of the recipe.
         star (ImageTk.PhotoImage): An ImageTk.PhotoImage object representing a filled star icon.
         empty_star (ImageTk.PhotoImage): An ImageTk.PhotoImage object representing an empty star icon.
         img (ImageTk.PhotoImage): An ImageTk.PhotoImage object representing the recipe's image.
         ingredient_list (ttk.Treeview): A Treeview widget to display the list of ingredients for the recipe.
         method_list (ttk.Treeview): A Treeview widget to display the list of preparation steps for the recipe.
+        similar_list (ttk.Treeview): A Treeview widget to display the recipes most similar to this one.
     """
-    def __init__(self, parent, title: str, recipe_id: str) -> None:
+    def __init__(self, parent, title: str, recipe: dict, worker) -> None:
         ttk.Frame.__init__(self, parent, padding=(20))
         IBaseWindow.__init__(self, parent, title)
+        self.parent.geometry('600x860')
 
-        self.db_utils = DBUtils()
-        self.db_utils.connect()
-
-        self.id = recipe_id
-        self.recipe = self.db_utils.get_recipe_by_id(recipe_id)
+        self.id = recipe['id']
+        self.recipe = recipe
+        self.worker = worker
         self.star = ImageTk.PhotoImage(
             Image.open('images\star.png').resize((30, 30)))
         self.empty_star = ImageTk.PhotoImage(
@@ -83,39 +86,81 @@ class ReadRecipe(ttk.Frame, IBaseWindow):
         ttk.Label(self.parent, text=f"Tiempo de Cocción: {self.recipe['tiempo de coccion']} min", padding=3).grid(
             row=5, column=3, columnspan=3, sticky=tk.EW)
         
-        ttk.Label(self.parent, text=f"Etiquetas: {self.recipe['etiquetas']}", padding=3).grid(
+        tags = ', '.join(tag.nombre for tag in self.recipe['etiquetas'])
+        ttk.Label(self.parent, text=f"Etiquetas: {tags}", padding=3).grid(
             row=6, column=1, columnspan=5, sticky=tk.EW)
         
+        # RECETAS SIMILARES
+        ttk.Label(self.parent, text="Recetas similares:", padding=3).grid(
+            row=7, column=1, sticky=tk.EW)
+        self.similar_list = ttk.Treeview(self.parent, columns=('Receta', 'Similitud'), show='headings', height=4)
+        self.similar_list.grid(row=8, column=1, sticky=(tk.NSEW), padx=5, columnspan=5)
+        self.similar_list.heading('Receta', text='Receta')
+        self.similar_list.heading('Similitud', text='Similitud')
+        self.similar_list.column(1, anchor=tk.CENTER, stretch=tk.NO, width=90)
+        self.load_similar_recipes()
+
         # BOTON
         ttk.Button(self.parent, text="Cerrar", command=self.parent.destroy).grid(
-            row=7, column=1, columnspan=5, sticky=tk.NSEW, padx=5, pady=5)
+            row=9, column=1, columnspan=5, sticky=tk.NSEW, padx=5, pady=5)
 
     def load_ingredients(self) -> None:
         """Load the ingredients of the recipe into the ingredient_list Treeview.
 
-        This method extracts the ingredients and their corresponding quantities from the recipe dictionary and inserts
-        them into the ingredient_list Treeview for display.
+        This method inserts the ingredients of the recipe dictionary, with their corresponding quantities, into the
+        ingredient_list Treeview for display.
         """
-        ingredients = self.recipe['ingredientes'].split(',')
-        amounts = self.recipe['cantidades'].split(',')
-        for i in range(len(ingredients)):
+        for ingredient in self.recipe['ingredientes']:
             self.ingredient_list.insert(
-                '', tk.END, values=[amounts[i], ingredients[i]])
+                '', tk.END, values=[ingredient.amount(), ingredient.nombre])
 
     def load_method_list(self) -> None:
         """Load the preparation steps of the recipe into the method_list Treeview.
 
-        This method extracts the preparation steps from the recipe dictionary and inserts them into the method_list
-        Treeview for display.
+        This method inserts the preparation steps of the recipe dictionary, in order, into the method_list Treeview
+        for display.
         """
-        prep_methods = self.recipe['preparacion'].split(',')
-        # print(prep_methods)
-        for index, prep_method in enumerate(prep_methods, 1):
-            prep_value = prep_method.strip()
+        for index, prep_method in enumerate(self.recipe['preparacion'], 1):
             self.method_list.insert(
-                '', tk.END, values=[index, prep_value]
+                '', tk.END, values=[index, prep_method.descripcion]
             )
 
+    def load_similar_recipes(self) -> None:
+        """Load the recipes that share the most ingredients and tags with this one into the similar_list Treeview.
+
+        The neighbours come from the MinHash index of the shared recipe catalog. They are found on the background
+        worker, and a placeholder row is shown until `show_similar_recipes` fills the list.
+        """
+        self.similar_list.insert('', tk.END, values=['Buscando recetas similares...', ''])
+        self.worker.submit(get_catalog().similar_recipes, int(self.id),
+                           on_done=self.show_similar_recipes, on_error=self.similar_recipes_failed)
+
+    def show_similar_recipes(self, similar: list) -> None:
+        """Replaces the placeholder of the similar_list Treeview with the recipes found by `load_similar_recipes`.
+
+        Parameters
+        ----------
+            similar (list): The ID, name and similarity of each similar recipe, as returned by
+            `RecipeCatalog.similar_recipes`.
+        """
+        if not self.similar_list.winfo_exists():
+            return
+        self.similar_list.delete(*self.similar_list.get_children())
+        if not similar:
+            self.similar_list.insert('', tk.END, values=['Sin recetas similares', ''])
+        for recipe_id, name, score in similar:
+            self.similar_list.insert('', tk.END, values=[name, f'{score:.0%}'])
+
+    def similar_recipes_failed(self, error: Exception) -> None:
+        """Shows in the similar_list Treeview why the similar recipes could not be found."""
+        if not self.similar_list.winfo_exists():
+            return
+        self.similar_list.delete(*self.similar_list.get_children())
+        if isinstance(error, CatalogLoadingError):
+            self.similar_list.insert('', tk.END, values=['Cargando el catalogo...', ''])
+        else:
+            self.similar_list.insert('', tk.END, values=[f'Error: {error}', ''])
+
     def __del__(self):
         """Destructor method to disconnect from the database.
 
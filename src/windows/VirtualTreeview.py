@@ -0,0 +1,179 @@
+import tkinter as tk
+from tkinter import ttk
+
+class VirtualTreeview:
+    """A Treeview that only materializes the rows inside its viewport.
+
+    All rows are kept in a plain Python list (the row store). Only the rows that are currently visible, plus a few
+    rows of overscan above and below, exist as Tk items. Scrolling moves a window over the row store and
+    re-renders it, so the cost of scrolling, refreshing or clearing the list depends on the size of the viewport and
+    not on the number of rows.
+
+    Parameters
+    ----------
+        parent (tk.Tk or tk.Toplevel): The widget that contains the Treeview and its scrollbar.
+        columns (tuple): The column names of the Treeview.
+        row_height (int): The height of a row in pixels, as configured in the Treeview style.
+        overscan (int): The number of extra rows materialized above and below the viewport.
+        on_near_end (callable, optional): Called without arguments when the viewport reaches the last rows of the
+            store. Used to load more rows on demand.
+
+    Attributes
+    ----------
+        tree (ttk.Treeview): The underlying Treeview, used to configure headings and columns.
+        scrollbar (ttk.Scrollbar): The vertical scrollbar, driven by the row store instead of the Treeview.
+        rows (list[tuple]): The row store.
+        top (int): The index of the first visible row.
+        rendered (dict[int, tuple]): The values of each materialized item, by row index.
+    """
+    def __init__(self, parent, columns: tuple, row_height: int = 30, overscan: int = 5, on_near_end=None) -> None:
+        self.rows = []
+        self.top = 0
+        self.visible = 1
+        self.row_height = row_height
+        self.overscan = overscan
+        self.on_near_end = on_near_end
+        self.selected_index = None
+        self.rendered = {}
+
+        self.tree = ttk.Treeview(parent, columns=columns, show='headings', selectmode='browse')
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.yview)
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.tree.bind('<MouseWheel>', self.on_mouse_wheel)
+        self.tree.bind('<Button-4>', lambda event: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll(3))
+        self.tree.bind('<Up>', lambda event: self.move_selection(-1))
+        self.tree.bind('<Down>', lambda event: self.move_selection(1))
+        self.tree.bind('<Prior>', lambda event: self.move_selection(-self.visible))
+        self.tree.bind('<Next>', lambda event: self.move_selection(self.visible))
+
+# ROW STORE ----------------------------------------
+
+    def set_rows(self, rows: list) -> None:
+        """Replaces every row of the list and scrolls back to the top.
+
+        The Treeview items are reused: only the visible rows whose values changed are updated.
+        """
+        self.rows = [tuple(row) for row in rows]
+        self.top = 0
+        self.selected_index = None
+        self.render()
+
+    def append_rows(self, rows: list) -> None:
+        """Adds rows at the end of the list."""
+        self.rows.extend(tuple(row) for row in rows)
+        self.render()
+
+    def update_row(self, index: int, values: tuple) -> None:
+        """Replaces the values of the row at the given index."""
+        self.rows[index] = tuple(values)
+        self.render()
+
+    def get_row(self, index: int) -> tuple:
+        """Returns the values of the row at the given index."""
+        return self.rows[index]
+
+    def get_rows(self) -> list:
+        """Returns a copy of every row of the list."""
+        return list(self.rows)
+
+    def clear(self) -> None:
+        """Removes every row of the list."""
+        self.set_rows([])
+
+    def selected(self) -> tuple:
+        """Returns the index and values of the selected row.
+
+        Raises
+        ------
+            IndexError: If no row is selected.
+        """
+        if self.selected_index is None or self.selected_index >= len(self.rows):
+            raise IndexError('No hay ninguna fila seleccionada')
+        return self.selected_index, self.rows[self.selected_index]
+
+# VIEWPORT ----------------------------------------
+
+    def render(self) -> None:
+        """Materializes the rows of the viewport, plus overscan, as Treeview items.
+
+        Each item is identified by the index of its row in the store, so the selection survives scrolling. The
+        items already on screen are diffed against the rows that should be shown: items that left the viewport
+        are deleted, new ones are inserted, and the rest are only updated when their values changed.
+        """
+        self.top = max(0, min(self.top, len(self.rows) - self.visible))
+        start = max(0, self.top - self.overscan)
+        end = min(len(self.rows), self.top + self.visible + self.overscan)
+
+        stale = [str(index) for index in self.rendered if not start <= index < end]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                del self.rendered[int(iid)]
+        for position, index in enumerate(range(start, end)):
+            values = self.rows[index]
+            if index not in self.rendered:
+                self.tree.insert('', position, iid=str(index), values=values)
+            elif self.rendered[index] != values:
+                self.tree.item(str(index), values=values)
+            self.rendered[index] = values
+
+        if end > start:
+            self.tree.yview_moveto((self.top - start) / (end - start))
+        if self.selected_index is not None and start <= self.selected_index < end:
+            self.tree.selection_set(str(self.selected_index))
+            self.tree.focus(str(self.selected_index))
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        total = max(len(self.rows), 1)
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + self.visible) / total))
+        if self.on_near_end is not None and self.top + self.visible * 2 >= len(self.rows):
+            self.on_near_end()
+
+    def yview(self, *args) -> None:
+        """Scrollbar command: handles 'moveto' and 'scroll' requests over the row store."""
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * len(self.rows))
+            self.render()
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            self.scroll(amount * self.visible if args[2] == 'pages' else amount)
+
+    def scroll(self, amount: int) -> str:
+        """Scrolls the viewport by 'amount' rows."""
+        self.top += amount
+        self.render()
+        return 'break'
+
+    def on_mouse_wheel(self, event) -> str:
+        """Scrolls three rows per wheel notch."""
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def on_resize(self, event) -> None:
+        """Recomputes how many rows fit in the viewport when the Treeview is resized."""
+        visible = max(1, (event.height - self.row_height) // self.row_height)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+    def on_select(self, event) -> None:
+        """Remembers the selected row by its index in the store."""
+        selection = self.tree.selection()
+        if selection:
+            self.selected_index = int(selection[0])
+
+    def move_selection(self, amount: int) -> str:
+        """Moves the selection with the keyboard, scrolling the viewport to keep it visible."""
+        if not self.rows:
+            return 'break'
+        current = self.selected_index if self.selected_index is not None else self.top - amount
+        self.selected_index = max(0, min(len(self.rows) - 1, current + amount))
+        if self.selected_index < self.top:
+            self.top = self.selected_index
+        elif self.selected_index >= self.top + self.visible:
+            self.top = self.selected_index - self.visible + 1
+        self.render()
+        return 'break'
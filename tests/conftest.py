@@ -0,0 +1,87 @@
+"""Shared fixtures of the test suite.
+
+The tests run without a MySQL server: `FakeConnection` records the statements DBUtils sends and answers the lookups
+of the dictionary tables (ingredients, tags and steps), so the number of statements and commits of a save can be
+counted.
+"""
+
+import pytest
+
+
+class FakeCursor:
+    """A cursor that records every statement on its connection."""
+    def __init__(self, connection) -> None:
+        self.connection = connection
+        self.rows = []
+        self.lastrowid = None
+        self.rowcount = 0
+
+    def execute(self, query: str, params=()) -> None:
+        query = ' '.join(query.split())
+        if self.connection.fail_on is not None and query.startswith(self.connection.fail_on):
+            raise RuntimeError(f'fallo en {self.connection.fail_on}')
+        self.connection.statements.append((query, list(params)))
+        self.rows = []
+        if query.startswith('SELECT'):
+            # LOS NOMBRES CONOCIDOS YA EXISTEN EN LA TABLA DICCIONARIO
+            self.rows = [(self.connection.existing[name], name) for name in params if name in self.connection.existing]
+        elif query.startswith('INSERT'):
+            self.connection.last_id += 1
+            self.lastrowid = self.connection.last_id
+        self.rowcount = 1
+
+    def executemany(self, query: str, seq_params: list) -> None:
+        self.connection.statements.append((' '.join(query.split()), list(seq_params)))
+        self.rowcount = len(seq_params)
+
+    def fetchall(self) -> list:
+        return self.rows
+
+    def close(self) -> None:
+        pass
+
+
+class FakeConnection:
+    """A connection that records statements, commits and rollbacks instead of talking to MySQL.
+
+    Attributes
+    ----------
+        existing (dict[str, int]): The ID of each folded name the dictionary tables already hold.
+        statements (list[tuple[str, list]]): Every statement run, with its parameters.
+        fail_on (str): A statement prefix that makes `execute` raise, to test rollbacks.
+    """
+    def __init__(self, existing: dict = None) -> None:
+        self.existing = dict(existing or {})
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.transactions = 0
+        self.last_id = 1000
+        self.fail_on = None
+
+    def cursor(self, *args, **kwargs) -> FakeCursor:
+        return FakeCursor(self)
+
+    def start_transaction(self) -> None:
+        self.transactions += 1
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def db_utils():
+    """A DBUtils on a FakeConnection, with empty name caches of its own."""
+    pytest.importorskip('mysql.connector')
+    from src.utils.db_utils import DBUtils
+    from src.utils.name_cache import NameCache, NameInterner
+
+    db_utils = DBUtils()
+    db_utils.connection = FakeConnection()
+    db_utils.ingredient_names = NameInterner()
+    db_utils.tag_names = NameCache(100, 60)
+    db_utils.step_names = NameCache(100, 60)
+    return db_utils
@@ -0,0 +1,109 @@
+import pytest
+
+pytest.importorskip('mysql.connector')
+
+from src.utils.db_utils import RecipeIngredient, RecipeStep, RecipeTag
+from src.utils.recipe_draft import RecipeDraft
+from src.utils.search_index import fold_text
+
+
+def make_recipe(size: int) -> dict:
+    return {
+        'id': 7,
+        'imagen': None,
+        'ingredientes': [RecipeIngredient(100 + i, 10 + i, f'ingrediente {i}', 1, 'g') for i in range(size)],
+        'preparacion': [RecipeStep(200 + i, 500 + i, i + 1, f'paso {i}') for i in range(size)],
+        'etiquetas': [RecipeTag(300 + i, f'etiqueta {i}') for i in range(size)],
+    }
+
+
+def edit(recipe: dict, changed: int) -> dict:
+    """Removes the last 'changed' ingredients, steps and tags of a recipe and adds as many new ones."""
+    draft = RecipeDraft(recipe)
+    for i in range(changed):
+        draft.remove_last_ingredient()
+        draft.remove_last_step()
+    for i in range(changed):
+        draft.add_ingredient(f'nuevo {i}', 2, 'g')
+        draft.add_step(f'paso nuevo {i}')
+    draft.set_tags(','.join(draft.tags[:len(draft.tags) - changed] + [f'nueva {i}' for i in range(changed)]))
+    return draft.changes()
+
+
+def recipe_row(recipe: dict) -> dict:
+    return {'id': recipe['id'], 'nombre': 'Guiso', 'tiempo de preparacion': 10, 'tiempo de coccion': 20,
+            'imagen': None, 'favorito': 0}
+
+
+def test_nothing_changed_runs_no_statement(db_utils):
+    recipe = make_recipe(5)
+    assert db_utils.check_and_update(RecipeDraft(recipe).changes(), recipe) == 0
+    assert db_utils.connection.statements == []
+    assert db_utils.connection.commits == 0
+
+
+@pytest.mark.parametrize('changed', [1, 10, 100])
+def test_statement_count_does_not_grow_with_the_changes(db_utils, changed):
+    recipe = make_recipe(200)
+    edited = edit(recipe, changed)
+    names = [f'nuevo {i}' for i in range(changed)]
+    db_utils.connection.existing = {fold_text(name): 900 + i for i, name in enumerate(names)}
+    db_utils.connection.existing.update({f'paso nuevo {i}': 950 + i for i in range(changed)})
+    db_utils.connection.existing.update({f'nueva {i}': 990 + i for i in range(changed)})
+
+    # UN DELETE, UN SELECT DE NOMBRES Y UN INSERT MULTIPLE POR INGREDIENTES, PASOS Y ETIQUETAS, Y LA FECHA DE
+    # DESVINCULACION DE LOS PASOS
+    assert db_utils.check_and_update(edited, recipe) == 10
+    assert len(db_utils.connection.statements) == 10
+    assert db_utils.connection.commits == 1
+
+
+def test_new_names_are_inserted_once_each(db_utils):
+    recipe = make_recipe(10)
+    statements = db_utils.check_and_update(edit(recipe, 3), recipe)
+    inserts = [query for query, params in db_utils.connection.statements
+               if query.startswith('INSERT INTO') and 'ON DUPLICATE KEY' in query]
+    assert len(inserts) == 9
+    assert statements == 10 + 9
+
+
+def test_cached_names_skip_the_lookup(db_utils):
+    recipe = make_recipe(10)
+    edited = edit(recipe, 2)
+    for i in range(2):
+        db_utils.ingredient_names.put(fold_text(f'nuevo {i}'), 900 + i)
+        db_utils.step_names.put(fold_text(f'paso nuevo {i}'), 950 + i)
+        db_utils.tag_names.put(fold_text(f'nueva {i}'), 990 + i)
+    assert db_utils.check_and_update(edited, recipe) == 7
+    assert not any(query.startswith('SELECT') for query, params in db_utils.connection.statements)
+
+
+def test_recipe_row_is_saved_in_the_same_transaction(db_utils):
+    recipe = make_recipe(5)
+    statements = db_utils.check_and_update(edit(recipe, 1), recipe, recipe_row(recipe))
+    connection = db_utils.connection
+    assert connection.statements[0][0].startswith('UPDATE recetas')
+    assert statements == len(connection.statements)
+    assert (connection.transactions, connection.commits) == (1, 1)
+
+
+def test_recipe_row_alone_is_saved(db_utils):
+    recipe = make_recipe(5)
+    assert db_utils.check_and_update(RecipeDraft(recipe).changes(), recipe, recipe_row(recipe)) == 1
+    assert db_utils.connection.commits == 1
+
+
+def test_failure_rolls_back_everything(db_utils):
+    recipe = make_recipe(5)
+    db_utils.connection.fail_on = 'DELETE FROM etiquetas_receta'
+    with pytest.raises(RuntimeError):
+        db_utils.check_and_update(edit(recipe, 1), recipe, recipe_row(recipe))
+    assert db_utils.connection.statements[0][0].startswith('UPDATE recetas')
+    assert (db_utils.connection.commits, db_utils.connection.rollbacks) == (0, 1)
+
+
+def test_removed_steps_record_their_unlink_time(db_utils):
+    recipe = make_recipe(5)
+    db_utils.check_and_update(edit(recipe, 2), recipe)
+    updates = [params for query, params in db_utils.connection.statements if query.startswith('UPDATE pasos SET desvinculado_el')]
+    assert updates == [[503, 504]]
@@ -0,0 +1,74 @@
+import pytest
+
+mysql_connector = pytest.importorskip('mysql.connector')
+
+from src.utils import db_migrate
+
+
+class EmptyServerCursor:
+    """A cursor on a MySQL server without the application database: only 'information_schema' can be read."""
+    def __init__(self, statements: list) -> None:
+        self.statements = statements
+        self.rows = []
+        self.with_rows = False
+
+    def execute(self, query: str, params=None) -> None:
+        query = ' '.join(query.split())
+        self.statements.append(query)
+        if 'information_schema' in query:
+            self.rows = [(0,)] if query.startswith('SELECT COUNT(*)') else []
+        elif query.startswith('SELECT'):
+            raise mysql_connector.errors.ProgrammingError(errno=mysql_connector.errorcode.ER_NO_DB_ERROR)
+        else:
+            self.rows = []
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self) -> list:
+        return self.rows
+
+    def close(self) -> None:
+        pass
+
+
+class EmptyServer:
+    def __init__(self) -> None:
+        self.statements = []
+        self.commits = 0
+
+    def cursor(self, *args, **kwargs) -> EmptyServerCursor:
+        return EmptyServerCursor(self.statements)
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def close(self) -> None:
+        pass
+
+
+def test_dry_run_on_a_new_server_changes_nothing(monkeypatch, capsys):
+    server = EmptyServer()
+    monkeypatch.setattr(mysql_connector, 'connect', lambda **kwargs: server)
+    monkeypatch.setattr('sys.argv', ['db_migrate', '--dry-run'])
+    db_migrate.main()
+
+    assert all(statement.startswith('SELECT') for statement in server.statements)
+    assert server.commits == 0
+    output = capsys.readouterr().out
+    assert 'no existe' in output
+    assert 'v009' in output
+    assert "AVISO: 'recetas' se copia entera para agregar la columna generada 'tiempo_total'" in output
+
+
+def test_query_errors_are_raised_outside_dry_run():
+    ctx = db_migrate.MigrationContext(EmptyServerCursor([]))
+    with pytest.raises(mysql_connector.errors.ProgrammingError):
+        ctx.query("SELECT COUNT(*) FROM recetas")
+
+
+def test_dry_run_and_synthetic_cannot_be_combined(monkeypatch):
+    monkeypatch.setattr(mysql_connector, 'connect', lambda **kwargs: pytest.fail('no debe conectarse'))
+    monkeypatch.setattr('sys.argv', ['db_migrate', '--dry-run', '--synthetic', '100'])
+    with pytest.raises(SystemExit):
+        db_migrate.main()
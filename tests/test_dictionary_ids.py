@@ -0,0 +1,21 @@
+import pytest
+
+pytest.importorskip('mysql.connector')
+
+
+def test_names_are_looked_up_by_their_folded_key(db_utils):
+    db_utils.connection.existing = {'postre': 5}
+    ids = db_utils.tag_ids(db_utils.connection.cursor(), ['Postre', ' POSTRE ', 'Sin  Gluten', 'sin gluten'])
+    select, insert = db_utils.connection.statements
+    assert select == ('SELECT id_etiqueta, nombre_clave FROM etiquetas WHERE nombre_clave IN (%s, %s)',
+                      ['postre', 'sin gluten'])
+    assert insert[0].startswith('INSERT INTO etiquetas (nombre, nombre_clave)')
+    assert insert[1] == ['Sin  Gluten', 'sin gluten']
+    assert ids == {'postre': 5, 'sin gluten': db_utils.connection.last_id}
+
+
+def test_only_rows_read_from_the_database_are_cached(db_utils):
+    db_utils.connection.existing = {'batir': 8}
+    db_utils.step_ids(db_utils.connection.cursor(), ['Batir', 'Hornear'])
+    assert db_utils.step_names.get('batir') == 8
+    assert db_utils.step_names.get('hornear') is None
@@ -0,0 +1,17 @@
+from benchmarks import fuzzy
+from src.utils.fuzzy_index import FuzzyIndex
+
+
+def test_search_tolerates_typos_closest_first():
+    index = FuzzyIndex()
+    index.set_recipe(1, 'Berenjenas al horno', ['berenjena', 'queso'])
+    index.set_recipe(2, 'Guiso', ['berenjena', 'carne'])
+    index.set_recipe(3, 'Ensalada', ['lechuga'])
+    assert index.search('berengena') == [(1, 1), (2, 1)]
+    assert index.search('lechuga', limit=1) == [(3, 0)]
+
+
+def test_search_matches_a_scan_of_the_vocabulary():
+    result = fuzzy.run(recipes=2000, queries=100)
+    assert result['exact']
+    assert result['compared'] < result['vocabulary'] / 10
@@ -0,0 +1,33 @@
+from src.utils.catalog import RecipeCatalog
+
+
+class NamesReader:
+    """Stands in for the worker's DBUtils: only reads the ingredient names, counting the reads."""
+    def __init__(self, names: list[str], during_read=None) -> None:
+        self.names = names
+        self.during_read = during_read
+        self.reads = 0
+
+    def read_ingredient_names(self) -> list[str]:
+        self.reads += 1
+        if self.during_read is not None:
+            self.during_read()
+        return self.names
+
+
+def test_suggestions_never_read_the_database():
+    catalog = RecipeCatalog()
+    assert catalog.suggest_ingredients('to') == []
+
+    reader = NamesReader(['Tomate', 'Tomillo', 'Azucar'])
+    catalog.load_ingredient_names(reader)
+    catalog.load_ingredient_names(reader)
+    assert reader.reads == 1
+    assert catalog.suggest_ingredients('to') == ['Tomate', 'Tomillo']
+
+
+def test_ingredient_created_while_the_names_load_is_suggested():
+    catalog = RecipeCatalog()
+    reader = NamesReader(['Tomate'], during_read=lambda: catalog.add_ingredient_name('Tomatillo'))
+    catalog.load_ingredient_names(reader)
+    assert sorted(catalog.suggest_ingredients('tom')) == ['Tomate', 'Tomatillo']
@@ -0,0 +1,40 @@
+from array import array
+from src.utils.search_index import IntersectCursor, InvertedIndex, QuerySyntaxError, take
+import pytest
+import random
+
+
+@pytest.fixture
+def index():
+    index = InvertedIndex()
+    index.set_terms(1, ['Pollo', 'limón', 'cena'])
+    index.set_terms(2, ['pollo', 'picante', 'cena'])
+    index.set_terms(3, ['limon', 'postre'])
+    index.set_terms(4, ['pollo', 'limon', 'aceite de oliva'])
+    return index
+
+
+def test_query_combines_and_or_not(index):
+    assert index.query('pollo AND limon') == [1, 4]
+    assert index.query('pollo NOT picante') == [1, 4]
+    assert index.query('postre OR picante') == [2, 3]
+    assert index.query('(pollo OR postre) AND limon AND cena') == [1]
+    assert index.query('aceite de oliva AND pollo') == [4]
+    assert index.query('pollo AND limon', limit=1) == [1]
+
+
+def test_query_rejects_malformed_expressions(index):
+    with pytest.raises(QuerySyntaxError):
+        index.query('pollo AND')
+    with pytest.raises(QuerySyntaxError):
+        index.query('(pollo OR limon')
+
+
+def test_intersect_matches_a_set_intersection():
+    generator = random.Random(1)
+    for short_size, long_size in ((10, 50000), (3000, 4000), (20000, 60000)):
+        short = array('i', sorted(generator.sample(range(100000), short_size)))
+        long = array('i', sorted(generator.sample(range(100000), long_size)))
+        expected = sorted(set(short) & set(long))
+        assert take(IntersectCursor(long, short)) == expected
+        assert take(IntersectCursor(short, long), 100) == expected[:100]
@@ -0,0 +1,29 @@
+from benchmarks import pantry
+from src.utils.search_index import PantryIndex
+
+
+def test_query_ranks_fewest_missing_first():
+    index = PantryIndex()
+    index.build({
+        1: ['pollo', 'limon', 'sal'],
+        2: ['Pollo', 'limón', 'sal', 'azafran'],
+        3: ['harina', 'azucar', 'huevo', 'sal'],
+        4: ['sal'],
+    })
+    assert index.query(['pollo', 'limon', 'sal']) == [(1, 0, 3), (4, 0, 1)]
+    assert index.query(['pollo', 'limon', 'sal'], max_missing=1) == [(1, 0, 3), (4, 0, 1), (2, 1, 4)]
+
+
+def test_removed_recipes_are_not_found():
+    index = PantryIndex()
+    index.build({1: ['pollo', 'sal'], 2: ['pollo', 'ajo']})
+    index.set_ingredients(2, ['pollo', 'sal'])
+    index.remove(1)
+    assert index.query(['pollo', 'sal']) == [(2, 0, 2)]
+    assert all(1 not in recipes for postings in index.rarest for recipes in postings.values())
+
+
+def test_pruned_query_matches_a_pass_over_every_recipe():
+    results = pantry.run(recipes=5000, pantry_size=30, queries=20, missing=[0, 1, 2, 3])
+    assert all(result['exact'] for result in results.values())
+    assert results[0]['candidates'] < 5000 / 10
@@ -0,0 +1,38 @@
+from src.utils.recipe_cache import RecipeCache
+
+
+def recipe(name: str) -> dict:
+    return {'id_receta': 1, 'nombre': name, 'ingredientes': [], 'preparacion': [], 'etiquetas': []}
+
+
+def test_read_finished_after_an_invalidation_is_not_stored():
+    cache = RecipeCache(10, 300)
+    generation = cache.generation(1)
+    cache.invalidate(1)
+    cache.put(1, recipe('antes'), generation)
+    assert cache.get(1) is None
+    assert cache.stats()['discarded'] == 1
+
+    cache.put(1, recipe('despues'), cache.generation(1))
+    assert cache.get(1)['nombre'] == 'despues'
+
+
+def test_read_finished_after_a_clear_is_not_stored():
+    cache = RecipeCache(10, 300)
+    generation = cache.generation(1)
+    cache.clear()
+    cache.put(1, recipe('antes'), generation)
+    assert cache.get(1) is None
+
+
+def test_get_recipe_by_id_skips_the_cache_when_the_recipe_changes_while_read(db_utils, monkeypatch):
+    db_utils.cache = RecipeCache(10, 300)
+
+    def format_saved_meanwhile(rows):
+        # OTRA VENTANA GUARDA LA RECETA MIENTRAS SE LEE
+        db_utils.cache.invalidate(1)
+        return recipe('antes')
+
+    monkeypatch.setattr(db_utils, 'format_recipe', format_saved_meanwhile)
+    assert db_utils.get_recipe_by_id(1)['nombre'] == 'antes'
+    assert db_utils.cache.get(1) is None
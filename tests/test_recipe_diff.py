@@ -0,0 +1,74 @@
+import pytest
+
+pytest.importorskip('mysql.connector')
+
+from src.utils.db_utils import RecipeIngredient, RecipeStep, RecipeTag
+from src.utils.recipe_diff import RowDiff, diff_recipe, diff_rows
+from operator import attrgetter, itemgetter
+
+
+def steps(*descriptions, first_id=1):
+    return [RecipeStep(first_id + index, 500 + index, index + 1, text) for index, text in enumerate(descriptions)]
+
+
+def test_diff_rows_unchanged_is_empty():
+    original = steps('a', 'b', 'c')
+    diff = diff_rows(original, list(original), attrgetter('id'), attrgetter('orden'))
+    assert diff == RowDiff([], [], [])
+    assert not diff
+
+
+def test_diff_rows_added_removed_and_moved():
+    a, b, c = steps('a', 'b', 'c')
+    new = RecipeStep(None, None, 4, 'd')
+    diff = diff_rows([a, b, c], [c, a, new], attrgetter('id'), attrgetter('orden'))
+    assert diff.added == [(3, new)]
+    assert diff.removed == [b]
+    assert diff.moved == [(1, c), (2, a)]
+
+
+def test_diff_rows_without_position_reports_no_moves():
+    a, b = steps('a', 'b')
+    diff = diff_rows([a, b], [b, a], attrgetter('id'))
+    assert diff == RowDiff([], [], [])
+
+
+def test_diff_rows_rows_without_key_are_always_added():
+    new = RecipeIngredient(None, None, 'sal', 1, 'pizca')
+    diff = diff_rows([], [new, new], attrgetter('id'))
+    assert diff.added == [(1, new), (2, new)]
+
+
+def test_diff_rows_repeated_keys_count_once():
+    diff = diff_rows(['x'], ['x', 'y', 'y', 'x'], lambda row: row)
+    assert diff.added == [(2, 'y')]
+    assert diff.removed == []
+
+
+def test_diff_rows_is_linear():
+    calls = []
+
+    def key(row):
+        calls.append(row)
+        return row[0]
+
+    original = [(index, 'old') for index in range(5000)]
+    edited = [(index, 'new') for index in range(2500, 7500)]
+    diff = diff_rows(original, edited, key, itemgetter(0))
+    assert len(diff.added) == 2500
+    assert len(diff.removed) == 2500
+    assert len(calls) == len(original) + len(edited)
+
+
+def test_diff_recipe_matches_tags_ignoring_case_and_accents():
+    original = {
+        'ingredientes': [RecipeIngredient(1, 10, 'Tomate', 2, 'u')],
+        'preparacion': steps('Cortar'),
+        'etiquetas': [RecipeTag(7, 'Cena'), RecipeTag(8, 'Rápida')],
+    }
+    edited = {'ingredientes': original['ingredientes'], 'preparacion': original['preparacion'],
+              'etiquetas': ['cena', 'RAPIDA', 'Vegana']}
+    diff = diff_recipe(original, edited)
+    assert not diff.ingredients and not diff.steps
+    assert diff.tags.added == [(3, 'Vegana')]
+    assert diff.tags.removed == []
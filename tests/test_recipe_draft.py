@@ -0,0 +1,64 @@
+"""Write amplification of the recipe windows.
+
+The windows used to write every ingredient and step as soon as it was added and delete it again when it was removed,
+so the writes grew with the number of actions in the window. With RecipeDraft, only the final recipe is written: these
+tests count the statements and commits of a save after many actions, with `FakeConnection`.
+"""
+
+import pytest
+
+pytest.importorskip('mysql.connector')
+
+from src.utils.db_utils import RecipeIngredient, RecipeStep, RecipeTag
+from src.utils.recipe_draft import RecipeDraft
+from src.utils.search_index import fold_text
+
+
+def churn(draft: RecipeDraft, actions: int) -> None:
+    """Adds and removes ingredients and steps, as a user correcting mistakes in the window would."""
+    for i in range(actions):
+        draft.add_ingredient(f'equivocado {i}', 1, 'g')
+        draft.remove_last_ingredient()
+        draft.add_step(f'paso equivocado {i}')
+        draft.remove_last_step()
+
+
+def known_names(db_utils, count: int) -> None:
+    existing = db_utils.connection.existing
+    for i in range(count):
+        existing[fold_text(f'ingrediente {i}')] = 100 + i
+        existing[f'paso {i}'] = 200 + i
+    existing['cena'] = 300
+
+
+@pytest.mark.parametrize('actions', [0, 10, 100])
+def test_new_recipe_is_written_once(db_utils, actions):
+    known_names(db_utils, 12)
+    draft = RecipeDraft()
+    for i in range(12):
+        draft.add_ingredient(f'ingrediente {i}', i, 'g')
+        draft.add_step(f'paso {i}')
+    churn(draft, actions)
+    draft.set_tags('cena')
+    db_utils.save_recipe_bulk(draft.new_recipe('Guiso', 10, 20, 0))
+
+    connection = db_utils.connection
+    # LA RECETA, Y UNA BUSQUEDA DE NOMBRES Y UN INSERT MULTIPLE POR ETIQUETAS, INGREDIENTES Y PASOS
+    assert len(connection.statements) == 7
+    assert connection.commits == 1
+    links = sum(len(params) for query, params in connection.statements if params and isinstance(params[0], tuple))
+    # UNA ETIQUETA, 12 INGREDIENTES Y 12 PASOS: NINGUNA FILA DE LAS ACCIONES DESHECHAS
+    assert links == 1 + 12 + 12
+
+
+@pytest.mark.parametrize('actions', [1, 100])
+def test_edits_that_cancel_out_write_nothing(db_utils, actions):
+    recipe = {'id': 7, 'imagen': None,
+              'ingredientes': [RecipeIngredient(1, 10, 'sal', 1, 'pizca')],
+              'preparacion': [RecipeStep(2, 20, 1, 'Mezclar')],
+              'etiquetas': [RecipeTag(3, 'cena')]}
+    draft = RecipeDraft(recipe)
+    churn(draft, actions)
+    assert db_utils.check_and_update(draft.changes(), recipe) == 0
+    assert db_utils.connection.statements == []
+    assert db_utils.connection.commits == 0
@@ -0,0 +1,55 @@
+from src.utils.recipe_query import RecipeQuery
+
+
+def test_with_tags_counts_names_that_only_differ_in_case_or_accents_once():
+    query, params = RecipeQuery().with_tags(['Postre', ' postre ', 'pôstre', 'vegano', '  ']).build()
+    assert 'etiquetas.nombre_clave IN (%s, %s)' in query
+    assert 'COUNT(DISTINCT etiquetas.nombre_clave) = %s' in query
+    assert params == ('postre', 'vegano', 2)
+
+
+def test_with_ingredients_without_names_adds_no_condition():
+    query, params = RecipeQuery().with_ingredients([' ', '']).build()
+    assert 'recetas.id_receta IN' not in query
+    assert params == ()
+
+
+def outer_where(query: str) -> str:
+    """Returns the conditions of the outer WHERE clause, after the subquery that lists the ingredient names."""
+    outer = query[query.index(') AS ingredientes'):]
+    if 'WHERE' not in outer:
+        return ''
+    return outer[outer.index('WHERE') + len('WHERE'):outer.index('ORDER BY')]
+
+
+def test_empty_filter_returns_every_recipe():
+    query, params = RecipeQuery().build()
+    assert outer_where(query) == ''
+    assert 'LIMIT' not in query
+    assert params == ()
+
+
+def test_tags_with_other_filters_keep_the_having_count_and_the_parameter_order():
+    query, params = RecipeQuery().prep_time(maximum=30).favorite().with_tags(['Postre', 'vegano', 'POSTRE']).limit(50).build()
+    where = outer_where(query)
+    assert where.index('recetas.tiempo_preparacion <= %s') < where.index('recetas.favorito = %s') < where.index('etiquetas')
+    assert where.count(' AND ') == 2
+    assert 'HAVING COUNT(DISTINCT etiquetas.nombre_clave) = %s' in where
+    assert params == (30, 1, 'postre', 'vegano', 2, 50)
+
+
+def test_ingredients_with_prep_time_are_combined_with_and():
+    query, params = RecipeQuery().with_ingredients(['Tomate', 'Albahaca']).prep_time(minimum=10, maximum=45).build()
+    where = outer_where(query)
+    assert 'ingredientes.nombre_clave IN (%s, %s)' in where
+    assert 'HAVING COUNT(DISTINCT ingredientes.nombre_clave) = %s' in where
+    assert where.index('ingredientes_receta') < where.index('recetas.tiempo_preparacion >= %s')
+    assert params == ('tomate', 'albahaca', 2, 10, 45)
+
+
+def test_tags_and_ingredients_in_the_same_filter():
+    query, params = RecipeQuery().with_tags(['cena']).with_ingredients(['pollo']).build()
+    where = outer_where(query)
+    assert 'HAVING COUNT(DISTINCT etiquetas.nombre_clave) = %s' in where
+    assert 'HAVING COUNT(DISTINCT ingredientes.nombre_clave) = %s' in where
+    assert params == ('cena', 1, 'pollo', 1)
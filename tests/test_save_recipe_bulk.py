@@ -0,0 +1,57 @@
+"""Round trips of `DBUtils.save_recipe_bulk`.
+
+A new recipe used to cost 3 + 5T + 2I + 2S statements and a commit per row (T tags, I ingredients, S steps). It is now
+written in one transaction: the recipe row, then for each kind of name one lookup, an insert per name that does not
+exist yet and one multi-row insert of the links. These tests count the statements with `FakeConnection`.
+"""
+
+import pytest
+
+pytest.importorskip('mysql.connector')
+
+from src.utils.search_index import fold_text
+
+
+def new_recipe(tags: int, ingredients: int, steps: int) -> dict:
+    return {'name': 'Guiso', 'prep_time': 10, 'cook_time': 20, 'image': None, 'favorite': 0,
+            'tags': [f'etiqueta {i}' for i in range(tags)],
+            'ingredients': [(f'ingrediente {i}', i, 'g') for i in range(ingredients)],
+            'steps': [f'paso {i}' for i in range(steps)]}
+
+
+def known(db_utils, recipe: dict) -> None:
+    existing = db_utils.connection.existing
+    for name in recipe['tags'] + [name for name, amount, unit in recipe['ingredients']] + recipe['steps']:
+        existing[fold_text(name)] = len(existing) + 1
+
+
+@pytest.mark.parametrize('tags, ingredients, steps', [(0, 0, 0), (1, 1, 1), (3, 20, 15), (5, 60, 40)])
+def test_save_of_new_names(db_utils, tags, ingredients, steps):
+    db_utils.save_recipe_bulk(new_recipe(tags, ingredients, steps))
+
+    connection = db_utils.connection
+    # LA RECETA, Y POR CADA TIPO DE NOMBRE UNA BUSQUEDA, UN INSERT POR NOMBRE NUEVO Y UN INSERT MULTIPLE DE VINCULOS
+    kinds = sum(1 for count in (tags, ingredients, steps) if count)
+    assert len(connection.statements) == 1 + 2 * kinds + tags + ingredients + steps
+    assert (connection.transactions, connection.commits) == (1, 1)
+
+
+@pytest.mark.parametrize('tags, ingredients, steps', [(1, 1, 1), (3, 20, 15), (5, 60, 40)])
+def test_save_of_existing_names_does_not_depend_on_the_recipe_size(db_utils, tags, ingredients, steps):
+    recipe = new_recipe(tags, ingredients, steps)
+    known(db_utils, recipe)
+    db_utils.save_recipe_bulk(recipe)
+    assert len(db_utils.connection.statements) == 7
+
+    # LOS NOMBRES LEIDOS QUEDAN EN CACHE: LA SEGUNDA RECETA SOLO ESCRIBE SU FILA Y SUS VINCULOS
+    db_utils.connection.statements.clear()
+    db_utils.save_recipe_bulk(recipe)
+    assert len(db_utils.connection.statements) == 4
+    assert db_utils.connection.commits == 2
+
+
+def test_failed_save_writes_nothing(db_utils):
+    db_utils.connection.fail_on = 'INSERT INTO pasos ('
+    with pytest.raises(RuntimeError):
+        db_utils.save_recipe_bulk(new_recipe(3, 20, 15))
+    assert (db_utils.connection.commits, db_utils.connection.rollbacks) == (0, 1)
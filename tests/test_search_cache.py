@@ -0,0 +1,77 @@
+"""Search-as-you-type, from the keystroke to the rows handed to the Treeview.
+
+The debounce of the main window is left out: these tests time what `App.type_ahead` runs on the Tk thread once a
+query is searched, the `SearchCache` lookup and, when the cache answers, the refinement and the formatting of the rows
+like `App.read_search_data`. A query the cache cannot answer is handed to the background worker; its results are
+simulated here by filtering the catalog outside the timer.
+"""
+
+import statistics
+import time
+
+import pytest
+
+pytest.importorskip('mysql.connector')
+
+from benchmarks.synthetic import catalog
+from src.utils.db_utils import full_text_terms, name_matcher
+from src.utils.search_cache import SearchCache
+
+
+def name_filter(text: str):
+    matches = name_matcher(text)
+    return lambda recipe: matches(recipe[1])
+
+
+def name_cache(**options) -> SearchCache:
+    return SearchCache(can_refine=lambda query: bool(full_text_terms(query)), matcher=name_filter, **options)
+
+
+def recipes(count: int) -> list[tuple]:
+    return [(recipe_id, name, 10, 20, '2024-01-01', ','.join(ingredients))
+            for recipe_id, (name, ingredients, tags) in catalog(count, seed=1).items()]
+
+
+def test_only_queries_with_an_indexed_word_are_refined():
+    cache = name_cache()
+    rows = [(1, 'Pollo al horno'), (2, 'Polenta'), (3, 'Tarta de pollo')]
+    # 'po' SE BUSCA CON LIKE 'po%': 'Tarta de pollo' NO ESTA, PERO 'pollo' POR FULLTEXT SI LA ENCUENTRA
+    cache.put('po', rows[:2])
+    assert cache.get('pol') is None
+    cache.put('pol', rows)
+    assert cache.get('poll') == [rows[0], rows[2]]
+    assert cache.get('pollo hor') == [rows[0]]
+
+
+def test_long_results_are_searched_again():
+    cache = name_cache(refine_limit=2)
+    cache.put('pol', [(1, 'Pollo al horno'), (2, 'Polenta'), (3, 'Tarta de pollo')])
+    assert cache.get('poll') is None
+
+
+def test_keystroke_stays_within_a_frame():
+    """Typing recipe names over 50000 recipes: no keystroke answered on the Tk thread takes more than a frame."""
+    catalog_rows = recipes(50000)
+    cache = name_cache()
+    latencies = []
+    refined = 0
+    for text in ('guisado', 'rolebefe guisado', 'tasalise en salsa', catalog_rows[0][1]):
+        for end in range(1, len(text) + 1):
+            query = text[:end]
+            start = time.perf_counter()
+            found = cache.get(query)
+            if found is not None:
+                shown = [[recipe[0], recipe[1], recipe[5], f'{recipe[2]} min', f'{recipe[3]} min', recipe[4]]
+                         for recipe in found]
+            latencies.append((time.perf_counter() - start) * 1000)
+            if found is None:
+                # LA BUSQUEDA CORRE EN EL WORKER, FUERA DEL HILO DE TK
+                matches = name_filter(query)
+                cache.put(query, [recipe for recipe in catalog_rows if matches(recipe)])
+            else:
+                refined += 1
+                assert len(shown) == len(found)
+    assert refined > 0
+    # UN CUADRO A 60 HZ
+    assert max(latencies) < 16
+    assert statistics.median(latencies) < 2
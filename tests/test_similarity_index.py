@@ -0,0 +1,21 @@
+from benchmarks import similarity
+from src.utils.similarity_index import SimilarityIndex
+
+
+def test_similar_returns_exact_jaccard_ranked():
+    index = SimilarityIndex()
+    index.set_recipe(1, ['pollo', 'limon', 'ajo', 'sal'], ['cena'])
+    index.set_recipe(2, ['Pollo', 'limón', 'ajo', 'sal'], ['cena'])
+    index.set_recipe(3, ['pollo', 'limon', 'ajo', 'pimienta'], ['cena'])
+    index.set_recipe(4, ['harina', 'azucar', 'huevo'], ['postre'])
+    matches = index.similar(1, k=5)
+    assert matches[0] == (2, 1.0)
+    assert all(recipe_id != 4 for recipe_id, score in matches)
+    assert [score for recipe_id, score in matches] == sorted((score for recipe_id, score in matches), reverse=True)
+
+
+def test_recall_of_close_neighbours():
+    result = similarity.run(recipes=3000, queries=100, k=5)
+    # CON 16 BANDAS DE 4 FILAS UN PAR CON SIMILITUD 0.5 SE ENCUENTRA 2 DE CADA 3 VECES, Y 9 DE CADA 10 CON 0.6
+    assert result['recall_close'] >= 0.75
+    assert result['candidates'] < 3000 / 20
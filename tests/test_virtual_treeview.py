@@ -0,0 +1,114 @@
+"""Memory regression tests of VirtualTreeview.
+
+The Treeview and its scrollbar are replaced by fakes with the subset of the Tk API the widget uses, so the tests
+run without a display. The fake keeps its items in a dict, like Tk does, so leaked items show up as its size.
+"""
+
+import gc
+import tracemalloc
+
+import pytest
+
+from src.windows import VirtualTreeview as module
+
+
+class FakeTreeview:
+    def __init__(self, parent, **options) -> None:
+        self.items = {}
+        self.order = []
+        self.selected = ()
+        self.updates = 0
+
+    def bind(self, sequence, callback) -> None:
+        pass
+
+    def insert(self, parent, position, iid, values) -> None:
+        assert iid not in self.items
+        self.items[iid] = values
+        self.order.insert(position, iid)
+
+    def delete(self, *iids) -> None:
+        for iid in iids:
+            del self.items[iid]
+            self.order.remove(iid)
+
+    def item(self, iid, values) -> None:
+        self.items[iid] = values
+        self.updates += 1
+
+    def yview_moveto(self, fraction) -> None:
+        pass
+
+    def selection(self) -> tuple:
+        return self.selected
+
+    def selection_set(self, iid) -> None:
+        self.selected = (iid,)
+
+    def selection_remove(self, *iids) -> None:
+        self.selected = ()
+
+    def focus(self, iid) -> None:
+        pass
+
+
+class FakeScrollbar:
+    def __init__(self, parent, **options) -> None:
+        self.position = (0.0, 1.0)
+
+    def set(self, first, last) -> None:
+        self.position = (first, last)
+
+
+@pytest.fixture
+def tree(monkeypatch):
+    monkeypatch.setattr(module.ttk, 'Treeview', FakeTreeview)
+    monkeypatch.setattr(module.ttk, 'Scrollbar', FakeScrollbar)
+    tree = module.VirtualTreeview(None, ('id', 'nombre'), overscan=5)
+    tree.visible = 20
+    return tree
+
+
+def rows(count: int, label: str = 'receta') -> list:
+    return [(index, f'{label} {index}') for index in range(count)]
+
+
+def test_only_the_viewport_is_materialized(tree):
+    tree.set_rows(rows(100000))
+    assert len(tree.tree.items) == tree.visible + tree.overscan
+    tree.scroll(50000)
+    assert len(tree.tree.items) == tree.visible + 2 * tree.overscan
+    assert set(tree.tree.items) == set(map(str, tree.rendered))
+
+
+def test_unchanged_rows_are_not_updated(tree):
+    tree.set_rows(rows(1000))
+    tree.tree.updates = 0
+    tree.set_rows(rows(1000))
+    assert tree.tree.updates == 0
+    tree.update_row(3, (3, 'editada'))
+    assert tree.tree.updates == 1
+
+
+def test_refresh_cycles_do_not_leak(tree):
+    """Reloading and scrolling the list 1000 times must not grow the Tk items or the Python heap."""
+    def cycle(number: int) -> None:
+        tree.set_rows(rows(500, label=f'ciclo {number % 2}'))
+        tree.scroll(number % 400)
+        tree.append_rows(rows(10))
+
+    tracemalloc.start()
+    try:
+        for number in range(50):
+            cycle(number)
+        gc.collect()
+        before = tracemalloc.get_traced_memory()[0]
+        for number in range(50, 1050):
+            cycle(number)
+            assert len(tree.tree.items) <= tree.visible + 2 * tree.overscan
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    # LAS FILAS DEL ULTIMO CICLO OCUPAN LO MISMO QUE LAS DEL PRIMERO: EL MARGEN ES PARA EL RUIDO DEL INTERPRETE
+    assert growth < 64 * 1024